@@ -1,2 +1,9 @@
-from pycentreon.core.query import RequestError, AllocationError, ContentError
-from pycentreon.core.api import Api as api
\ No newline at end of file
+from pycentreon.core.query import (
+    RequestError,
+    AllocationError,
+    ContentError,
+    CircuitOpenError,
+)
+from pycentreon.core.api import Api as api
+from pycentreon.core.federation import Federation as federation
+from pycentreon.core.search import Q
@@ -17,9 +17,19 @@ limitations under the License.
 """
 import requests
 
+from pycentreon.core.auth import TokenCache, TokenManager
+from pycentreon.core.breaker import BreakerRegistry
 from pycentreon.core.query import Request
-from pycentreon.core.app import App
-from pycentreon.core.response import Record
+from pycentreon.core.app import App, MonitoringApp
+from pycentreon.core.decode import PageDecoder
+from pycentreon.core.gorgone import GorgoneClient
+from pycentreon.core.plan import Planner
+from pycentreon.core.response import Record, register_api
+from pycentreon.core.rollout import PollerRollout
+from pycentreon.core.templates import TemplateResolver
+from pycentreon.core.topology import Topology
+from pycentreon.core.transport import get_transport
+from pycentreon.core.util import SingleFlight, TransferStats
 
 
 class Api:
@@ -48,6 +58,37 @@ class Api:
 
     :param str url: Centreon base URL (with the ending /centreon)
     :param str token: Your NetBox token.
+    :param bool|dict circuit_breaker: Enables a circuit breaker per
+        ``app/endpoint``. Pass ``True`` for the defaults or a dict of
+        :py:class:`.CircuitBreaker` options (``failure_threshold``,
+        ``error_rate``, ``window``, ``min_calls``, ``recovery_timeout``,
+        ``half_open_calls``). Disabled by default.
+    :param str token_cache: Path of an encrypted file where tokens created
+        by :py:meth:`create_token` are kept and reused by later processes.
+        Requires the ``cryptography`` package.
+    :param str token_cache_key: Secret used to encrypt ``token_cache``.
+        Defaults to the ``PYCENTREON_TOKEN_CACHE_KEY`` environment variable.
+    :param bool dedupe_requests: Identical GET requests (same URL, parameters
+        and token) issued concurrently from several threads share a single
+        call to Centreon. Enabled by default.
+    :param str|Transport transport: Sends requests through another HTTP
+        client than ``http_session``: ``"httpx"`` (HTTP/2 multiplexing,
+        needs ``httpx[http2]``), ``"urllib3"``, or a configured
+        :py:class:`.Transport` instance such as
+        ``HttpxTransport(http2=True, verify="ca.pem")``.
+    :param bool|int compress_requests: gzip the bodies of bulk ``create``,
+        ``update`` and ``delete`` calls. ``True`` compresses bodies of 4KB
+        and more, an int sets that threshold in bytes. The Centreon web
+        server must accept ``Content-Encoding: gzip`` request bodies
+        (e.g. Apache ``SetInputFilter DEFLATE``). Disabled by default.
+    :param int max_workers: Number of concurrent requests used when a query
+        is split in several calls. Defaults to 4.
+    :param int max_url_length: Longest URL sent to Centreon. Filters that
+        would exceed it, typically large ``__in`` lists, are split in
+        several queries. Defaults to 4096.
+    :param int decode_workers: Listings are fetched by pages whose JSON
+        decoding and record construction run in that many worker
+        processes, see :py:class:`.PageDecoder`. Disabled by default.
     :raises AttributeError: If app doesn't exist.
 
 
@@ -74,35 +115,206 @@ class Api:
     ... )
     >>> print(list(ctn.monitoring.hosts.all()))
     >>> [host1, host2, host3]
+
+    Failing fast while an endpoint keeps timing out:
+
+    >>> ctn = pycentreon.api(
+    ...     'https://centreon.example.com/centreon',
+    ...     token='centreon_token_value',
+    ...     circuit_breaker={"failure_threshold": 3, "recovery_timeout": 60},
+    ... )
+    >>> ctn.metrics()["breakers"]["monitoring/hosts"]["state"]
+    'closed'
+
+    Reusing the token of a previous run, a new one is only created when
+    the cached token is missing or rejected by Centreon:
+
+    >>> ctn = pycentreon.api(
+    ...     'https://centreon.example.com/centreon',
+    ...     token_cache='~/.cache/pycentreon-tokens',
+    ...     token_cache_key=os.environ['TOKEN_CACHE_SECRET'],
+    ... )
+    >>> ctn.create_token(centreon_login, centreon_password)
     """
     def __init__(
         self,
         url,
         token=None,
-    ):            
+        circuit_breaker=False,
+        token_cache=None,
+        token_cache_key=None,
+        dedupe_requests=True,
+        transport=None,
+        compress_requests=False,
+        max_workers=4,
+        max_url_length=4096,
+        decode_workers=None,
+    ):
         # Centreon httpd uses the following regexp to redirect to Centreon API
         #   ^\${base_uri}/?(?!api/latest/|api/beta/|api/v[0-9]+/|api/v[0-9]+\.[0-9]+/)(.*\.php(/.*)?)$
         base_url = "{}/api/latest".format(url if url[-1] != "/" else url[:-1])
-        self.token = token
         self.base_url = base_url
+        self.auth = TokenManager(
+            token=token,
+            login_call=self._login,
+            url=base_url,
+            cache=TokenCache(token_cache, token_cache_key) if token_cache else None,
+        )
         self.http_session = requests.Session()
+        self.transport = get_transport(transport)
+        self.inflight = SingleFlight() if dedupe_requests else None
+        self.transfer_stats = TransferStats()
+        self.max_workers = max_workers
+        self.max_url_length = max_url_length
+        self.decoder = PageDecoder(self, decode_workers) if decode_workers else None
+        if compress_requests is True:
+            self.compress_min_size = 4096
+        else:
+            self.compress_min_size = compress_requests or None
+        self.breakers = BreakerRegistry(
+            enabled=bool(circuit_breaker),
+            **(circuit_breaker if isinstance(circuit_breaker, dict) else {})
+        )
         self.administration = App(self, "administration")
         self.configuration = App(self, "configuration")
         self.gorgone = App(self, "gorgone")
-        self.monitoring = App(self, "monitoring")
+        self.monitoring = MonitoringApp(self, "monitoring")
         self.platform = App(self, "platform")
         self.users = App(self, "users")
+        register_api(self)
+
+    def metrics(self):
+        """Returns runtime metrics collected by the API object.
+
+        :Returns: dict with a ``breakers`` entry mapping each
+            ``app/endpoint`` to its circuit breaker state and counters,
+            the number of ``deduplicated_requests``, the ``transfer``
+            byte counters (decoded and on the wire) and, once passive
+            check results were submitted, the ``submit`` counters.
+
+        :Examples:
+        >>> ctn.metrics()
+        {'breakers': {'monitoring/hosts': {'state': 'open', ...}}}
+        """
+        ret = {
+            "breakers": self.breakers.metrics(),
+            "deduplicated_requests": self.inflight.shared if self.inflight else 0,
+            "transfer": self.transfer_stats.metrics(),
+        }
+        submitter = self.monitoring.__dict__.get("_submitter")
+        if submitter is not None:
+            ret["submit"] = submitter.metrics()
+        return ret
+
+    def gorgone_client(self, url, username=None, password=None, **kwargs):
+        r"""Returns a :py:class:`.GorgoneClient` running commands on the
+        pollers through the Gorgone API.
+
+        :arg str url: Gorgone API URL, e.g. ``http://central:8085``.
+        :arg str,optional username: Gorgone API user.
+        :arg str,optional password: Gorgone API password.
+        :arg \**kwargs: Options of :py:class:`.GorgoneClient`.
+
+        :Examples:
+        >>> with ctn.gorgone_client("http://central:8085") as gorgone:
+        ...     for result in gorgone.run(ctn.gorgone.pollers.all(), "uptime"):
+        ...         print(result.node_id, result.output)
+        """
+        return GorgoneClient(url, username, password, **kwargs)
+
+    def planner(self):
+        """Returns a :py:class:`.Planner` computing the changes that bring
+        endpoints to a desired state with a few listings.
 
-    def create_token(self, username, password):
+        :Examples:
+        >>> plan = ctn.planner().add(ctn.configuration.hosts, hosts, key="name").plan()
+        >>> plan.apply()
+        """
+        return Planner(self)
+
+    def rollout(self, pollers=None, generate=True, reload=True, **kwargs):
+        r"""Generates and reloads the configuration of pollers concurrently.
+
+        :arg iterable,optional pollers: Poller Records or ids, all the
+            monitoring servers by default.
+        :arg bool,optional generate: Generate the configuration.
+        :arg bool,optional reload: Reload the pollers, in waves.
+        :arg \**kwargs: Options of :py:class:`.PollerRollout` (``workers``,
+            ``wave_size``, ``retries``, ``backoff``, ``on_progress``).
+
+        :Returns: :py:class:`.RolloutResult` with the status and timings
+            of each poller.
+
+        :Examples:
+        >>> result = ctn.rollout(wave_size=15, on_progress=print)
+        >>> result.ok, result.elapsed
+        (True, 184.2)
+        >>> {s.name: s.timings for s in result}
+        {'central': {'generate': 21.3, 'reload': 2.1}, ...}
+        """
+        return PollerRollout(self, **kwargs).run(pollers, generate, reload)
+
+    def templates(self, kind="hosts", **kwargs):
+        r"""Loads the host or service templates to resolve inheritance
+        locally.
+
+        :arg str,optional kind: ``hosts`` or ``services``.
+        :arg \**kwargs: Options of :py:class:`.TemplateResolver`.
+
+        :Returns: A loaded :py:class:`.TemplateResolver`.
+
+        :Examples:
+        >>> resolver = ctn.templates("hosts")
+        >>> [resolver.effective(h) for h in ctn.configuration.hosts.all()]
+        """
+        return TemplateResolver(self, kind, **kwargs).load()
+
+    def topology(self, **kwargs):
+        r"""Loads the relationships of pollers, hosts and services.
+
+        :arg \**kwargs: Options of :py:class:`.Topology`.
+
+        :Returns: A built :py:class:`.Topology`, answering traversal and
+            impact queries locally.
+
+        :Examples:
+        >>> topo = ctn.topology()
+        >>> topo.impact(hostgroup=12)["services"]
+        {4312, 4313, ...}
+        """
+        return Topology(self, **kwargs).build()
+
+    @property
+    def token(self):
+        return self.auth.token
+
+    @token.setter
+    def token(self, value):
+        self.auth.token = value
+
+    def _login(self, username, password):
+        return Request(
+            base="{}/login".format(self.base_url),
+            http_session=self.http_session,
+            transport=self.transport,
+        ).post(data={"security": {"credentials": {"login": username, "password": password}}})
+
+    def create_token(self, username, password, use_cache=True):
         """Create an API token for Centreon API v2
         Saves the created token automatically in the API object.
 
+        The credentials are kept in memory so that the token can be
+        renewed transparently when Centreon rejects it (HTTP 401). If a
+        ``token_cache`` was given to the API, a token cached for this
+        user is reused instead of logging in.
+
         This requires the following parameters to be set:
             >> Configuration > Users > Contact/Users
             -- Centreon Authentication
             ---- Reach API Configuration : Yes
             ---- Reach API Realtime : Yes
 
+        :arg bool,optional use_cache: Set to False to always call ``/login``.
         :Returns: The token as a ``Record`` object.
         :Raises: :py:class:`.RequestError` if the request is not successful.
 
@@ -116,25 +328,30 @@ class Api:
 
         >>> Centreon token: V4olz/ogbqD8xmeqUfdfdfdfdfdfS7p/qThnE/FBi75DjXKII7r8bzzze
         """
-        resp = Request(
-            base="{}/login".format(self.base_url),
-            http_session=self.http_session,
-        ).post(data={"security": {"credentials": {"login": username, "password": password}}})
-        # Save the newly created API token, otherwise populating the Record
-        # object details will fail
-        self.token = resp.get("security", []).get("token",None)
+        resp = self.auth.login(username, password, use_cache=use_cache)
         return Record(resp, self, None)
-    
+
     def delete_token(self):
         """ Invalidates existing Centreon API v2 token.
 
+        The token is also forgotten by the API object and removed from
+        the token cache.
+
         :Examples:
         >>> import pycentreon
         >>> cnt = pycentreon.api(
         ...     'https://centreon.example.com/centreon',
         ...     token='centreon_token_value'
         ... )
-        >>> cnt.logout()
+        >>> cnt.delete_token()
         """
-        resp = Request(base="{}/logout".format(self.base_url), http_session=self.http_session).get()
-        return Record(resp, self, None)
\ No newline at end of file
+        resp = next(
+            Request(
+                base="{}/logout".format(self.base_url),
+                token=self.token,
+                http_session=self.http_session,
+                transport=self.transport,
+            ).get()
+        )
+        self.auth.clear()
+        return Record(resp, self, None)
@@ -16,11 +16,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 from pycentreon.core.endpoint import Endpoint
+from pycentreon.core.perfdata import PerformanceFetcher
 from pycentreon.core.query import Request
+from pycentreon.core.submit import CheckResultSubmitter
+from pycentreon.core.timeline import TimelineReader
+from pycentreon.core.watch import ResourceWatcher
 from pycentreon.models import (
     administration,
     configuration,
     gorgone,
+    mapper,
     monitoring,
     platform,
     users
@@ -61,5 +66,130 @@ class App:
         self.__dict__.update(d)
         self._setmodel()
 
+    def _lookup_endpoint(self, name):
+        """Returns the Endpoint class of ``name``.
+
+        Models can specialize an endpoint by defining a ``<Name>Endpoint``
+        subclass of :py:class:`.Endpoint`, otherwise the generic class is
+        used.
+        """
+        if self.model:
+            return getattr(self.model, "{}Endpoint".format(name.title()), Endpoint)
+        return Endpoint
+
     def __getattr__(self, name):
-        return Endpoint(self.api, self, name, model=self.model)
\ No newline at end of file
+        return self._lookup_endpoint(name)(self.api, self, name, model=self.model)
+
+
+class MonitoringApp(App):
+    """The ``monitoring`` app, with helpers working across its endpoints."""
+
+    def watch(self, *args, **kwargs):
+        r"""Watches the state changes of monitoring resources.
+
+        :arg \*args: Filters and options of :py:class:`.ResourceWatcher`.
+        :arg \**kwargs: Filters and options of :py:class:`.ResourceWatcher`.
+
+        :returns: A :py:class:`.ResourceWatcher`, usable as a generator or
+            an async iterator of :py:class:`.ChangeEvent`.
+
+        :Examples:
+
+        >>> for event in ctn.monitoring.watch(type="service", interval=30):
+        ...     print(event.kind, event.key, event.current)
+        """
+        return ResourceWatcher(self.resources, *args, **kwargs)
+
+    @property
+    def submitter(self):
+        """The :py:class:`.CheckResultSubmitter` used by :py:meth:`submit`,
+        created on first use."""
+        submitter = self.__dict__.get("_submitter")
+        if submitter is None:
+            submitter = CheckResultSubmitter(self, workers=self.api.max_workers)
+            self.__dict__["_submitter"] = submitter
+        return submitter
+
+    def submit(self, results, batch_size=None):
+        """Submits passive check results in batches.
+
+        :arg iterable results: ``(host, service, status, output, perfdata)``
+            tuples, ``service`` being None for host results.
+        :arg int,optional batch_size: Results per call, 500 by default.
+
+        :returns: dict of counters for this run (``received``, ``submitted``,
+            ``dropped``, ``failed``, ``batches``, ``throughput``...).
+
+        :Examples:
+
+        >>> ctn.monitoring.submit(
+        ...     (r.host, r.service, r.code, r.output, r.perfdata)
+        ...     for r in collector.results()
+        ... )
+        {'received': 50000, 'submitted': 49998, 'dropped': 2, 'failed': 0, ...}
+        """
+        if batch_size is not None:
+            self.submitter.batch_size = batch_size
+        return self.submitter.submit(results)
+
+    def performance(
+        self, services, start, end, chunk=None, step=None, aggregate="avg"
+    ):
+        """Fetches the performance data of several services concurrently.
+
+        :arg iterable services: Service Records or ``(host_id, service_id)``
+            tuples.
+        :arg datetime start: Start of the period.
+        :arg datetime end: End of the period.
+        :arg timedelta,optional chunk: Split the period in windows of this
+            length, fetched concurrently.
+        :arg float,optional step: Downsample the series in buckets of
+            ``step`` seconds, client side.
+        :arg str,optional aggregate: ``min``, ``max``, ``avg`` or ``p95``.
+
+        :returns: list of :py:class:`.ServicePerformance`, whose series are
+            NumPy arrays when NumPy is installed.
+
+        :Examples:
+
+        >>> perf = ctn.monitoring.performance(
+        ...     ctn.monitoring.services.filter(name="Ping"),
+        ...     start=datetime(2024, 5, 1),
+        ...     end=datetime(2024, 5, 8),
+        ...     chunk=timedelta(days=1),
+        ...     step=3600,
+        ...     aggregate="p95",
+        ... )
+        >>> perf[0].metrics["rta"].max()
+        12.4
+        """
+        return PerformanceFetcher(self.api).fetch(
+            services, start, end, chunk=chunk, step=step, aggregate=aggregate
+        )
+
+    def timeline(self, resources, start, end, **kwargs):
+        r"""Streams the timelines of hosts and services in chronological order.
+
+        Events of all ``resources`` are merged by date, which suits
+        post-mortems of incidents spanning many resources.
+
+        :arg iterable resources: Host or service Records, host ids or
+            ``(host_id, service_id)`` tuples.
+        :arg datetime start: Start of the period.
+        :arg datetime end: End of the period.
+        :arg \**kwargs: Options of :py:class:`.TimelineReader` (``window``,
+            ``page_size``, ``prefetch``, ``workers``).
+
+        :returns: Generator of :py:class:`.TimelineEvent`.
+
+        :Examples:
+
+        >>> for event in ctn.monitoring.timeline(
+        ...     ctn.monitoring.hosts.filter(name__like="DC1%"),
+        ...     start=datetime(2024, 5, 1, 22),
+        ...     end=datetime(2024, 5, 2, 6),
+        ... ):
+        ...     print(event.record.date, event.resource["id"], event.record.content)
+        """
+        refs = [monitoring._resource_ref(r) for r in resources]
+        return TimelineReader(self, **kwargs).stream(refs, start, end)
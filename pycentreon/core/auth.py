@@ -0,0 +1,198 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+TOKEN_CACHE_KEY_ENV = "PYCENTREON_TOKEN_CACHE_KEY"
+
+
+class TokenCache:
+    """Encrypted on-disk store of Centreon login responses.
+
+    Lets short-lived processes reuse a token created by a previous run
+    instead of going through ``/login`` again. Entries are keyed by API
+    URL and username, and the whole file is encrypted with a key derived
+    from ``secret`` (PBKDF2-SHA256 + Fernet). Requires the optional
+    ``cryptography`` package.
+
+    :arg str path: Location of the cache file.
+    :arg str,optional secret: Passphrase used to encrypt the file. Read from
+        the ``PYCENTREON_TOKEN_CACHE_KEY`` environment variable if omitted.
+    :raises ImportError: if ``cryptography`` is not installed.
+    :raises ValueError: if no secret is available.
+    """
+
+    def __init__(self, path, secret=None):
+        if Fernet is None:
+            raise ImportError(
+                "The token cache requires the 'cryptography' package."
+            )
+        secret = secret or os.environ.get(TOKEN_CACHE_KEY_ENV)
+        if not secret:
+            raise ValueError(
+                "A token cache secret is required, pass token_cache_key or "
+                "set {}.".format(TOKEN_CACHE_KEY_ENV)
+            )
+        self.path = os.path.expanduser(path)
+        self._secret = secret.encode() if isinstance(secret, str) else secret
+        self._lock = threading.Lock()
+
+    def _fernet(self, salt):
+        key = hashlib.pbkdf2_hmac("sha256", self._secret, salt, 200000)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                envelope = json.load(f)
+            salt = base64.b64decode(envelope["salt"])
+            data = self._fernet(salt).decrypt(envelope["data"].encode())
+            return json.loads(data)
+        except (OSError, ValueError, KeyError, InvalidToken):
+            # Missing, corrupted or encrypted with another secret
+            return {}
+
+    def _write(self, entries):
+        salt = os.urandom(16)
+        envelope = {
+            "salt": base64.b64encode(salt).decode(),
+            "data": self._fernet(salt).encrypt(json.dumps(entries).encode()).decode(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".pycentreon-")
+        try:
+            os.chmod(tmp, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(envelope, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _key(url, username):
+        return "{}|{}".format(url, username)
+
+    def load(self, url, username):
+        """Returns the cached login response or None."""
+        with self._lock:
+            return self._read().get(self._key(url, username))
+
+    def store(self, url, username, login_response):
+        with self._lock:
+            entries = self._read()
+            entries[self._key(url, username)] = login_response
+            self._write(entries)
+
+    def discard(self, url, username):
+        with self._lock:
+            entries = self._read()
+            if entries.pop(self._key(url, username), None) is not None:
+                self._write(entries)
+
+
+class TokenManager:
+    """Holds the API token and renews it when Centreon rejects it.
+
+    Requests read :py:attr:`token` at call time, so every endpoint sees
+    a token created or rotated after it was instantiated. When a request
+    gets a 401, :py:meth:`refresh` logs in again with the credentials
+    given to :py:meth:`login`. Only one thread performs the login, the
+    others wait for it and reuse the new token.
+
+    :arg str,optional token: Initial token.
+    :arg callable login_call: Function taking ``(username, password)``
+        and returning the ``/login`` response.
+    :arg str url: API URL, used as the cache key.
+    :arg obj,optional cache: :py:class:`.TokenCache` to reuse tokens across
+        processes.
+    """
+
+    def __init__(self, token=None, login_call=None, url=None, cache=None):
+        self._token = token
+        self._login_call = login_call
+        self._credentials = None
+        self._lock = threading.Lock()
+        self.url = url
+        self.cache = cache
+
+    @property
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, value):
+        self._token = value
+
+    @property
+    def can_refresh(self):
+        return self._credentials is not None
+
+    @staticmethod
+    def _extract(login_response):
+        return (login_response.get("security") or {}).get("token")
+
+    def login(self, username, password, use_cache=True):
+        """Logs in and stores the resulting token.
+
+        :arg bool,optional use_cache: Reuse the token of the cache, if any,
+            instead of calling ``/login``.
+        :returns: The login response as a dict.
+        """
+        with self._lock:
+            self._credentials = (username, password)
+            if use_cache and self.cache is not None:
+                cached = self.cache.load(self.url, username)
+                if cached and self._extract(cached):
+                    self._token = self._extract(cached)
+                    return cached
+            return self._login()
+
+    def _login(self):
+        username, password = self._credentials
+        resp = self._login_call(username, password)
+        self._token = self._extract(resp)
+        if self.cache is not None and self._token:
+            self.cache.store(self.url, username, resp)
+        return resp
+
+    def refresh(self, stale_token):
+        """Replaces a token rejected by Centreon.
+
+        :arg str stale_token: The token that got the 401.
+        :returns: The token to retry with.
+        """
+        with self._lock:
+            if self._token is not None and self._token != stale_token:
+                # Another thread already logged in again
+                return self._token
+            self._login()
+            return self._token
+
+    def clear(self):
+        """Forgets the token, the credentials and the cached entry."""
+        with self._lock:
+            if self.cache is not None and self._credentials is not None:
+                self.cache.discard(self.url, self._credentials[0])
+            self._token = None
+            self._credentials = None
@@ -0,0 +1,208 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import threading
+import time
+from collections import deque
+
+from pycentreon.core.query import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Tracks the health of a single Centreon endpoint.
+
+    The breaker starts ``closed`` and lets every call through. It opens
+    after ``failure_threshold`` consecutive failures, or when the share
+    of failures among the last ``window`` calls reaches ``error_rate``.
+    While open, calls fail fast with :py:class:`.CircuitOpenError`.
+    Once ``recovery_timeout`` seconds have elapsed the breaker goes
+    ``half_open`` and lets ``half_open_calls`` probe requests through:
+    a successful probe closes it again, a failed one re-opens it.
+
+    :arg str key: Identifier of the endpoint (``app/endpoint``).
+    :arg int,optional failure_threshold: Consecutive failures before opening.
+    :arg float,optional error_rate: Failure ratio (0-1) over the sliding
+        window that opens the breaker. ``None`` disables this check.
+    :arg int,optional window: Number of recent calls used for ``error_rate``.
+    :arg int,optional min_calls: Minimum calls in the window before
+        ``error_rate`` is evaluated.
+    :arg float,optional recovery_timeout: Seconds to stay open before probing.
+    :arg int,optional half_open_calls: Concurrent probes allowed when half open.
+    """
+
+    def __init__(
+        self,
+        key,
+        failure_threshold=5,
+        error_rate=0.5,
+        window=20,
+        min_calls=10,
+        recovery_timeout=30.0,
+        half_open_calls=1,
+    ):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probes = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self.times_opened += 1
+
+    def before_call(self):
+        """Reserves a call slot or fails fast.
+
+        :raises: :py:class:`.CircuitOpenError` if the breaker is open, or
+            half open with all probe slots already taken.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+            self.rejected_calls += 1
+            retry_after = 0.0
+            if state == OPEN:
+                retry_after = max(
+                    0.0,
+                    self.recovery_timeout - (time.monotonic() - self._opened_at),
+                )
+            raise CircuitOpenError(self.key, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.total_calls += 1
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+
+    def record_failure(self):
+        with self._lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            if self._state != CLOSED:
+                return
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open()
+            elif (
+                self.error_rate is not None
+                and len(self._outcomes) >= self.min_calls
+                and self._outcomes.count(False) / len(self._outcomes)
+                >= self.error_rate
+            ):
+                self._open()
+
+    def reset(self):
+        """Forces the breaker back to the closed state."""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._outcomes.clear()
+            self._probes = 0
+
+    def metrics(self):
+        """Returns a snapshot of the breaker state and counters.
+
+        :returns: dict.
+        """
+        with self._lock:
+            window = len(self._outcomes)
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                "window_error_rate": (
+                    self._outcomes.count(False) / window if window else 0.0
+                ),
+                "total_calls": self.total_calls,
+                "total_failures": self.total_failures,
+                "rejected_calls": self.rejected_calls,
+                "times_opened": self.times_opened,
+            }
+
+
+class BreakerRegistry:
+    r"""Holds one :py:class:`.CircuitBreaker` per ``app/endpoint`` key.
+
+    :arg bool,optional enabled: When False, :py:meth:`get` returns None and
+        requests are never short-circuited.
+    :arg \**options: Keyword arguments passed to every new
+        :py:class:`.CircuitBreaker`.
+    """
+
+    def __init__(self, enabled=True, **options):
+        self.enabled = enabled
+        self.options = options
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(key, **self.options)
+                self._breakers[key] = breaker
+            return breaker
+
+    def reset(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.reset()
+
+    def metrics(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.metrics() for key, breaker in breakers.items()}
@@ -0,0 +1,119 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+from collections import namedtuple
+
+from pycentreon.core.query import RequestError
+
+BulkOutcome = namedtuple("BulkOutcome", ["item", "ok", "error"])
+
+
+class BulkResult(list):
+    """List of :py:class:`BulkOutcome`, one per submitted item."""
+
+    @property
+    def succeeded(self):
+        return [o.item for o in self if o.ok]
+
+    @property
+    def failed(self):
+        return [o for o in self if not o.ok]
+
+    @property
+    def ok(self):
+        return all(o.ok for o in self)
+
+
+def chunks(items, size):
+    """Yields successive lists of at most ``size`` items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Statuses of payloads Centreon rejects, where bisecting a chunk finds
+# the offending items
+VALIDATION_ERRORS = (400, 422)
+
+
+class BulkAborted(Exception):
+    """Raised by :py:func:`send_chunk` on client errors that the next
+    calls would hit as well, ``error`` being the :py:class:`.RequestError`."""
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+def send_chunk(send, chunk):
+    """Sends a chunk, halving it on validation errors to find the items
+    Centreon rejects.
+
+    :raises BulkAborted: on other client errors (401, 403, 404, 429...), which
+        the following calls would hit as well.
+    """
+    try:
+        send(chunk)
+    except RequestError as e:
+        status = getattr(e.req, "status_code", None)
+        if status in VALIDATION_ERRORS:
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                return send_chunk(send, chunk[:middle]) + send_chunk(
+                    send, chunk[middle:]
+                )
+        elif status is not None and 400 <= status < 500:
+            raise BulkAborted(e)
+        return [BulkOutcome(item, False, e) for item in chunk]
+    except Exception as e:
+        return [BulkOutcome(item, False, e) for item in chunk]
+    return [BulkOutcome(item, True, None) for item in chunk]
+
+
+def run_chunked(items, send, chunk_size=100, workers=4):
+    """Sends ``items`` in chunks with bounded concurrency.
+
+    A chunk rejected as invalid (400 or 422) is split in halves and
+    resent, so that only the offending items are reported as failed.
+    Other client errors, such as an expired token (401), a denied access
+    (403) or rate limiting (429), stop the run: the items not sent yet
+    fail with that error. Other errors fail the whole chunk.
+
+    :arg iterable items: Items to send.
+    :arg callable send: Called with each list of items, raises on failure.
+    :arg int,optional chunk_size: Maximum items per call.
+    :arg int,optional workers: Number of calls in flight.
+    :returns: A :py:class:`BulkResult` in the order of ``items``.
+    """
+    stopped = []
+
+    def run(chunk):
+        if stopped:
+            return [BulkOutcome(item, False, stopped[0]) for item in chunk]
+        try:
+            return send_chunk(send, chunk)
+        except BulkAborted as e:
+            stopped.append(e.error)
+            return [BulkOutcome(item, False, e.error) for item in chunk]
+
+    result = BulkResult()
+    with cf.ThreadPoolExecutor(max_workers=workers) as executor:
+        for outcomes in executor.map(run, chunks(items, chunk_size)):
+            result.extend(outcomes)
+    return result
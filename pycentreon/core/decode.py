@@ -0,0 +1,146 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import io
+import itertools
+import json
+import pickle
+import threading
+
+from pycentreon.core.endpoint import Endpoint
+from pycentreon.core.response import Record, _bound_api
+
+
+def _restore_record(cls, state):
+    record = cls.__new__(cls)
+    record.__dict__.update(state)
+    return record
+
+
+class _RecordPickler(pickle.Pickler):
+    """Pickles records as their state, the Api and endpoints by name."""
+
+    def __init__(self, file, api):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.api = api
+
+    def persistent_id(self, obj):
+        if obj is self.api:
+            return ("api",)
+        if isinstance(obj, Endpoint):
+            return ("endpoint", obj.app.name, obj.name)
+        return None
+
+    def reducer_override(self, obj):
+        if isinstance(obj, Record):
+            return _restore_record, (obj.__class__, obj.__dict__)
+        return NotImplemented
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    def __init__(self, file, api):
+        super().__init__(file)
+        self.api = api
+        self.endpoints = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == "api":
+            return self.api
+        key = pid[1:]
+        if key not in self.endpoints:
+            app, name = key
+            self.endpoints[key] = getattr(getattr(self.api, app), name)
+        return self.endpoints[key]
+
+
+def _decode_page(content, cls, base_url, app, name):
+    """Runs in a worker: decodes a page and builds its records."""
+    api = _bound_api(base_url)
+    endpoint = getattr(getattr(api, app), name)
+    records = [cls(values, api, endpoint) for values in json.loads(content)["result"]]
+    buf = io.BytesIO()
+    _RecordPickler(buf, api).dump(records)
+    return buf.getvalue()
+
+
+class PageDecoder:
+    """Decodes listing pages and builds their records in worker processes.
+
+    Listings are fetched by pages of ``page_size`` records, ``fetchers``
+    pages at a time. The raw body of each page goes to a pool of
+    ``workers`` processes, which decode the JSON and build the records,
+    and send them back pickled as their attributes. Restoring them only
+    rebinds the Api and the endpoint, so the main process does not spend
+    its time holding the GIL in ``json.loads()`` and
+    ``Record._parse_values()``. Records are returned in page order.
+
+    Enabled with ``Api(decode_workers=...)``, it only pays off for large
+    listings on multi-core machines.
+
+    :arg obj api: The :py:class:`.Api`.
+    :arg int workers: Decoding processes.
+    :arg int,optional page_size: Records per page.
+    :arg int,optional fetchers: Pages fetched concurrently, defaults to
+        ``Api.max_workers``.
+    """
+
+    def __init__(self, api, workers, page_size=1000, fetchers=None):
+        self.api = api
+        self.workers = workers
+        self.page_size = page_size
+        self.fetchers = fetchers or api.max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = cf.ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def shutdown(self):
+        """Stops the worker processes, they start again when needed."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def records(self, endpoint, request):
+        """Yields the records of ``request``, a listing of ``endpoint``.
+
+        The total is asked in this process first: responses that are not
+        a paginated listing (e.g. a plain JSON array) are read with
+        :py:meth:`.Request.get` as without a decoder.
+        """
+        first = request._make_call(add_params={"limit": 0})
+        if not (isinstance(first, dict) and "meta" in first and "result" in first):
+            for values in request.get():
+                yield endpoint.return_obj(values, self.api, endpoint)
+            return
+        request.count = first["meta"].get("total", 0)
+        pages = request.get_pages(self.page_size, workers=self.fetchers)
+        args = (endpoint.return_obj, self.api.base_url, endpoint.app.name, endpoint.name)
+        executor = self.executor
+        # Decode up to two pages per worker ahead of the consumer
+        window = [
+            executor.submit(_decode_page, page, *args)
+            for page in itertools.islice(pages, self.workers * 2)
+        ]
+        while window:
+            future = window.pop(0)
+            nxt = next(pages, None)
+            if nxt is not None:
+                window.append(executor.submit(_decode_page, nxt, *args))
+            yield from _RecordUnpickler(io.BytesIO(future.result()), self.api).load()
@@ -15,8 +15,12 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from pycentreon.core.query import Request, RequestError
+import concurrent.futures as cf
+import json
+
+from pycentreon.core.query import MultiRequest, Request, RequestError
 from pycentreon.core.response import Record, RecordSet
+from pycentreon.core.search import Q, split_search, to_search
 
 RESERVED_KWARGS = ()
 
@@ -34,19 +38,43 @@ class Endpoint:
     :arg obj,optional model: Custom model for given app.
 
     """
+
+    # Field filtered on by ``shard_by="poller"``
+    shard_poller_field = "poller.id"
+
     def __init__(self, api, app, name, model=None):
         self.return_obj = self._lookup_ret_obj(name, model)
         self.name = name
         self.api = api
+        self.app = app
         self.base_url = api.base_url
-        self.token = api.token
         self.url = "{base_url}/{app}/{endpoint}".format(
             base_url=self.base_url,
             app=app.name,
             endpoint=self.name,
         )
+        self.breaker = api.breakers.get("{}/{}".format(app.name, name))
         self._choices = None
 
+    @property
+    def token(self):
+        """Token of the API, read at call time so that tokens created
+        or renewed after this endpoint was instantiated are used."""
+        return self.api.token
+
+    def _request_kwargs(self):
+        """Returns the keyword arguments shared by every
+        :py:class:`.Request` made on this endpoint."""
+        return dict(
+            token=self.token,
+            http_session=self.api.http_session,
+            breaker=self.breaker,
+            auth=self.api.auth,
+            singleflight=self.api.inflight,
+            transport=self.api.transport,
+            stats=self.api.transfer_stats,
+        )
+
     def _lookup_ret_obj(self, name, model):
         """Loads unique Response objects.
 
@@ -66,7 +94,9 @@ class Endpoint:
             ret = Record
         return ret
 
-    def all(self, limit=None, page=None, sort_by=None):
+    def all(
+        self, limit=None, page=None, sort_by=None, keyset=None, after=None, shard_by=None
+    ):
         """Queries the 'ListView' of a given endpoint.
 
         Returns all objects from an endpoint.
@@ -76,6 +106,16 @@ class Endpoint:
             be returned with each query to the Netbox server.  The queries
             will be made as you iterate through the result set.
         :arg int,optional offset: Overrides the offset on paginated returns.
+        :arg int|bool,optional keyset: Lists by pages of this many records
+            (1000 for ``True``) sorted by id, each page asking for the ids
+            greater than the last one instead of a page number. Deep pages
+            of large listings then cost the central database no more than
+            the first one.
+        :arg int,optional after: With ``keyset``, resumes after this id.
+        :arg str|tuple,optional shard_by: Splits the listing in independent
+            sub-queries run concurrently and merged: ``"poller"`` for one
+            per poller, ``("id", N)`` for N id ranges. Records are not
+            globally ordered.
 
         :Returns: A :py:class:`.RecordSet` object.
 
@@ -97,17 +137,39 @@ class Endpoint:
 
         This will cause the entire result set to be fetched from the server.
 
+        Exporting a large listing with constant cost pages, resumable
+        from the last id seen:
+
+        >>> services = ctn.monitoring.services.all(keyset=5000)
+        >>> for service in services:
+        ...     export(service)
+        >>> services.request.after  # last id yielded
+        204811
+
+        Spreading a large listing over one query per poller:
+
+        >>> services = list(ctn.monitoring.services.all(shard_by="poller"))
+
         """
         if sort_by is not None: # Check sort_by format
             if not isinstance(sort_by, dict):
                 raise ValueError("sort_by must be a dict. with value as ASC or DSC")
+        if shard_by is not None:
+            return self.filter(
+                limit=limit,
+                page=page,
+                sort_by=sort_by,
+                keyset=keyset,
+                after=after,
+                shard_by=shard_by,
+            )
         req = Request(
             base="{}/".format(self.url),
-            token=self.token,
-            http_session=self.api.http_session,
+            **self._request_kwargs(),
             limit=limit,
             page=page,
-            sort_by=sort_by
+            sort_by=sort_by,
+            **self._keyset_kwargs(keyset, after, limit, page, sort_by)
         )
 
         return RecordSet(self, req)
@@ -156,8 +218,7 @@ class Endpoint:
         req = Request(
             key=key,
             base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
+            **self._request_kwargs(),
         )
         try:
             return next(RecordSet(self, req), None)
@@ -171,18 +232,21 @@ class Endpoint:
         r"""Queries the 'ListView' of a given endpoint.
 
         Takes named arguments that match the usable filters on a
-        given endpoint. If an argument is passed then it's used as a
-        freeform search argument if the endpoint supports it.
-
-        :arg str,optional \*args: Freeform search string that's
-            accepted on given endpoint.
-        :arg str,optional \**kwargs: Any search argument the
-            endpoint accepts can be added as a keyword arg.
+        given endpoint and compiles them to Centreon's ``search``
+        parameter, see :py:class:`.Q` for the lookup syntax.
+
+        :arg Q|str|dict,optional \*args: :py:class:`.Q` filters, or a raw
+            Centreon search (JSON string or dict).
+        :arg str,optional \**kwargs: ``field__lookup=value`` filters, e.g.
+            ``host__name="DC1ESX01"`` or ``status__code__in=[1, 2]``.
+            ``search`` can also be passed as a keyword.
         :arg int,optional limit: Overrides the max page size on
             paginated returns.  This defines the number of records that will
             be returned with each query to the Netbox server.  The queries
             will be made as you iterate through the result set.
         :arg int,optional offset: Overrides the offset on paginated returns.
+        :arg int|bool,optional keyset: Keyset pagination, as in :py:meth:`.all`.
+        :arg int,optional after: With ``keyset``, resumes after this id.
 
         :Returns: A :py:class:`.RecordSet` object.
 
@@ -190,18 +254,25 @@ class Endpoint:
 
         Search host monitoring values with its name
 
-        >>> host = ctn.monitoring.hosts.get(search='{"host.name":"host-2"}')
+        >>> host = ctn.monitoring.hosts.get(name="host-2")
 
         Search all hosts monitored with specific pollers
-        >>> hosts = list(ctn.monitoring.hosts.filter(search='{"poller.id":"2"}'))
+        >>> hosts = list(ctn.monitoring.hosts.filter(poller__id__in=[2, 3]))
 
-        Search service 
+        Search services in a non-OK state on a host, with a raw search
+        >>> from pycentreon.core.search import Q
+        >>> services = ctn.monitoring.services.filter(
+        ...     Q(host__name="DC1ESX01") & ~Q(status__code=0)
+        ... )
+        >>> services = ctn.monitoring.services.filter(search='{"host.name":"DC1ESX01"}')
 
-        """
+        Filters too long for a single URL, usually a large ``$in`` list,
+        are split in several queries run concurrently, and the results
+        are merged without duplicates
 
-        if args:
-            kwargs.update({"q": args[0]})
+        >>> services = ctn.monitoring.services.filter(id__in=cmdb_service_ids)
 
+        """
         if any(i in RESERVED_KWARGS for i in kwargs):
             raise ValueError(
                 "A reserved kwarg was passed ({}). Please remove it "
@@ -210,26 +281,114 @@ class Endpoint:
         limit = kwargs.pop("limit") if "limit" in kwargs else None
         page = kwargs.pop("page") if "page" in kwargs else None
         sort_by = kwargs.pop("sort_by") if "sort_by" in kwargs else None
+        keyset = kwargs.pop("keyset") if "keyset" in kwargs else None
+        after = kwargs.pop("after") if "after" in kwargs else None
+        shard_by = kwargs.pop("shard_by") if "shard_by" in kwargs else None
         if limit is None and page is not None:
             raise ValueError("page requires a positive limit value")
-        # BUG : Search with (host_name="DC1ESX01") does not work
-        if "search" not in kwargs:
-            # Transforms kwargs to Centreon search format
-            kwargs_dict = self._create_ctn_search(**kwargs)
-        else:
-            kwargs_dict = kwargs
+        if shard_by is not None and (limit is not None or page is not None):
+            raise ValueError("shard_by cannot be combined with limit or page")
+
+        return RecordSet(
+            self,
+            self._list_request(
+                args,
+                kwargs,
+                shards=self._shards(shard_by) if shard_by is not None else None,
+                limit=limit,
+                page=page,
+                sort_by=sort_by,
+                **self._keyset_kwargs(keyset, after, limit, page, sort_by)
+            ),
+        )
 
-        req = Request(
-            filters=kwargs_dict,
-            base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
-            limit=limit,
-            sort_by=sort_by,
-            page=page,
+    def _id_bound(self, order):
+        ret = Request(base=self.url, **self._request_kwargs())._make_call(
+            add_params={"limit": 1, "sort_by": json.dumps({"id": order})}
         )
+        return ret["result"][0]["id"] if ret.get("result") else None
 
-        return RecordSet(self, req)
+    def _shards(self, shard_by):
+        """Returns the :py:class:`.Q` filters partitioning a listing.
+
+        :arg str|tuple shard_by: ``"poller"`` for one filter on
+            ``shard_poller_field`` per poller listed by ``gorgone.pollers``,
+            plus one for the records on none of them (unknown or null
+            poller), or ``("id", N)`` for N ranges between the lowest and
+            highest ids of the endpoint.
+        """
+        if shard_by == "poller":
+            field = self.shard_poller_field.replace(".", "__")
+            ids = [p.id for p in self.api.gorgone.pollers.all()]
+            if not ids:
+                return [Q()]
+            return [Q(**{"{}__eq".format(field): i}) for i in ids] + [
+                Q(**{"{}__nin".format(field): ids}) | Q(**{field: None})
+            ]
+        if isinstance(shard_by, tuple) and len(shard_by) == 2 and shard_by[0] == "id":
+            with cf.ThreadPoolExecutor(max_workers=2) as executor:
+                low, high = executor.map(self._id_bound, ("ASC", "DESC"))
+            if low is None:
+                return [Q()]
+            step = -(-(high - low + 1) // max(1, shard_by[1]))
+            return [
+                Q(id__gte=start, id__lt=start + step)
+                for start in range(low, high + 1, step)
+            ]
+        raise ValueError(
+            'shard_by must be "poller" or ("id", N) - was {}'.format(shard_by)
+        )
+
+    @staticmethod
+    def _keyset_kwargs(keyset, after, limit, page, sort_by):
+        if not keyset:
+            if after is not None:
+                raise ValueError("after requires keyset")
+            return {}
+        if limit is not None or page is not None or sort_by is not None:
+            raise ValueError("keyset cannot be combined with limit, page or sort_by")
+        return {"keyset": 1000 if keyset is True else keyset, "after": after}
+
+    def _list_request(self, args, kwargs, shards=None, **request_kwargs):
+        """Builds the request listing the records matching the filters.
+
+        :arg list,optional shards: Disjoint :py:class:`.Q` filters, each
+            and-ed with the filters in its own sub-query.
+
+        :returns: A :py:class:`.Request`, or a :py:class:`.MultiRequest` when
+            the filters are too long for a single URL or sharded.
+        """
+        requests, split = [], False
+        for shard in shards or [None]:
+            shard_args = args if shard is None else tuple(args) + (shard,)
+            filters = self._create_ctn_search(*shard_args, **dict(kwargs))
+            searches = [filters.get("search")]
+            if filters:
+                searches = split_search(filters["search"], self._search_budget())
+                split = split or len(searches) > 1
+            requests.extend(
+                Request(
+                    filters={"search": search} if search is not None else None,
+                    base=self.url,
+                    **self._request_kwargs(),
+                    **request_kwargs,
+                )
+                for search in searches
+            )
+        if len(requests) == 1:
+            return requests[0]
+        if split and (
+            request_kwargs.get("limit") is not None
+            or request_kwargs.get("page") is not None
+        ):
+            # Each sub-query would be paginated on its own
+            raise ValueError(
+                "limit and page cannot be used with filters too long for a "
+                "single URL, use keyset or iterate over all the results"
+            )
+        # The $in list of the filter is too long for a single URL, only
+        # then can the sub-queries overlap
+        return MultiRequest(requests, workers=self.api.max_workers, dedupe=split)
 
     def create(self, *args, **kwargs):
         r"""Creates an object on an endpoint.
@@ -265,8 +424,8 @@ class Endpoint:
         """
         req = Request(
             base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
+            compress_min_size=self.api.compress_min_size,
+            **self._request_kwargs(),
         ).post(args[0] if args else kwargs)
 
         if isinstance(req, list):
@@ -297,8 +456,8 @@ class Endpoint:
                 )
         req = Request(
             base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
+            compress_min_size=self.api.compress_min_size,
+            **self._request_kwargs(),
         ).patch(series)
 
         if isinstance(req, list):
@@ -332,8 +491,8 @@ class Endpoint:
 
         req = Request(
             base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
+            compress_min_size=self.api.compress_min_size,
+            **self._request_kwargs(),
         )
         return True if req.delete(data=[{"id": i} for i in cleaned_ids]) else False
 
@@ -343,8 +502,7 @@ class Endpoint:
 
         req = Request(
             base=self.url,
-            token=self.api.token,
-            http_session=self.api.http_session,
+            **self._request_kwargs(),
         ).options()
         try:
             post_data = req["actions"]["POST"]
@@ -360,38 +518,139 @@ class Endpoint:
         return self._choices
 
     def count(self, *args, **kwargs):
-        if args:
-            kwargs.update({"q": args[0]})
+        r"""Returns the number of objects matching the filters.
+
+        Only asks Centreon for the total (``limit=0``), no object is
+        downloaded.
+
+        :arg \*args: Same filters as :py:meth:`.filter`.
+        :arg \**kwargs: Same filters as :py:meth:`.filter`.
+
+        :returns: int
+
+        :Examples:
 
+        >>> ctn.monitoring.services.count(status__code__in=[2, 3])
+        42
+        """
         if any(i in RESERVED_KWARGS for i in kwargs):
             raise ValueError(
                 "A reserved {} kwarg was passed. Please remove it "
                 "try again.".format(RESERVED_KWARGS)
             )
 
-        ret = Request(
-            filters=kwargs,
-            base=self.url,
-            token=self.token,
-            http_session=self.api.http_session,
-        )
+        return self._list_request(args, kwargs).get_count()
+
+    def exists(self, *args, **kwargs):
+        r"""Returns whether at least one object matches the filters.
 
-        return ret.get_count()
+        Fetches at most one object (``limit=1``).
 
-    def _create_ctn_search(self, **kwargs):
-        """Transforms kwargs to Centreon search compatible format
+        :arg \*args: Same filters as :py:meth:`.filter`.
+        :arg \**kwargs: Same filters as :py:meth:`.filter`.
 
-        Returns:
-            _type_: _description_
+        :returns: bool
+
+        :Examples:
+
+        >>> ctn.configuration.hosts.exists(name="DC1ESX01")
+        True
         """
-        ordered_kwargs = {}
-        ctn_search = {}
-        for key in kwargs:
-            new_key_name = key.replace("_",".")
-            ordered_kwargs[new_key_name] = kwargs[key]
-        pass
-        ctn_search.update({"search" : f'{ordered_kwargs}'})
-        return ctn_search
+        return self._list_request(args, kwargs).exists()
+
+    def fetch_children(self, name, parents=None, workers=16):
+        """Fetches a sub-resource of many parents at once.
+
+        ``name`` must be a :py:class:`SubResource` of the records of this
+        endpoint. When the sub-resource declares a child endpoint and the
+        field referencing the parent, a single listing of the child
+        endpoint is made, filtered on the parents when they are given
+        (split in several queries if there are too many parents for one
+        URL). Otherwise the detail route of each
+        parent is listed, ``workers`` at a time.
+
+        The children are attached to their parent, later calls to
+        ``parent.<name>.list()`` return them without any request.
+
+        :arg str name: Name of the sub-resource.
+        :arg iterable,optional parents: Parent Records, all the records
+            of this endpoint by default.
+        :arg int,optional workers: Parents fetched concurrently when the
+            detail routes are used.
+
+        :returns: list of the parent Records.
+
+        :Examples:
+
+        >>> hosts = ctn.monitoring.hosts.fetch_children("services")
+        >>> for host in hosts:
+        ...     print(host.name, len(host.services.list()))
+        """
+        sub = getattr(self.return_obj, name, None)
+        if not isinstance(sub, SubResource):
+            raise ValueError(
+                "{} is not a sub-resource of {}".format(name, self.return_obj.__name__)
+            )
+        every_parent = parents is None
+        parents = list(self.all() if every_parent else parents)
+        if not parents:
+            return parents
+        if sub.endpoint and sub.parent_field:
+            children = {p.id: [] for p in parents}
+            child_endpoint = getattr(self.app, sub.endpoint)
+            if every_parent:
+                # All the children belong to a listed parent, no filter needed
+                listing = child_endpoint.all()
+            else:
+                listing = child_endpoint.filter(
+                    **{"{}__in".format(sub.parent_field.replace(".", "__")): list(children)}
+                )
+            for child in listing:
+                for parent_id in _field_values(child, sub.parent_field):
+                    if parent_id in children:
+                        children[parent_id].append(child)
+            for parent in parents:
+                sub.attach(parent, children[parent.id])
+        else:
+            with cf.ThreadPoolExecutor(max_workers=workers) as executor:
+                for parent, ret in zip(
+                    parents,
+                    executor.map(lambda p: list(getattr(p, name).list()), parents),
+                ):
+                    sub.attach(parent, ret)
+        return parents
+
+    def _search_budget(self):
+        """Returns the room left for the URL-encoded ``search`` parameter
+        under ``Api.max_url_length``."""
+        # Keep some room for the pagination and sort parameters
+        return self.api.max_url_length - len(self.url) - len("?search=") - 128
+
+    def _create_ctn_search(self, *args, **kwargs):
+        r"""Transforms filters to the Centreon ``search`` parameter.
+
+        :arg Q|str|dict \*args: :py:class:`.Q` filters or raw searches.
+        :arg \**kwargs: :py:class:`.Q` lookups, and optionally ``search``.
+
+        :returns: dict with the ``search`` query parameter, empty if there
+            is nothing to filter on.
+        """
+        raw = [kwargs.pop("search")] if "search" in kwargs else []
+        query = Q(**kwargs)
+        for arg in args:
+            if isinstance(arg, Q):
+                query = query & arg
+            else:
+                raw.append(arg)
+        if not raw:
+            return {"search": query.to_search()} if query else {}
+        if len(raw) == 1 and not query:
+            return {"search": to_search(raw[0])}
+        searches = [json.loads(i) if isinstance(i, str) else i for i in raw]
+        if query:
+            searches.append(query.compile())
+        return {"search": to_search({"$and": searches})}
+
 
 class DetailEndpoint:
     """Enables read/write operations on detail endpoints.
@@ -403,11 +662,14 @@ class DetailEndpoint:
     def __init__(self, parent_obj, name, custom_return=None):
         self.parent_obj = parent_obj
         self.custom_return = custom_return
+        self.prefetched = None
         self.url = "{}/{}/{}/".format(parent_obj.endpoint.url, parent_obj.id, name)
-        self.request_kwargs = dict(
+
+    @property
+    def request_kwargs(self):
+        return dict(
             base=self.url,
-            token=parent_obj.api.token,
-            http_session=parent_obj.api.http_session,
+            **self.parent_obj.endpoint._request_kwargs(),
         )
 
     def list(self, **kwargs):
@@ -423,6 +685,9 @@ class DetailEndpoint:
         :returns: A :py:class:`.Record` object or list of :py:class:`.Record` objects created
             from data retrieved from NetBox.
         """
+        if self.prefetched is not None and not kwargs:
+            # Fetched along with other parents by Endpoint.fetch_children()
+            return self.prefetched
         req = Request(**self.request_kwargs).get(add_params=kwargs)
 
         if self.custom_return:
@@ -467,3 +732,70 @@ class DetailEndpoint:
 class RODetailEndpoint(DetailEndpoint):
     def create(self, data):
         raise NotImplementedError("Writes are not supported for this endpoint.")
+
+
+def _field_values(record, path):
+    """Returns the values at the dotted ``path`` of a record, following
+    lists (``hosts.id`` of a service linked to several hosts)."""
+    values = [record]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            value = getattr(value, part, None)
+            if isinstance(value, list):
+                found.extend(value)
+            elif value is not None:
+                found.append(value)
+        values = found
+    return values
+
+
+class SubResource:
+    """Declares a sub-resource of a model.
+
+    Accessing the attribute on a record returns a
+    :py:class:`DetailEndpoint` on ``<record url>/<name>``, or the
+    children already fetched by :py:meth:`.Endpoint.fetch_children`.
+
+    :arg str,optional name: Name of the detail route, the attribute name
+        by default.
+    :arg Record,optional model: Record class of the children,
+        :py:class:`.Record` by default.
+    :arg str,optional endpoint: Endpoint of the same app listing the
+        children, used by :py:meth:`.Endpoint.fetch_children`.
+    :arg str,optional parent_field: Dotted field of the children
+        referencing the parent id on ``endpoint``.
+    :arg bool,optional read_only: Whether children can be created.
+
+    :Examples:
+
+    >>> class Hosts(Record):
+    ...     services = SubResource(endpoint="services", parent_field="host.id")
+    """
+
+    _sub_resource = True
+
+    def __init__(
+        self, name=None, model=None, endpoint=None, parent_field=None, read_only=True
+    ):
+        self.name = name
+        self.model = model
+        self.endpoint = endpoint
+        self.parent_field = parent_field
+        self.read_only = read_only
+
+    def __set_name__(self, owner, attr):
+        self.attr = attr
+        if self.name is None:
+            self.name = attr
+
+    def attach(self, parent, children):
+        parent.__dict__.setdefault("_prefetched", {})[self.attr] = children
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        cls = RODetailEndpoint if self.read_only else DetailEndpoint
+        detail = cls(obj, self.name, custom_return=self.model or Record)
+        detail.prefetched = obj.__dict__.get("_prefetched", {}).get(self.attr)
+        return detail
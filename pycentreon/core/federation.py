@@ -0,0 +1,211 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import queue
+import threading
+from collections import namedtuple
+
+APPS = ("administration", "configuration", "gorgone", "monitoring", "platform", "users")
+
+FederatedResult = namedtuple("FederatedResult", ["central", "record"])
+
+
+class FederatedResponse(dict):
+    """Dict of per-central results returned by :py:meth:`.FederatedEndpoint.get`
+    and :py:meth:`.FederatedEndpoint.count`.
+
+    Centrals that failed are missing from the dict and listed in
+    ``errors`` with the exception they raised.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.errors = {}
+
+
+class Federation:
+    """Runs the same query against several Centreon centrals at once.
+
+    Wraps one :py:class:`.Api` per central and exposes the same apps and
+    endpoints. Listing methods return a :py:class:`.FederatedRecordSet`
+    that streams :py:class:`FederatedResult` tuples ``(central, record)``
+    as soon as any central returns them.
+
+    :arg dict apis: Mapping of central name to :py:class:`.Api`.
+    :arg int,optional workers: Number of centrals queried at the same
+        time. Defaults to the number of centrals.
+    :arg int,optional buffer_size: Records buffered before slow consumers
+        pause the centrals.
+
+    :Examples:
+
+    >>> fed = pycentreon.federation({
+    ...     "paris": pycentreon.api(paris_url, token=paris_token),
+    ...     "lyon": pycentreon.api(lyon_url, token=lyon_token),
+    ... })
+    >>> hosts = fed.monitoring.hosts.all()
+    >>> for central, host in hosts:
+    ...     print(central, host.name)
+    ...
+    lyon host-1
+    paris host-2
+    >>> hosts.errors
+    {}
+    >>> fed.configuration.hosts.count()
+    {'paris': 1200, 'lyon': 830}
+    """
+
+    def __init__(self, apis, workers=None, buffer_size=1000):
+        if not apis:
+            raise ValueError("Federation requires at least one Api.")
+        self.apis = dict(apis)
+        self.workers = workers or len(self.apis)
+        self.buffer_size = buffer_size
+
+    def __getattr__(self, name):
+        if name in APPS:
+            return FederatedApp(self, name)
+        raise AttributeError('object has no attribute "{}"'.format(name))
+
+    def _map(self, call):
+        """Calls ``call(api)`` on every central and gathers the results."""
+        ret = FederatedResponse()
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(call, api): central
+                for central, api in self.apis.items()
+            }
+            for future in cf.as_completed(futures):
+                central = futures[future]
+                try:
+                    ret[central] = future.result()
+                except Exception as e:
+                    ret.errors[central] = e
+        return ret
+
+
+class FederatedApp:
+    def __init__(self, federation, name):
+        self.federation = federation
+        self.name = name
+
+    def __getattr__(self, name):
+        return FederatedEndpoint(self.federation, self.name, name)
+
+
+class FederatedEndpoint:
+    """Federated counterpart of :py:class:`.Endpoint`.
+
+    Every method accepts the same arguments as the matching
+    :py:class:`.Endpoint` method.
+    """
+
+    def __init__(self, federation, app_name, name):
+        self.federation = federation
+        self.app_name = app_name
+        self.name = name
+
+    def _endpoint(self, api):
+        return getattr(getattr(api, self.app_name), self.name)
+
+    def all(self, *args, **kwargs):
+        return FederatedRecordSet(
+            self.federation,
+            lambda api: self._endpoint(api).all(*args, **kwargs),
+        )
+
+    def filter(self, *args, **kwargs):
+        return FederatedRecordSet(
+            self.federation,
+            lambda api: self._endpoint(api).filter(*args, **kwargs),
+        )
+
+    def get(self, *args, **kwargs):
+        """Returns a :py:class:`FederatedResponse` of central to
+        :py:class:`.Record` (or None)."""
+        return self.federation._map(
+            lambda api: self._endpoint(api).get(*args, **kwargs)
+        )
+
+    def count(self, *args, **kwargs):
+        """Returns a :py:class:`FederatedResponse` of central to count.
+        The sum over all centrals is ``sum(ret.values())``."""
+        return self.federation._map(
+            lambda api: self._endpoint(api).count(*args, **kwargs)
+        )
+
+
+class FederatedRecordSet:
+    """Iterator merging the :py:class:`.RecordSet` of every central.
+
+    Yields :py:class:`FederatedResult` tuples in arrival order. A central
+    that fails does not stop the others, its exception is stored in
+    ``errors`` once the iteration reaches it.
+    """
+
+    _DONE = object()
+
+    def __init__(self, federation, listing):
+        self.federation = federation
+        self.listing = listing
+        self.errors = {}
+        self._iter = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iter is None:
+            self._iter = self._stream()
+        return next(self._iter)
+
+    def _produce(self, central, api, out, stop):
+        def put(item):
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for record in self.listing(api):
+                if not put((central, record, None)):
+                    return
+        except Exception as e:
+            put((central, self._DONE, e))
+            return
+        put((central, self._DONE, None))
+
+    def _stream(self):
+        federation = self.federation
+        out = queue.Queue(maxsize=federation.buffer_size)
+        stop = threading.Event()
+        executor = cf.ThreadPoolExecutor(max_workers=federation.workers)
+        try:
+            for central, api in federation.apis.items():
+                executor.submit(self._produce, central, api, out, stop)
+            pending = len(federation.apis)
+            while pending:
+                central, record, error = out.get()
+                if record is self._DONE:
+                    pending -= 1
+                    if error is not None:
+                        self.errors[central] = error
+                    continue
+                yield FederatedResult(central, record)
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
@@ -0,0 +1,282 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import json
+import threading
+import time
+
+import requests
+
+from pycentreon.core.query import Request, RequestError
+from pycentreon.core.response import Record
+
+# Gorgone log codes
+ACTION_BEGIN = 0
+ACTION_FINISH_KO = 1
+ACTION_FINISH_OK = 2
+ACTION_STARTED = 3
+ACTION_CONTINUE = 5
+FINISHED = (ACTION_FINISH_KO, ACTION_FINISH_OK)
+
+
+class GorgoneResult:
+    """Outcome of a command run by Gorgone on a node.
+
+    ``ok`` is None when no result came before the timeout. ``logs`` are
+    the log entries of the token, their ``data`` decoded when it is
+    JSON.
+    """
+
+    __slots__ = ("node_id", "token", "ok", "code", "logs", "elapsed")
+
+    def __init__(self, node_id, token, ok, code, logs, elapsed):
+        self.node_id = node_id
+        self.token = token
+        self.ok = ok
+        self.code = code
+        self.logs = logs
+        self.elapsed = elapsed
+
+    @property
+    def output(self):
+        """Outputs of the commands, from the final log entry."""
+        ret = []
+        for log in self.logs:
+            if log.get("code") in FINISHED and isinstance(log.get("data"), dict):
+                result = log["data"].get("result")
+                if isinstance(result, dict) and "stdout" in result:
+                    ret.append(result["stdout"])
+        return "\n".join(ret)
+
+    def __repr__(self):
+        return "<GorgoneResult node {} {}>".format(
+            self.node_id, {True: "ok", False: "ko", None: "timeout"}[self.ok]
+        )
+
+
+class GorgoneClient:
+    """Runs commands on many nodes through the Gorgone REST API.
+
+    Commands are dispatched concurrently (``POST
+    /api/nodes/{id}/core/action/command``), each returning a token. A
+    single background thread then polls the logs of every pending token
+    (``GET /api/log/{token}``) in rounds, ``workers`` at a time. The
+    interval between rounds is halved down to ``min_interval`` when a
+    round saw commands finish and grows up to ``max_interval`` otherwise.
+    Each command resolves a future as soon as its final log arrives. A
+    command stays pending when reading its logs fails, its future only
+    fails after ``max_errors`` failures in a row or past its deadline.
+
+    :py:meth:`close` (or leaving a ``with`` block) stops the polling and
+    releases the threads and connections of the client.
+
+    :arg str url: Gorgone API URL, e.g. ``http://central:8085``.
+    :arg str,optional username: Gorgone API user, for basic auth.
+    :arg str,optional password: Gorgone API password.
+    :arg int,optional workers: Calls in flight.
+    :arg float,optional min_interval: Shortest seconds between two rounds.
+    :arg float,optional max_interval: Longest seconds between two rounds.
+    :arg int,optional max_errors: Failed log reads in a row failing a command.
+
+    :Examples:
+
+    >>> with ctn.gorgone_client("http://central:8085", "admin", secret) as gorgone:
+    ...     for result in gorgone.run(ctn.gorgone.pollers.all(), "df -h /var/lib"):
+    ...         print(result.node_id, result.ok, result.output)
+    """
+
+    def __init__(
+        self,
+        url,
+        username=None,
+        password=None,
+        workers=8,
+        min_interval=0.5,
+        max_interval=5.0,
+        max_errors=3,
+    ):
+        self.base_url = "{}/api".format(url.rstrip("/"))
+        self.http_session = requests.Session()
+        if username is not None:
+            self.http_session.auth = (username, password)
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.max_errors = max_errors
+        self._executor = cf.ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._closed = threading.Event()
+
+    def close(self):
+        """Stops polling and releases the threads and HTTP connections.
+
+        Futures of the commands still pending are cancelled.
+        """
+        with self._lock:
+            self._closed.set()
+            poller = self._poller
+        if poller is not None:
+            poller.join()
+        # Queued dispatches see the client closed and cancel their future
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for entry in pending.values():
+            entry[0].cancel()
+        self.http_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, path):
+        return Request(
+            base="{}/{}".format(self.base_url, path), http_session=self.http_session
+        )
+
+    def dispatch(self, node_id, command, timeout=30):
+        """Sends a command to a node and returns its Gorgone token.
+
+        :arg int node_id: Poller id.
+        :arg str|list command: Command line, or list of them.
+        :arg int,optional timeout: Seconds Gorgone lets each command run.
+        """
+        commands = [command] if isinstance(command, str) else command
+        ret = self._request("nodes/{}/core/action/command".format(node_id)).post(
+            [{"command": c, "timeout": timeout} for c in commands]
+        )
+        return ret["token"]
+
+    def logs(self, token):
+        """Returns the log entries of a token, empty while there are none."""
+        try:
+            ret = self._request("log/{}".format(token))._make_call()
+        except RequestError as e:
+            if getattr(e.req, "status_code", None) == 404:
+                return []
+            raise
+        if not isinstance(ret, dict) or ret.get("error") == "no_log":
+            return []
+        logs = ret.get("data") or []
+        for log in logs:
+            if isinstance(log.get("data"), str):
+                try:
+                    log["data"] = json.loads(log["data"])
+                except ValueError:
+                    pass
+        return logs
+
+    def submit(self, node, command, timeout=30):
+        """Dispatches a command and returns a future of its
+        :py:class:`GorgoneResult`.
+
+        :arg Record|int node: Poller Record or id.
+        :arg str|list command: Command line, or list of them.
+        :arg int,optional timeout: Seconds given to the command, the
+            future resolves with ``ok=None`` if it has not finished 30
+            seconds later.
+        """
+        node_id = node.id if isinstance(node, Record) else node
+        future = cf.Future()
+
+        def dispatch():
+            try:
+                token = self.dispatch(node_id, command, timeout)
+            except Exception as e:
+                future.set_exception(e)
+                return
+            with self._lock:
+                if self._closed.is_set():
+                    future.cancel()
+                    return
+                # future, node id, start, deadline, failed log reads in a row
+                self._pending[token] = [
+                    future, node_id, time.monotonic(), timeout + 30, 0
+                ]
+                if self._poller is None:
+                    self._poller = threading.Thread(target=self._poll, daemon=True)
+                    self._poller.start()
+
+        self._executor.submit(dispatch)
+        return future
+
+    def _check(self, token, node_id, started, deadline):
+        logs = self.logs(token)
+        codes = [log.get("code") for log in logs]
+        final = next((c for c in reversed(codes) if c in FINISHED), None)
+        elapsed = time.monotonic() - started
+        if final is not None:
+            return GorgoneResult(
+                node_id, token, final == ACTION_FINISH_OK, final, logs, elapsed
+            )
+        if elapsed > deadline:
+            code = codes[-1] if codes else None
+            return GorgoneResult(node_id, token, None, code, logs, elapsed)
+        return None
+
+    def _poll(self):
+        while True:
+            with self._lock:
+                if not self._pending or self._closed.is_set():
+                    self._poller = None
+                    return
+                pending = dict(self._pending)
+            done = 0
+            checks = {
+                token: self._executor.submit(self._check, token, *entry[1:4])
+                for token, entry in pending.items()
+            }
+            for token, check in checks.items():
+                entry = pending[token]
+                try:
+                    result = check.result()
+                except Exception as e:
+                    entry[4] += 1
+                    elapsed = time.monotonic() - entry[2]
+                    if entry[4] < self.max_errors and elapsed <= entry[3]:
+                        continue
+                    result = e
+                else:
+                    entry[4] = 0
+                    if result is None:
+                        continue
+                with self._lock:
+                    self._pending.pop(token, None)
+                if isinstance(result, Exception):
+                    entry[0].set_exception(result)
+                else:
+                    entry[0].set_result(result)
+                done += 1
+            if done:
+                self.interval = max(self.min_interval, self.interval / 2)
+            else:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+            self._closed.wait(self.interval)
+
+    def run(self, nodes, command, timeout=30):
+        """Runs a command on many nodes and yields each
+        :py:class:`GorgoneResult` as it completes.
+
+        :arg iterable nodes: Poller Records or ids.
+        :arg str|list command: Command line, or list of them.
+        :arg int,optional timeout: Seconds Gorgone lets each command run.
+        """
+        futures = [self.submit(node, command, timeout) for node in nodes]
+        for future in cf.as_completed(futures):
+            yield future.result()
@@ -0,0 +1,84 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import itertools
+import os
+
+from pycentreon.core.bulk import chunks
+
+# Api of a worker process, created by _init_worker()
+_worker_api = None
+
+
+def _init_worker(url, token):
+    global _worker_api
+    from pycentreon.core.api import Api
+
+    # Records unpickled in this process are bound to it
+    _worker_api = Api(url, token=token)
+
+
+def _apply(func, chunk):
+    return [func(record) for record in chunk]
+
+
+def process_map(func, records, chunk_size=500, workers=None):
+    """Maps ``func`` over records on a pool of processes.
+
+    Records are sent in chunks of ``chunk_size`` in their compact pickled
+    form (data and endpoint only). Each worker process creates an
+    :py:class:`.Api` on the same central with the current token, so
+    records can still make API calls there. At most two chunks per
+    worker are pending, the input is read as the results are consumed.
+
+    :arg callable func: A picklable (module-level) function taking a
+        :py:class:`.Record`.
+    :arg iterable records: Records, usually a :py:class:`.RecordSet`.
+    :arg int,optional chunk_size: Records per task.
+    :arg int,optional workers: Processes, ``os.cpu_count()`` by default.
+    :returns: Generator of the results, in the order of ``records``.
+
+    :Examples:
+
+    >>> from pycentreon.core.parallel import process_map
+    >>> def check(service):
+    ...     return service.id, compliant(service)
+    >>> failures = [
+    ...     i for i, ok in process_map(check, ctn.monitoring.services.all()) if not ok
+    ... ]
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return
+    records = itertools.chain([first], records)
+    workers = workers or os.cpu_count() or 1
+    url = first.api.base_url[: -len("/api/latest")]
+    with cf.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(url, first.api.token),
+    ) as executor:
+        pending = chunks(records, chunk_size)
+        window = [
+            executor.submit(_apply, func, chunk)
+            for chunk in itertools.islice(pending, workers * 2)
+        ]
+        while window:
+            future = window.pop(0)
+            nxt = next(pending, None)
+            if nxt is not None:
+                window.append(executor.submit(_apply, func, nxt))
+            for result in future.result():
+                yield result
@@ -0,0 +1,243 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import array
+import concurrent.futures as cf
+import math
+from collections import namedtuple
+
+from pycentreon.core.query import Request
+from pycentreon.core.response import Record
+from pycentreon.core.util import format_time, to_epoch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AGGREGATES = ("min", "max", "avg", "p95")
+
+ServicePerformance = namedtuple(
+    "ServicePerformance", ["host_id", "service_id", "times", "metrics", "units"]
+)
+ServicePerformance.__doc__ = """Performance data of a service.
+
+``times`` holds epoch seconds and ``metrics`` maps each metric name to
+its values, as NumPy float arrays when NumPy is installed and
+``array.array("d")`` otherwise. Missing values are NaN. ``units`` maps
+metric names to their unit.
+"""
+
+
+def _as_array(values):
+    if np is not None:
+        return np.asarray(values, dtype=float)
+    return array.array("d", values)
+
+
+def _service_ids(service):
+    if isinstance(service, tuple):
+        return service
+    if isinstance(service, Record):
+        parent = getattr(service, "host", None) or getattr(service, "parent", None)
+        return parent.id, service.id
+    raise ValueError(
+        "Services must be (host_id, service_id) tuples or Records - was {}".format(
+            type(service)
+        )
+    )
+
+
+def _windows(start, end, chunk):
+    if chunk is None:
+        return [(start, end)]
+    windows = []
+    while start < end:
+        windows.append((start, min(start + chunk, end)))
+        start += chunk
+    return windows
+
+
+def _percentile(values, q):
+    values = sorted(v for v in values if not math.isnan(v))
+    if not values:
+        return math.nan
+    rank = (len(values) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def downsample(times, values, step, aggregate="avg"):
+    """Aggregates a series in buckets of ``step`` seconds.
+
+    :arg times: Epoch seconds, sorted.
+    :arg values: Values matching ``times``, NaN for missing ones.
+    :arg float step: Bucket width in seconds.
+    :arg str aggregate: One of ``min``, ``max``, ``avg`` and ``p95``.
+    :returns: ``(times, values)``, times being the start of each bucket.
+    """
+    if aggregate not in AGGREGATES:
+        raise ValueError(
+            "aggregate must be one of {} - was {}".format(AGGREGATES, aggregate)
+        )
+    if not len(times):
+        return times, values
+    if np is not None:
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        buckets = np.floor((times - times[0]) / step)
+        keys, starts = np.unique(buckets, return_index=True)
+        out_times = times[0] + keys * step
+        if aggregate == "p95":
+            out = [
+                np.nanpercentile(v, 95) if np.any(~np.isnan(v)) else np.nan
+                for v in np.split(values, starts[1:])
+            ]
+            return out_times, np.asarray(out, dtype=float)
+        if aggregate == "min":
+            return out_times, np.fmin.reduceat(values, starts)
+        if aggregate == "max":
+            return out_times, np.fmax.reduceat(values, starts)
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        counts = np.add.reduceat(valid.astype(float), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return out_times, sums / counts
+
+    groups = {}
+    for t, v in zip(times, values):
+        groups.setdefault(math.floor((t - times[0]) / step), []).append(v)
+    out_times, out = array.array("d"), array.array("d")
+    for key in sorted(groups):
+        bucket = [v for v in groups[key] if not math.isnan(v)]
+        out_times.append(times[0] + key * step)
+        if not bucket:
+            out.append(math.nan)
+        elif aggregate == "min":
+            out.append(min(bucket))
+        elif aggregate == "max":
+            out.append(max(bucket))
+        elif aggregate == "avg":
+            out.append(sum(bucket) / len(bucket))
+        else:
+            out.append(_percentile(bucket, 0.95))
+    return out_times, out
+
+
+class PerformanceFetcher:
+    """Fetches the performance data of many services concurrently.
+
+    Each service is queried on
+    ``monitoring/hosts/{host_id}/services/{service_id}/metrics/performance``.
+    Long periods are split in ``chunk`` sized windows fetched in
+    parallel too, then stitched back in order.
+
+    :arg obj api: The :py:class:`.Api`.
+    :arg int,optional workers: Calls in flight, defaults to ``Api.max_workers``.
+    """
+
+    def __init__(self, api, workers=None):
+        self.api = api
+        self.workers = workers or api.max_workers
+
+    def _fetch(self, host_id, service_id, start, end):
+        hosts = self.api.monitoring.hosts
+        req = Request(
+            base="{}/{}/services/{}/metrics/performance".format(
+                hosts.url, host_id, service_id
+            ),
+            **self.api.monitoring.services._request_kwargs()
+        )
+        return next(
+            req.get(
+                add_params={
+                    "start_date": format_time(start),
+                    "end_date": format_time(end),
+                }
+            )
+        )
+
+    @staticmethod
+    def _merge(host_id, service_id, pages, step, aggregate):
+        times, metrics, units = [], {}, {}
+        for page in pages:
+            page_times = [to_epoch(t) for t in page.get("times", [])]
+            # Consecutive windows share their boundary
+            skip = 0
+            while skip < len(page_times) and times and page_times[skip] <= times[-1]:
+                skip += 1
+            offset = len(times)
+            times.extend(page_times[skip:])
+            for metric in page.get("metrics", []):
+                name = metric.get("metric_legend") or metric.get("metric")
+                units[name] = metric.get("unit")
+                series = metrics.setdefault(name, [])
+                series.extend([math.nan] * (offset - len(series)))
+                values = [math.nan if v is None else float(v) for v in metric["data"]]
+                # Fill the gaps of the previous window on shared points
+                for i, v in enumerate(values[:skip]):
+                    j = offset - skip + i
+                    if j >= 0 and math.isnan(series[j]):
+                        series[j] = v
+                series.extend(values[skip:])
+        for series in metrics.values():
+            series.extend([math.nan] * (len(times) - len(series)))
+
+        out_times = _as_array(times)
+        out = {name: _as_array(series) for name, series in metrics.items()}
+        if step:
+            for name in out:
+                new_times, out[name] = downsample(
+                    out_times, out[name], step, aggregate
+                )
+            if out:
+                out_times = new_times
+        return ServicePerformance(host_id, service_id, out_times, out, units)
+
+    def fetch(self, services, start, end, chunk=None, step=None, aggregate="avg"):
+        """Returns the :py:class:`ServicePerformance` of each service.
+
+        :arg iterable services: Service Records or ``(host_id, service_id)``
+            tuples.
+        :arg datetime start: Start of the period.
+        :arg datetime end: End of the period.
+        :arg timedelta,optional chunk: Split the period in windows of this
+            length, fetched concurrently.
+        :arg float,optional step: Downsample the series in buckets of
+            ``step`` seconds.
+        :arg str,optional aggregate: How buckets are aggregated: ``min``,
+            ``max``, ``avg`` or ``p95``.
+        :returns: list of :py:class:`ServicePerformance` in the order of
+            ``services``.
+        """
+        ids = [_service_ids(s) for s in services]
+        windows = _windows(start, end, chunk)
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                [
+                    executor.submit(self._fetch, host_id, service_id, w_start, w_end)
+                    for w_start, w_end in windows
+                ]
+                for host_id, service_id in ids
+            ]
+            return [
+                self._merge(
+                    host_id,
+                    service_id,
+                    [f.result() for f in service_futures],
+                    step,
+                    aggregate,
+                )
+                for (host_id, service_id), service_futures in zip(ids, futures)
+            ]
@@ -0,0 +1,255 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from collections import namedtuple
+
+from pycentreon.core.bulk import BulkResult, run_chunked
+from pycentreon.core.response import Record
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+_MISSING = object()
+
+Change = namedtuple("Change", ["action", "endpoint", "key", "record", "data"])
+Change.__doc__ = """A change of a :py:class:`Plan`.
+
+``action`` is ``create``, ``update`` or ``delete``. ``record`` is the
+current :py:class:`.Record` (None for creates) and ``data`` the payload
+sent: the desired object for creates, the id and changed fields for
+updates, None for deletes.
+"""
+
+
+def _lookup(obj, path):
+    for part in path.split("."):
+        if isinstance(obj, dict):
+            obj = obj.get(part, _MISSING)
+        else:
+            obj = getattr(obj, part, _MISSING)
+        if obj is _MISSING:
+            return _MISSING
+    return obj
+
+
+def _normalize(value):
+    if isinstance(value, Record):
+        return dict(value)
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _matches(current, desired):
+    """Whether ``current`` already satisfies ``desired``.
+
+    Dicts only need the desired keys to match, and a scalar matches a
+    nested object (or a list of one) with the same ``id``.
+    """
+    current = _normalize(current)
+    if isinstance(desired, dict):
+        return isinstance(current, dict) and all(
+            _matches(current.get(k, _MISSING), v) for k, v in desired.items()
+        )
+    if isinstance(desired, list):
+        return (
+            isinstance(current, list)
+            and len(current) == len(desired)
+            and all(any(_matches(c, d) for c in current) for d in desired)
+        )
+    if isinstance(current, list) and len(current) == 1:
+        current = current[0]
+    if isinstance(current, dict):
+        return current.get("id", _MISSING) == desired
+    return current == desired
+
+
+class Plan(list):
+    """List of :py:class:`Change` in the order they are applied."""
+
+    @property
+    def creates(self):
+        return [c for c in self if c.action == CREATE]
+
+    @property
+    def updates(self):
+        return [c for c in self if c.action == UPDATE]
+
+    @property
+    def deletes(self):
+        return [c for c in self if c.action == DELETE]
+
+    def __str__(self):
+        return "{} to create, {} to update, {} to delete".format(
+            len(self.creates), len(self.updates), len(self.deletes)
+        )
+
+    def apply(self, chunk_size=100, workers=4):
+        """Runs the plan through chunked bulk calls.
+
+        Changes of an endpoint are sent together, endpoints one after
+        the other in the plan order, deletes last and in reverse order
+        so that dependents go before what they depend on.
+
+        :arg int,optional chunk_size: Objects per call.
+        :arg int,optional workers: Calls in flight per endpoint.
+        :returns: dict of ``create``, ``update`` and ``delete`` to a
+            :py:class:`.BulkResult` of :py:class:`Change`.
+        """
+        senders = {
+            CREATE: lambda ep, chunk: ep.create([c.data for c in chunk]),
+            UPDATE: lambda ep, chunk: ep.update([c.data for c in chunk]),
+            DELETE: lambda ep, chunk: ep.delete([c.record for c in chunk]),
+        }
+        results = {action: BulkResult() for action in senders}
+        groups = []
+        for change in self:
+            if not groups or groups[-1][:2] != (change.action, change.endpoint):
+                groups.append((change.action, change.endpoint, []))
+            groups[-1][2].append(change)
+        for action, endpoint, changes in groups:
+            results[action].extend(
+                run_chunked(
+                    changes,
+                    lambda chunk, ep=endpoint, send=senders[action]: send(ep, chunk),
+                    chunk_size=chunk_size,
+                    workers=workers,
+                )
+            )
+        return results
+
+
+class Planner:
+    """Computes the changes bringing endpoints to a desired state.
+
+    The current state of each endpoint is read with a single listing and
+    indexed by key, desired objects are compared field by field with the
+    records locally. Only the fields that differ are sent, so a run with
+    nothing to change costs one listing per endpoint.
+
+    Endpoints are added in dependency order (hosts before services).
+
+    :arg obj api: The :py:class:`.Api`.
+
+    :Examples:
+
+    >>> planner = ctn.planner()
+    >>> planner.add(
+    ...     ctn.configuration.hosts,
+    ...     [{"name": "DC1ESX01", "address": "10.0.0.1", "monitoring_server_id": 1}],
+    ...     key="name",
+    ...     compare_as={"monitoring_server_id": "monitoring_server.id"},
+    ... )
+    >>> plan = planner.plan()
+    >>> print(plan)
+    0 to create, 1 to update, 0 to delete
+    >>> plan.apply()
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.specs = []
+
+    def add(self, endpoint, desired, key="name", compare_as=None, prune=False, scope=None):
+        r"""Adds the desired objects of an endpoint.
+
+        :arg obj endpoint: The :py:class:`.Endpoint`.
+        :arg iterable desired: Desired objects, as dicts.
+        :arg str|tuple|callable,optional key: Dotted field(s) identifying
+            an object, or a callable taking a desired dict or a record.
+        :arg dict,optional compare_as: Desired field => dotted field of the
+            records holding its current value, for fields named
+            differently on writes and reads. Also applies to ``key``.
+        :arg bool,optional prune: Delete the records of ``scope`` that are
+            not desired.
+        :arg dict,optional scope: Filters of the listing of current
+            records, as in :py:meth:`.Endpoint.filter`.
+        :returns: self
+        """
+        self.specs.append(
+            (endpoint, list(desired), key, compare_as or {}, prune, scope or {})
+        )
+        return self
+
+    @staticmethod
+    def _key(obj, key, compare_as, current):
+        if callable(key):
+            return key(obj)
+        paths = key if isinstance(key, tuple) else (key,)
+        values = []
+        for path in paths:
+            value = _lookup(obj, compare_as.get(path, path) if current else path)
+            if isinstance(value, Record):
+                value = value.id
+            elif isinstance(value, list):
+                value = tuple(v.id if isinstance(v, Record) else v for v in value)
+                if len(value) == 1:
+                    # An object linked to a single other one, e.g. service => host
+                    value = value[0]
+            values.append(value)
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def _diff(self, endpoint, desired, key, compare_as, prune, scope):
+        changes, deletes = [], []
+        current = {}
+        for r in endpoint.filter(**scope):
+            k = self._key(r, key, compare_as, True)
+            if k in current:
+                raise ValueError(
+                    "{} records {} and {} have the same key {!r}".format(
+                        endpoint.name, current[k].id, r.id, k
+                    )
+                )
+            current[k] = r
+        seen = set()
+        for obj in desired:
+            k = self._key(obj, key, compare_as, False)
+            if k in seen:
+                raise ValueError(
+                    "Several desired {} have the key {!r}".format(endpoint.name, k)
+                )
+            seen.add(k)
+            record = current.get(k)
+            if record is None:
+                changes.append(Change(CREATE, endpoint, k, None, obj))
+                continue
+            data = {}
+            for field, value in obj.items():
+                path = compare_as.get(field, field)
+                if not _matches(_lookup(record, path), value):
+                    data[field] = value
+            if data:
+                changes.append(Change(UPDATE, endpoint, k, record, dict(data, id=record.id)))
+        if prune:
+            deletes = [
+                Change(DELETE, endpoint, k, r, None)
+                for k, r in current.items()
+                if k not in seen
+            ]
+        return changes, deletes
+
+    def plan(self):
+        """Reads the current state and returns the :py:class:`Plan`.
+
+        :raises ValueError: if several current records, or several desired
+            objects, of an endpoint have the same key.
+        """
+        plan, deletes = Plan(), []
+        for spec in self.specs:
+            changes, spec_deletes = self._diff(*spec)
+            plan.extend(changes)
+            deletes.append(spec_deletes)
+        for spec_deletes in reversed(deletes):
+            plan.extend(spec_deletes)
+        return plan
@@ -16,9 +16,45 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import concurrent.futures as cf
+import gzip
+import itertools
 import json
+import queue
+import threading
 from packaging import version
 
+from pycentreon.core.search import to_search
+from pycentreon.core.transport import RequestsTransport
+
+try:
+    import brotli  # noqa: F401
+except ImportError:
+    try:
+        import brotlicffi as brotli  # noqa: F401
+    except ImportError:
+        brotli = None
+
+# Brotli responses can only be decoded when a brotli module is installed
+ACCEPT_ENCODING = "gzip, br" if brotli is not None else "gzip, deflate"
+
+
+def _wire_size(resp):
+    """Returns the number of response body bytes read from the network,
+    before content decoding."""
+    wire_size = getattr(resp, "wire_size", None)
+    if wire_size is not None:
+        return wire_size
+    raw = getattr(resp, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    try:
+        return int(resp.headers["Content-Length"])
+    except (KeyError, TypeError, ValueError):
+        return len(resp.content)
+
 
 class RequestError(Exception):
     """Basic Request Exception
@@ -103,6 +139,35 @@ class ContentError(Exception):
         return self.error
 
 
+class CircuitOpenError(Exception):
+    """Circuit Open Exception
+
+    Raised without contacting Centreon when the circuit breaker of the
+    requested endpoint is open, after too many failed calls in a row.
+
+    :Example:
+
+    >>> try:
+    ...   hosts = list(ctn.monitoring.hosts.all())
+    ... except pycentreon.CircuitOpenError as e:
+    ...   print(e.key, e.retry_after)
+
+    """
+
+    def __init__(self, key, retry_after=0.0):
+        super().__init__(key)
+        self.key = key
+        self.retry_after = retry_after
+        self.error = (
+            "The circuit breaker for {} is open, retry in {:.1f}s.".format(
+                key, retry_after
+            )
+        )
+
+    def __str__(self):
+        return self.error
+
+
 class Request:
     def __init__(
         self,
@@ -112,8 +177,16 @@ class Request:
         limit=None,
         page=None,
         sort_by=None,
+        keyset=None,
+        after=None,
         key=None,
         token=None,
+        breaker=None,
+        auth=None,
+        singleflight=None,
+        transport=None,
+        compress_min_size=None,
+        stats=None,
     ):
         """_summary_
 
@@ -124,8 +197,26 @@ class Request:
             limit (_type_, optional): _description_. Defaults to None.
             page (_type_, optional): _description_. Defaults to None.
             sort_by (_type_, optional): _description_. Defaults to None.
+            keyset (int, optional): Lists by pages of this size sorted by
+                id, each page asking for ids greater than the last one
+                instead of a page number. Defaults to None.
+            after (int, optional): With ``keyset``, only list ids greater
+                than this one; updated with the last id yielded so that
+                the listing can be resumed. Defaults to None.
             key (_type_, optional): _description_. Defaults to None.
             token (_type_, optional): _description_. Defaults to None.
+            breaker (CircuitBreaker, optional): Breaker of the endpoint,
+                calls fail fast while it is open. Defaults to None.
+            auth (TokenManager, optional): Renews ``token`` and retries
+                once when Centreon answers 401. Defaults to None.
+            singleflight (SingleFlight, optional): Shares the response of
+                identical GET requests running concurrently. Defaults to None.
+            transport (Transport, optional): Sends the HTTP requests.
+                Defaults to a RequestsTransport on ``http_session``.
+            compress_min_size (int, optional): Request bodies of at least
+                this many bytes are sent gzip-compressed. Defaults to None.
+            stats (TransferStats, optional): Accumulates the byte counters
+                of this request. Defaults to None.
         """
         self.base = self.normalize_url(base)
         self.filters = filters or None
@@ -136,6 +227,22 @@ class Request:
         self.limit = limit
         self.page = page
         self.sort_by = sort_by
+        self.keyset = keyset
+        self.after = after
+        self.breaker = breaker
+        self.auth = auth
+        self.singleflight = singleflight
+        self.transport = (
+            transport if transport is not None else RequestsTransport(http_session)
+        )
+        self.compress_min_size = compress_min_size
+        self.stats = stats
+        # Pages and sub-queries of a request may be sent from several threads
+        self._counters_lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_sent_wire = 0
+        self.bytes_received = 0
+        self.bytes_received_wire = 0
 
     def normalize_url(self, url):
         """Builds a url for POST actions."""
@@ -144,25 +251,92 @@ class Request:
 
         return url
 
-    def _make_call(self, verb="get", url_override=None, add_params=None, data=None):
+    def _send(self, verb, url, headers, params, body, body_size=0):
+        if self.token:
+            headers["X-AUTH-TOKEN"] = "{}".format(self.token)
+
+        if self.breaker is not None:
+            self.breaker.before_call()
+        try:
+            req = self.transport.request(
+                verb, url, headers=headers, params=params, data=body
+            )
+        except Exception:
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        if self.breaker is not None:
+            if req.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+        sent = body_size if body is not None else 0
+        sent_wire = len(body) if body is not None else 0
+        received = len(req.content)
+        received_wire = _wire_size(req)
+        with self._counters_lock:
+            self.bytes_sent += sent
+            self.bytes_sent_wire += sent_wire
+            self.bytes_received += received
+            self.bytes_received_wire += received_wire
+        if self.stats is not None:
+            self.stats.record(sent, sent_wire, received, received_wire)
+        return req
+
+    def _encode(self, data, headers):
+        """Serializes ``data`` to JSON, gzip-compressing it when it
+        reaches ``compress_min_size``.
+
+        :returns: tuple of the body sent and its size before compression.
+        """
+        if data is None:
+            return None, 0
+        body = json.dumps(data).encode("utf-8")
+        size = len(body)
+        headers["Content-Type"] = "application/json"
+        if self.compress_min_size is not None and size >= self.compress_min_size:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        return body, size
+
+    def _make_call(
+        self, verb="get", url_override=None, add_params=None, data=None, raw=False
+    ):
         if verb in ("post", "put") or verb == "delete" and data:
             headers = {"Content-Type": "application/json"}
         else:
             headers = {"accept": "application/json"}
-
-        if self.token:
-            headers["X-AUTH-TOKEN"] = "{}".format(self.token)
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
 
         params = {}
         if not url_override:
             if self.filters:
                 params.update(self.filters)
+            if self.sort_by:
+                params["sort_by"] = json.dumps(self.sort_by)
             if add_params:
                 params.update(add_params)
 
-        req = getattr(self.http_session, verb)(
-            url_override or self.url, headers=headers, params=params, json=data
-        )
+        url = url_override or self.url
+        if verb == "get" and self.singleflight is not None:
+            key = (url, json.dumps(params, sort_keys=True, default=str), self.token, raw)
+            return self.singleflight.do(
+                key, lambda: self._call(verb, url, headers, params, None, raw)
+            )
+        body, body_size = self._encode(data, headers)
+        return self._call(verb, url, headers, params, body, raw, body_size)
+
+    def _call(self, verb, url, headers, params, body, raw=False, body_size=0):
+        req = self._send(verb, url, headers, params, body, body_size)
+        if (
+            req.status_code == 401
+            and self.auth is not None
+            and self.auth.can_refresh
+        ):
+            # The token expired or was revoked, log in again and retry once
+            self.token = self.auth.refresh(self.token)
+            req = self._send(verb, url, headers, params, body, body_size)
 
         if req.status_code == 409 and verb == "post":
             raise AllocationError(req)
@@ -171,6 +345,11 @@ class Request:
                 return True
             else:
                 raise RequestError(req)
+        elif req.status_code == 204:
+            # Actions such as acknowledgements return no content
+            return True
+        elif req.ok and raw:
+            return req.content
         elif req.ok:
             try:
                 return req.json()
@@ -180,6 +359,9 @@ class Request:
             raise RequestError(req)
 
     def get(self, add_params=None):
+        if self.keyset and not add_params:
+            yield from self._get_keyset()
+            return
         if not add_params and ((self.limit is not None) or (self.page is not None)):
             add_params = {}
             if (self.limit is not None) and isinstance(self.limit,str):
@@ -210,6 +392,63 @@ class Request:
             self.count = len(req)
             yield req
 
+    def _get_keyset(self):
+        """Yields the listing by pages of ``keyset`` records sorted by id.
+
+        Each page asks for the ids greater than the last one returned
+        (``{"id": {"$gt": last_id}}`` and-ed with the filters), so every
+        page costs the same to the database, unlike deep page numbers.
+        """
+        search = (self.filters or {}).get("search")
+        base = [json.loads(search)] if search else []
+        while True:
+            searches = list(base)
+            if self.after is not None:
+                searches.append({"id": {"$gt": self.after}})
+            params = {"limit": self.keyset, "sort_by": json.dumps({"id": "ASC"})}
+            if len(searches) == 1:
+                params["search"] = to_search(searches[0])
+            elif searches:
+                params["search"] = to_search({"$and": searches})
+            req = self._make_call(add_params=params)
+            if not hasattr(self, "count"):
+                self.count = req["meta"]["total"]
+            for i in req["result"]:
+                self.after = i["id"]
+                yield i
+            if len(req["result"]) < self.keyset:
+                return
+
+    def get_pages(self, page_size, workers=4):
+        """Yields the raw body of each page of the listing, in order.
+
+        The total is asked first (``limit=0``), then the pages are
+        fetched ``workers`` at a time while the previous ones are
+        consumed. Bodies are left undecoded for :py:class:`.PageDecoder`.
+
+        :arg int page_size: Records per page.
+        :arg int,optional workers: Pages fetched concurrently.
+        :returns: Generator of bytes.
+        """
+        pages = range(1, -(-self.get_count() // page_size) + 1)
+
+        def fetch(page):
+            return self._make_call(
+                add_params={"limit": page_size, "page": page}, raw=True
+            )
+
+        with cf.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = iter(pages)
+            window = [
+                executor.submit(fetch, p) for p in itertools.islice(pending, workers)
+            ]
+            while window:
+                future = window.pop(0)
+                nxt = next(pending, None)
+                if nxt is not None:
+                    window.append(executor.submit(fetch, nxt))
+                yield future.result()
+
     def put(self, data):
         """Makes PUT request.
 
@@ -281,8 +520,8 @@ class Request:
     def get_count(self, *args, **kwargs):
         """Returns object count for query
 
-        Makes a query to the endpoint with ``limit=1`` set and only
-        returns the value of the "count" field.
+        Makes a query to the endpoint with ``limit=0`` set and only
+        returns the value of the "meta.total" field.
 
         :raises: RequestError if req.ok returns false.
         :raises: ContentError if response is not json.
@@ -293,3 +532,112 @@ class Request:
         if not hasattr(self, "count"):
             self.count = self._make_call(add_params={"limit": 0})["meta"].get("total", 0)
         return self.count
+
+    def exists(self):
+        """Returns whether the query matches at least one object.
+
+        Makes a query to the endpoint with ``limit=1`` set.
+
+        :raises: RequestError if req.ok returns false.
+        :raises: ContentError if response is not json.
+
+        :returns: bool
+        """
+        return bool(self._make_call(add_params={"limit": 1}).get("result"))
+
+
+class _End:
+    """Marks the end of a sub-query stream, with its error if any."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+class MultiRequest:
+    """Runs several :py:class:`Request` concurrently as a single result set.
+
+    Used when a query has to be split in several sub-queries. Results
+    are yielded sub-query after sub-query as they arrive, while up to
+    ``workers`` sub-queries are fetched in the background, each keeping
+    at most ``buffer`` results ahead of the consumer. As sub-queries can
+    overlap, ``dedupe`` tells :py:class:`.RecordSet` to drop records it
+    already returned.
+
+    :arg list requests: The :py:class:`Request` objects to run.
+    :arg int,optional workers: Number of sub-queries fetched concurrently.
+    :arg bool,optional dedupe: Whether results may overlap.
+    :arg int,optional buffer: Results kept per sub-query until consumed.
+    """
+
+    def __init__(self, requests, workers=4, dedupe=True, buffer=1000):
+        self.requests = requests
+        self.workers = workers
+        self.dedupe = dedupe
+        self.buffer = buffer
+
+    @property
+    def count(self):
+        return self.get_count()
+
+    @staticmethod
+    def _put(out, item, stop):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _stream(self, request, out, stop):
+        if stop.is_set():
+            return
+        try:
+            for i in request.get():
+                if not self._put(out, i, stop):
+                    return
+        except Exception as e:
+            self._put(out, _End(e), stop)
+        else:
+            self._put(out, _End(), stop)
+
+    def get(self):
+        stop = threading.Event()
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+            def start(request):
+                out = queue.Queue(maxsize=self.buffer)
+                executor.submit(self._stream, request, out, stop)
+                return out
+
+            pending = iter(self.requests)
+            window = [start(r) for r in itertools.islice(pending, self.workers)]
+            try:
+                while window:
+                    out = window.pop(0)
+                    nxt = next(pending, None)
+                    if nxt is not None:
+                        window.append(start(nxt))
+                    while True:
+                        item = out.get()
+                        if isinstance(item, _End):
+                            if item.error is not None:
+                                raise item.error
+                            break
+                        yield item
+            finally:
+                # Stops the sub-queries when the consumer stops early
+                stop.set()
+
+    def get_count(self, *args, **kwargs):
+        """Returns the sum of the sub-queries counts.
+
+        This is an upper bound of the number of records when the
+        sub-queries overlap.
+        """
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return sum(executor.map(lambda r: r.get_count(), self.requests))
+
+    def exists(self):
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return any(executor.map(lambda r: r.exists(), self.requests))
@@ -16,6 +16,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import copy
+import itertools
+import os
+import weakref
 from collections import OrderedDict
 
 import pycentreon.core.app
@@ -27,6 +30,62 @@ from pycentreon.core.util import Hashabledict
 # List of fields that are lists but should be treated as sets.
 LIST_AS_SET = ("tags", "tagged_vlans")
 
+# base_url => Api, used to bind records unpickled in another process
+_APIS = weakref.WeakValueDictionary()
+# Process-unique key => Api, used to bind records unpickled in the
+# process that pickled them back to their own Api
+_ORIGINS = weakref.WeakValueDictionary()
+_ORIGIN_KEYS = itertools.count()
+# Token-less Api created for records unpickled without a registered one
+_DETACHED = {}
+
+
+def register_api(api):
+    """Binds the records unpickled for ``api.base_url`` to ``api``.
+
+    Every :py:class:`.Api` registers itself when created, so this is
+    only needed to choose between several Api of the same central.
+    """
+    _APIS[api.base_url] = api
+    if "_origin_key" not in api.__dict__:
+        api._origin_key = next(_ORIGIN_KEYS)
+        _ORIGINS[api._origin_key] = api
+
+
+def _origin(api):
+    return os.getpid(), api.__dict__.get("_origin_key")
+
+
+def _bound_api(base_url, origin=None):
+    # In the process that pickled the record only its own Api is used:
+    # another one registered for the same central may hold another token
+    if origin is not None and origin[0] == os.getpid():
+        api = _ORIGINS.get(origin[1])
+    else:
+        api = _APIS.get(base_url)
+    if api is None:
+        api = _DETACHED.get(base_url)
+    if api is None:
+        api = pycentreon.core.api.Api(base_url[: -len("/api/latest")])
+        _DETACHED[base_url] = api
+    return api
+
+
+def _rebuild_record(
+    cls, base_url, app, name, values, init_cache, has_details, origin=None
+):
+    """Recreates a pickled :py:class:`Record`, see ``Record.__reduce__``."""
+    api = _bound_api(base_url, origin)
+    endpoint = None
+    if name is not None:
+        endpoint = getattr(
+            getattr(api, app, None) or pycentreon.core.app.App(api, app), name
+        )
+    record = cls(values, api, endpoint)
+    record._init_cache = init_cache
+    record.has_details = has_details
+    return record
+
 
 def get_return(lookup, return_fields=None):
     """Returns simple representations for items passed to lookup.
@@ -49,7 +108,10 @@ def get_return(lookup, return_fields=None):
             if hasattr(lookup, i):
                 # check if this is a "choices" field record
                 # from a NetBox 2.7 server.
-                if sorted(dict(lookup)) == sorted(["id", "value", "label"]):
+                keys = (
+                    dict(lookup._init_cache) if isinstance(lookup, Record) else lookup
+                )
+                if sorted(dict(keys)) == sorted(["id", "value", "label"]):
                     return getattr(lookup, "value")
                 return getattr(lookup, i)
 
@@ -75,6 +137,153 @@ def flatten_custom(custom_dict):
     return ret
 
 
+# Keys of dicts kept as-is instead of being converted to a Record
+JSON_KEYS = ("custom_fields", "local_context_data")
+# Values get_return() leaves untouched
+_SCALARS = (str, int, float, bool, type(None))
+_SCALAR_TYPES = frozenset(_SCALARS)
+# Record class => parse function, see _compile_parser()
+_PARSERS = {}
+# Model classes of generic foreign keys, by object type
+_CONTENT_TYPES = {}
+
+
+def register_content_types(mapper):
+    """Registers the model classes of generic foreign keys.
+
+    Called by :py:mod:`pycentreon.models.mapper` when it is imported
+    along with the models, as this module cannot import the models that
+    import it.
+
+    :arg dict mapper: Object types mapped to Record classes.
+    """
+    _CONTENT_TYPES.update(mapper)
+
+
+def _copy_json(value):
+    """Faster ``copy.deepcopy()`` for decoded JSON values."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    if isinstance(value, _SCALARS):
+        return value
+    return copy.deepcopy(value)
+
+
+def _field_type(cls, key):
+    """Returns what a dict or list of dicts under ``key`` becomes.
+
+    That is :py:class:`JsonField`, a Record class, a list holding a
+    Record class, or None for the default. Fields are declared as class
+    attributes (``status = Status``, ``tags = [Tags]``) or annotations
+    (``macros: JsonField``).
+    """
+    lookup = getattr(cls, key, None)
+    if lookup is None:
+        for klass in cls.__mro__:
+            lookup = klass.__dict__.get("__annotations__", {}).get(key)
+            if lookup is not None:
+                break
+    if isinstance(lookup, list):
+        return lookup if lookup and isinstance(lookup[0], type) else None
+    if isinstance(lookup, type) and (
+        getattr(lookup, "_json_field", False) or issubclass(lookup, Record)
+    ):
+        return lookup
+    return None
+
+
+def _declared_fields(cls):
+    fields = set()
+    for klass in cls.__mro__:
+        fields.update(klass.__dict__.get("__annotations__", {}))
+        fields.update(
+            k
+            for k, v in klass.__dict__.items()
+            if isinstance(v, list) or getattr(v, "_json_field", False)
+            or (isinstance(v, type) and issubclass(v, Record))
+        )
+    return fields
+
+
+def _compile_parser(cls):
+    """Builds the function parsing the values of ``cls`` records.
+
+    Field types are resolved once per class, eagerly for the declared
+    fields and on first sight for the others, so parsing a record only
+    looks up dicts.
+    """
+    fields = {k: _field_type(cls, k) for k in _declared_fields(cls)}
+    content_types = _CONTENT_TYPES
+    # Attributes needing setattr(), e.g. properties, others go straight
+    # to the instance dict
+    setters = {
+        k
+        for klass in cls.__mro__
+        for k, v in klass.__dict__.items()
+        if not k.startswith("__") and hasattr(type(v), "__set__")
+    }
+
+    def field_type(key):
+        try:
+            return fields[key]
+        except KeyError:
+            ret = fields[key] = _field_type(cls, key)
+            return ret
+
+    def parse(record, values):
+        api = record.api
+        endpoint = record.endpoint
+        default = record.default_ret
+        cache = record._init_cache
+        attrs = {}
+        for k, v in values.items():
+            if type(v) in _SCALAR_TYPES:
+                cache.append((k, v))
+            elif isinstance(v, dict):
+                lookup = field_type(k)
+                if k in JSON_KEYS or lookup is JsonField:
+                    cache.append((k, get_return(_copy_json(v))))
+                    attrs[k] = v
+                    continue
+                v = (lookup or default)(v, api, endpoint)
+                cache.append((k, get_return(v)))
+            elif isinstance(v, list):
+                if v and isinstance(v[0], dict) and "object_type" in v[0]:
+                    # Generic foreign keys
+                    v = [
+                        content_types[i["object_type"]](i["object"], api, endpoint)
+                        if isinstance(i, dict)
+                        and "object" in i
+                        and content_types.get(i.get("object_type"))
+                        else i
+                        for i in v
+                    ]
+                    cache.append((k, list(v)))
+                elif k == "constraints":
+                    # Permissions constraints can be either dict or list
+                    cache.append((k, _copy_json(v)))
+                else:
+                    lookup = field_type(k)
+                    model = lookup[0] if isinstance(lookup, list) else default
+                    v = [
+                        model(i, api, endpoint) if isinstance(i, dict) else i
+                        for i in v
+                    ]
+                    cache.append((k, list(v)))
+            else:
+                cache.append((k, get_return(v)))
+            attrs[k] = v
+        if setters.isdisjoint(attrs):
+            record.__dict__.update(attrs)
+        else:
+            for k, v in attrs.items():
+                setattr(record, k, v)
+
+    return parse
+
+
 class JsonField:
     """Explicit field type for values that are not to be converted
     to a Record object"""
@@ -114,31 +323,53 @@ class RecordSet:
     def __init__(self, endpoint, request, **kwargs):
         self.endpoint = endpoint
         self.request = request
-        self.response = self.request.get()
         self._response_cache = []
-        pass
+        # Split queries may return the same record more than once
+        self._seen = set() if getattr(request, "dedupe", False) else None
+        decoder = getattr(endpoint.api, "decoder", None)
+        if (
+            decoder is not None
+            and isinstance(request, Request)
+            and request.key is None
+            and request.limit is None
+            and request.page is None
+            and not request.keyset
+        ):
+            # Records of listings are built in worker processes
+            self.response = None
+            self._records = decoder.records(endpoint, request)
+        else:
+            self.response = self.request.get()
+            self._records = None
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if self._response_cache:
-            return self.endpoint.return_obj(
-                self._response_cache.pop(), self.endpoint.api, self.endpoint
-            )
-        return self.endpoint.return_obj(
-            next(self.response), self.endpoint.api, self.endpoint
-        )
+        while True:
+            if self._records is not None:
+                record = next(self._records)
+            else:
+                if self._response_cache:
+                    values = self._response_cache.pop()
+                else:
+                    values = next(self.response)
+                record = self.endpoint.return_obj(
+                    values, self.endpoint.api, self.endpoint
+                )
+            if self._seen is None:
+                return record
+            key = record.__key__()
+            if key not in self._seen:
+                self._seen.add(key)
+                return record
 
     def __len__(self):
         try:
             return self.request.count
         except AttributeError:
-            try:
-                self._response_cache.append(next(self.response))
-            except StopIteration:
-                return 0
-            return self.request.count
+            # Not fetched yet, only ask for the total
+            return self.request.get_count()
 
     def update(self, **kwargs):
         """Updates kwargs onto all Records in the RecordSet and saves these.
@@ -184,6 +415,10 @@ class RecordSet:
         """
         return self.endpoint.delete(self)
 
+    def __reduce__(self):
+        # Pickles the remaining records, not the request
+        return list, (list(self),)
+
 
 class Record:
     """Create Python objects from NetBox API responses.
@@ -336,11 +571,40 @@ class Record:
     def __repr__(self):
         return str(self)
 
-    def __getstate__(self):
-        return self.__dict__
+    def __copy__(self):
+        ret = self.__class__.__new__(self.__class__)
+        ret.__dict__.update(self.__dict__)
+        return ret
 
-    def __setstate__(self, d):
-        self.__dict__.update(d)
+    def __deepcopy__(self, memo):
+        # The copy stays bound to the same Api and endpoint
+        memo[id(self.api)] = self.api
+        memo[id(self.endpoint)] = self.endpoint
+        ret = self.__class__.__new__(self.__class__)
+        memo[id(self)] = ret
+        for k, v in self.__dict__.items():
+            setattr(ret, k, copy.deepcopy(v, memo))
+        return ret
+
+    def __reduce__(self):
+        # Used to send records to other processes: only the data and the
+        # endpoint identifier are pickled, the record is bound to the Api
+        # of the same central when unpickled (or back to its own Api when
+        # unpickled in the same process)
+        endpoint = self.endpoint
+        return (
+            _rebuild_record,
+            (
+                self.__class__,
+                self.api.base_url,
+                endpoint.app.name if endpoint is not None else None,
+                endpoint.name if endpoint is not None else None,
+                dict(self),
+                self._init_cache,
+                self.has_details,
+                _origin(self.api),
+            ),
+        )
 
     def __key__(self):
         if hasattr(self, "id"):
@@ -364,69 +628,13 @@ class Record:
         """Parses values init arg.
 
         Parses values dict at init and sets object attributes with the
-        values within.
+        values within, using the parser compiled for the class.
         """
-
-        def generic_list_parser(key_name, list_item):
-            from pycentreon.models.mapper import CONTENT_TYPE_MAPPER
-
-            if (
-                isinstance(list_item, dict)
-                and "object_type" in list_item
-                and "object" in list_item
-            ):
-                lookup = list_item["object_type"]
-                model = None
-                model = CONTENT_TYPE_MAPPER.get(lookup)
-                if model:
-                    return model(list_item["object"], self.api, self.endpoint)
-
-            return list_item
-
-        def list_parser(key_name, list_item):
-            if isinstance(list_item, dict):
-                lookup = getattr(self.__class__, key_name, None)
-                if not isinstance(lookup, list):
-                    # This is *list_parser*, so if the custom model field is not
-                    # a list (or is not defined), just return the default model
-                    return self.default_ret(list_item, self.api, self.endpoint)
-                else:
-                    model = lookup[0]
-                    return model(list_item, self.api, self.endpoint)
-
-            return list_item
-
-        for k, v in values.items():
-            if isinstance(v, dict):
-                lookup = getattr(self.__class__, k, None)
-                if k in ["custom_fields", "local_context_data"] or hasattr(
-                    lookup, "_json_field"
-                ):
-                    self._add_cache((k, copy.deepcopy(v)))
-                    setattr(self, k, v)
-                    continue
-                if lookup:
-                    v = lookup(v, self.api, self.endpoint)
-                else:
-                    v = self.default_ret(v, self.api, self.endpoint)
-                self._add_cache((k, v))
-
-            elif isinstance(v, list):
-                # check if GFK
-                if len(v) and isinstance(v[0], dict) and "object_type" in v[0]:
-                    v = [generic_list_parser(k, i) for i in v]
-                    to_cache = list(v)
-                elif k == "constraints":
-                    # Permissions constraints can be either dict or list
-                    to_cache = copy.deepcopy(v)
-                else:
-                    v = [list_parser(k, i) for i in v]
-                    to_cache = list(v)
-                self._add_cache((k, to_cache))
-
-            else:
-                self._add_cache((k, v))
-            setattr(self, k, v)
+        cls = self.__class__
+        parser = _PARSERS.get(cls)
+        if parser is None:
+            parser = _PARSERS[cls] = _compile_parser(cls)
+        parser(self, values)
 
     def _endpoint_from_url(self, url):
         url_path = urlsplit(url).path
@@ -454,11 +662,7 @@ class Record:
         :returns: True
         """
         if self.url:
-            req = Request(
-                base=self.url,
-                token=self.api.token,
-                http_session=self.api.http_session,
-            )
+            req = Request(base=self.url, **self.endpoint._request_kwargs())
             self._parse_values(next(req.get()))
             self.has_details = True
             return True
@@ -570,6 +774,9 @@ class Record:
                 base=self.endpoint.url,
                 token=self.api.token,
                 http_session=self.api.http_session,
+                breaker=self.endpoint.breaker,
+                auth=self.api.auth,
+                transport=self.api.transport,
             )
             if req.patch(updates):
                 return True
@@ -616,5 +823,8 @@ class Record:
             base=self.endpoint.url,
             token=self.api.token,
             http_session=self.api.http_session,
+            breaker=self.endpoint.breaker,
+            auth=self.api.auth,
+            transport=self.api.transport,
         )
         return True if req.delete() else False
@@ -0,0 +1,168 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import time
+
+from pycentreon.core.bulk import chunks
+from pycentreon.core.query import Request, RequestError
+from pycentreon.core.response import Record
+from pycentreon.core.transport import CONNECTION_ERRORS
+
+GENERATE = "generate"
+RELOAD = "reload"
+
+
+def _retryable(error):
+    """Whether a failed call may succeed if sent again: server errors
+    and connection failures, not rejected calls or an open circuit."""
+    if isinstance(error, RequestError):
+        return error.req.status_code >= 500
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+class PollerStatus:
+    """Progress of a poller during a :py:class:`PollerRollout`.
+
+    ``step`` is the last step attempted (``generate`` or ``reload``),
+    ``ok`` whether it succeeded, ``timings`` the seconds spent in each
+    step (retries included), ``attempts`` the calls made per step and
+    ``error`` the last exception.
+    """
+
+    __slots__ = ("id", "name", "step", "ok", "timings", "attempts", "error")
+
+    def __init__(self, id, name=None):
+        self.id = id
+        self.name = name
+        self.step = None
+        self.ok = None
+        self.timings = {}
+        self.attempts = {}
+        self.error = None
+
+    def __repr__(self):
+        return "<PollerStatus {} {} {}>".format(
+            self.name or self.id, self.step, "ok" if self.ok else "failed"
+        )
+
+
+class RolloutResult(list):
+    """List of :py:class:`PollerStatus`, one per poller."""
+
+    elapsed = 0.0
+
+    @property
+    def ok(self):
+        return all(s.ok for s in self)
+
+    @property
+    def failed(self):
+        return [s for s in self if not s.ok]
+
+
+class PollerRollout:
+    """Generates and reloads the configuration of many pollers.
+
+    Generation runs on all the pollers at once, ``workers`` at a time.
+    Pollers whose configuration was generated are then reloaded in waves
+    of ``wave_size``, a wave starting when the previous one is done, so
+    that a broken configuration does not reach every poller at the same
+    time. Calls failing with a server error (5xx) or a connection error
+    are retried ``retries`` times, waiting ``backoff`` seconds more
+    before each retry; other errors fail the poller at once.
+
+    :arg obj api: The :py:class:`.Api`.
+    :arg int,optional workers: Calls in flight.
+    :arg int,optional wave_size: Pollers reloaded per wave.
+    :arg int,optional retries: Retries per poller and step.
+    :arg float,optional backoff: Seconds added to the wait before each retry.
+    :arg callable,optional on_progress: Called with the
+        :py:class:`PollerStatus` after each step of a poller.
+    """
+
+    def __init__(
+        self,
+        api,
+        workers=8,
+        wave_size=10,
+        retries=2,
+        backoff=5.0,
+        on_progress=None,
+    ):
+        self.api = api
+        self.endpoint = getattr(api.configuration, "monitoring-servers")
+        self.workers = workers
+        self.wave_size = wave_size
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+
+    def _call(self, poller_id, action):
+        Request(
+            base="{}/{}/{}".format(self.endpoint.url, poller_id, action),
+            **self.endpoint._request_kwargs(),
+        )._make_call()
+
+    def _step(self, status, action):
+        status.step = action
+        start = time.monotonic()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * attempt)
+            status.attempts[action] = attempt + 1
+            try:
+                self._call(status.id, action)
+            except Exception as e:
+                status.ok, status.error = False, e
+                if not _retryable(e):
+                    break
+            else:
+                status.ok, status.error = True, None
+                break
+        status.timings[action] = time.monotonic() - start
+        if self.on_progress is not None:
+            self.on_progress(status)
+        return status
+
+    def _run(self, statuses, action):
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda s: self._step(s, action), statuses))
+
+    def run(self, pollers=None, generate=True, reload=True):
+        """Runs the rollout.
+
+        :arg iterable,optional pollers: Poller Records or ids, all the
+            monitoring servers by default.
+        :arg bool,optional generate: Generate the configuration.
+        :arg bool,optional reload: Reload the pollers once generated.
+        :returns: :py:class:`RolloutResult`
+        """
+        start = time.monotonic()
+        if pollers is None:
+            pollers = self.endpoint.all()
+        result = RolloutResult(
+            PollerStatus(p.id, getattr(p, "name", None))
+            if isinstance(p, Record)
+            else PollerStatus(p)
+            for p in pollers
+        )
+        ready = list(result)
+        if generate:
+            self._run(ready, GENERATE)
+            ready = [s for s in ready if s.ok]
+        if reload:
+            for wave in chunks(ready, self.wave_size):
+                self._run(wave, RELOAD)
+        result.elapsed = time.monotonic() - start
+        return result
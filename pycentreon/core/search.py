@@ -0,0 +1,274 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+from functools import lru_cache
+from urllib.parse import quote
+
+AND = "$and"
+OR = "$or"
+
+# Lookup suffix => Centreon search operator
+LOOKUPS = {
+    "eq": "$eq",
+    "ne": "$neq",
+    "lt": "$lt",
+    "lte": "$le",
+    "gt": "$gt",
+    "gte": "$ge",
+    "like": "$lk",
+    "nlike": "$nk",
+    "in": "$in",
+    "nin": "$ni",
+    "regex": "$rg",
+}
+
+# Operator => operator matching the opposite condition, used by ~Q()
+NEGATIONS = {
+    "$eq": "$neq",
+    "$neq": "$eq",
+    "$lt": "$ge",
+    "$ge": "$lt",
+    "$gt": "$le",
+    "$le": "$gt",
+    "$lk": "$nk",
+    "$nk": "$lk",
+    "$in": "$ni",
+    "$ni": "$in",
+}
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class Q:
+    r"""Composable Centreon search filter.
+
+    Keyword arguments are ``field__lookup=value`` pairs, where ``__``
+    separates the parts of the field name (``host__name`` is
+    ``host.name``) and the optional last part is one of
+    ``eq, ne, lt, lte, gt, gte, like, nlike, in, nin, regex``
+    (``eq`` when omitted). Several keyword arguments are combined with
+    ``$and``. Filters combine with ``&``, ``|`` and ``~``.
+
+    :arg \**lookups: Field lookups.
+
+    :Examples:
+
+    >>> from pycentreon.core.search import Q
+    >>> q = Q(host__name="DC1ESX01") | Q(status__code__in=[1, 2])
+    >>> q.to_search()
+    '{"$or":[{"host.name":{"$eq":"DC1ESX01"}},{"status.code":{"$in":[1,2]}}]}'
+    >>> services = ctn.monitoring.services.filter(q & ~Q(is_acknowledged=True))
+    """
+
+    __slots__ = ("connector", "children")
+
+    def __init__(self, *children, connector=AND, **lookups):
+        self.connector = connector
+        self.children = tuple(children) + tuple(
+            self._leaf(k, v) for k, v in sorted(lookups.items())
+        )
+
+    @staticmethod
+    def _leaf(lookup, value):
+        parts = lookup.split("__")
+        op = LOOKUPS["eq"]
+        if len(parts) > 1 and parts[-1] in LOOKUPS:
+            op = LOOKUPS[parts.pop()]
+        if op in ("$in", "$ni") and not isinstance(value, (list, tuple, set, frozenset)):
+            raise ValueError("{} expects a list of values".format(lookup))
+        return (".".join(parts), op, _freeze(value))
+
+    def _combine(self, other, connector):
+        if not isinstance(other, Q):
+            return NotImplemented
+        children = []
+        for q in (self, other):
+            if q.connector == connector or len(q.children) == 1:
+                children.extend(q.children)
+            else:
+                children.append(q)
+        return Q(*children, connector=connector)
+
+    def __and__(self, other):
+        return self._combine(other, AND)
+
+    def __or__(self, other):
+        return self._combine(other, OR)
+
+    def __invert__(self):
+        # Centreon has no $not, apply De Morgan's laws down to the leaves
+        children = []
+        for child in self.children:
+            if isinstance(child, Q):
+                children.append(~child)
+                continue
+            field, op, value = child
+            if op not in NEGATIONS:
+                raise ValueError("{} filters cannot be negated".format(op))
+            children.append((field, NEGATIONS[op], value))
+        return Q(*children, connector=OR if self.connector == AND else AND)
+
+    def __bool__(self):
+        return bool(self.children)
+
+    def _key(self):
+        return (
+            self.connector,
+            tuple(c._key() if isinstance(c, Q) else c for c in self.children),
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, Q):
+            return self._key() == other._key()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return "<Q: {}>".format(self.to_search())
+
+    def compile(self):
+        """Returns the filter as a Centreon search dict."""
+        try:
+            return json.loads(_compile(self._key()))
+        except TypeError:
+            # Unhashable value, compile without the cache
+            return _build(self._key())
+
+    def to_search(self):
+        """Returns the filter as the JSON string of the ``search`` parameter."""
+        try:
+            return _compile(self._key())
+        except TypeError:
+            return _dumps(_build(self._key()))
+
+
+def _build(key):
+    connector, children = key
+    compiled = []
+    for child in children:
+        if isinstance(child[1], tuple):
+            compiled.append(_build(child))
+        else:
+            field, op, value = child
+            compiled.append({field: {op: _thaw(value)}})
+    if not compiled:
+        return {}
+    if len(compiled) == 1:
+        return compiled[0]
+    return {connector: compiled}
+
+
+def _dumps(search):
+    return json.dumps(search, separators=(",", ":"))
+
+
+@lru_cache(maxsize=1024)
+def _compile(key):
+    return _dumps(_build(key))
+
+
+def to_search(search):
+    """Normalizes a ``search`` argument to the JSON string Centreon expects.
+
+    :arg Q|dict|str search: A :py:class:`Q`, a search dict or an already
+        encoded JSON string.
+    """
+    if isinstance(search, Q):
+        return search.to_search()
+    if isinstance(search, dict):
+        return _dumps(search)
+    return search
+
+
+def _in_leaves(search, path=()):
+    """Yields the path of every ``$in`` list of a compiled search."""
+    if isinstance(search, list):
+        for i, item in enumerate(search):
+            yield from _in_leaves(item, path + (i,))
+    elif isinstance(search, dict):
+        for k, v in search.items():
+            if k == "$in" and isinstance(v, list):
+                yield path + (k,)
+            else:
+                yield from _in_leaves(v, path + (k,))
+
+
+def _replace(search, path, value):
+    if not path:
+        return value
+    head = path[0]
+    if isinstance(search, list):
+        ret = list(search)
+    else:
+        ret = dict(search)
+    ret[head] = _replace(search[head], path[1:], value)
+    return ret
+
+
+def _lookup(search, path):
+    for p in path:
+        search = search[p]
+    return search
+
+
+def split_search(search, budget):
+    """Splits a search whose URL-encoded form exceeds ``budget`` characters.
+
+    The largest ``$in`` list is cut into chunks so that each resulting
+    search fits in ``budget`` once URL-encoded. As ``$in`` only appears
+    under ``$and``/``$or``, the union of the chunked searches matches
+    the same records as the original one (possibly more than once when
+    another ``$or`` branch matches).
+
+    :arg str search: JSON ``search`` parameter.
+    :arg int budget: Maximum URL-encoded length of the parameter value.
+    :returns: List of JSON ``search`` strings, ``[search]`` if it fits or
+        cannot be split.
+    """
+    if len(quote(search, safe="")) <= budget:
+        return [search]
+    compiled = json.loads(search)
+    paths = list(_in_leaves(compiled))
+    if not paths:
+        return [search]
+    path = max(paths, key=lambda p: len(_dumps(_lookup(compiled, p))))
+    # Duplicated values would only produce duplicated results
+    values = list(dict.fromkeys(_freeze(v) for v in _lookup(compiled, path)))
+    values = [_thaw(v) for v in values]
+    available = budget - len(quote(_dumps(_replace(compiled, path, [])), safe=""))
+    separator = len(quote(",", safe=""))
+
+    chunks, chunk, size = [], [], 0
+    for value in values:
+        cost = len(quote(_dumps(value), safe="")) + separator
+        if chunk and size + cost > available:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(value)
+        size += cost
+    if chunk:
+        chunks.append(chunk)
+    return [_dumps(_replace(compiled, path, chunk)) for chunk in chunks]
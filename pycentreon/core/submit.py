@@ -0,0 +1,199 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import threading
+import time
+
+from pycentreon.core.bulk import BulkAborted, BulkOutcome, send_chunk
+from pycentreon.core.query import Request
+
+
+class CheckResultSubmitter:
+    """Submits passive check results in batches.
+
+    Host and service names are resolved to ids through a local map. A
+    name missing from the map is looked up with a filtered listing: the
+    host by name, or all the services of the host at once. Names that
+    cannot be resolved are remembered for ``refresh_interval`` seconds
+    and their results dropped and counted. :py:meth:`load` fills the map
+    with all the hosts and services beforehand.
+
+    Results are grouped in batches of ``batch_size`` posted to
+    ``monitoring/resources/submit`` by ``workers`` threads. At most
+    ``2 * workers`` batches are pending, reading the input stream pauses
+    until one completes, so memory stays bounded when Centreon is slower
+    than the producer. Once a batch is refused for a reason other than
+    its content (expired token, denied access, rate limiting), the
+    following batches fail without being sent.
+
+    :arg obj app: The ``monitoring`` :py:class:`.App`.
+    :arg int,optional batch_size: Results per call.
+    :arg int,optional workers: Calls in flight.
+    :arg float,optional refresh_interval: Seconds an unknown name is
+        remembered before being looked up again.
+    """
+
+    def __init__(self, app, batch_size=500, workers=4, refresh_interval=60.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self._ids = {}
+        self._missing = {}
+        self._lock = threading.Lock()
+        self._aborted = None
+        self.received = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _host_ref(host):
+        return {"type": "host", "id": host.id, "parent": None}
+
+    @staticmethod
+    def _service_ref(service):
+        name = getattr(service, "description", None) or service.name
+        ref = {"type": "service", "id": service.id, "parent": {"id": service.host.id}}
+        return (service.host.name, name), ref
+
+    def load(self):
+        """Fills the name map with all the monitoring hosts and services."""
+        ids = {(h.name, None): self._host_ref(h) for h in self.app.hosts.all()}
+        ids.update(self._service_ref(s) for s in self.app.services.all())
+        with self._lock:
+            self._ids.update(ids)
+            self._missing.clear()
+
+    def _lookup(self, host, service):
+        if service is None:
+            return {
+                (h.name, None): self._host_ref(h)
+                for h in self.app.hosts.filter(name=host)
+            }
+        return dict(
+            self._service_ref(s) for s in self.app.services.filter(host__name=host)
+        )
+
+    def resolve(self, host, service=None):
+        """Returns the resource reference of a host or service, or None."""
+        key = (host, service)
+        ref = self._ids.get(key)
+        if ref is not None:
+            return ref
+        missed = self._missing.get(key)
+        if missed is not None and time.monotonic() - missed < self.refresh_interval:
+            return None
+        found = self._lookup(host, service)
+        with self._lock:
+            self._ids.update(found)
+            ref = self._ids.get(key)
+            if ref is None:
+                self._missing[key] = time.monotonic()
+            else:
+                self._missing.pop(key, None)
+        return ref
+
+    def _send(self, batch):
+        Request(
+            base="{}/submit".format(self.app.resources.url),
+            **self.app.resources._request_kwargs(),
+        ).post({"resources": batch})
+
+    def _send_batch(self, batch):
+        if self._aborted is not None:
+            return [BulkOutcome(item, False, self._aborted) for item in batch]
+        try:
+            return send_chunk(self._send, batch)
+        except BulkAborted as e:
+            self._aborted = e.error
+            return [BulkOutcome(item, False, e.error) for item in batch]
+
+    def _done(self, future, semaphore):
+        outcomes = future.result()
+        with self._lock:
+            self.batches += 1
+            for outcome in outcomes:
+                if outcome.ok:
+                    self.submitted += 1
+                else:
+                    self.failed += 1
+        semaphore.release()
+
+    def submit(self, results):
+        """Submits a stream of check results.
+
+        :arg iterable results: ``(host, service, status, output, perfdata)``
+            tuples, ``service`` being None for host results and
+            ``perfdata`` optional.
+        :returns: dict with the counters of this run.
+        """
+        start = time.monotonic()
+        before = self.metrics()
+        self._aborted = None
+        semaphore = threading.BoundedSemaphore(self.workers * 2)
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+            def flush(batch):
+                semaphore.acquire()
+                future = executor.submit(self._send_batch, batch)
+                future.add_done_callback(lambda f: self._done(f, semaphore))
+
+            batch = []
+            for result in results:
+                host, service, status, output = result[:4]
+                perfdata = result[4] if len(result) > 4 else None
+                with self._lock:
+                    self.received += 1
+                ref = self.resolve(host, service)
+                if ref is None:
+                    with self._lock:
+                        self.dropped += 1
+                    continue
+                batch.append(
+                    dict(
+                        ref,
+                        status=status,
+                        output=output,
+                        performance_data=perfdata or "",
+                    )
+                )
+                if len(batch) >= self.batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self.elapsed += elapsed
+        after = self.metrics()
+        run = {k: after[k] - before[k] for k in before if k != "throughput"}
+        run["throughput"] = run["submitted"] / elapsed if elapsed else 0.0
+        return run
+
+    def metrics(self):
+        """Returns the cumulated counters, ``throughput`` being the
+        submitted results per second of submission time."""
+        with self._lock:
+            return {
+                "received": self.received,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "elapsed": self.elapsed,
+                "throughput": self.submitted / self.elapsed if self.elapsed else 0.0,
+            }
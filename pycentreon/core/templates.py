@@ -0,0 +1,179 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from collections import deque
+
+from pycentreon.core.response import Record
+
+# Kind => (templates endpoint of the configuration app, field holding
+# the parent template(s), highest priority first)
+KINDS = {
+    "hosts": ("hosts/templates", "templates"),
+    "services": ("services/templates", "service_template_id"),
+}
+
+
+def _empty(value):
+    return value is None or value == "" or value == []
+
+
+def _ids(value):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [v.get("id") if isinstance(v, dict) else v for v in value]
+
+
+class TemplateResolver:
+    """Resolves template inheritance locally.
+
+    All the templates of a kind are loaded with one listing and their
+    parents indexed as a DAG. The attributes of each template, merged
+    with the ones it inherits, are computed once and memoized; objects
+    (hosts or services) are then resolved without API calls.
+
+    A value set on an object or template wins over inherited ones, among
+    several parents the first one wins. Empty values (None, ``""``,
+    ``[]``) are inherited. Macros are merged by name.
+
+    :arg obj api: The :py:class:`.Api`.
+    :arg str,optional kind: ``hosts`` or ``services``.
+    :arg str,optional parents_field: Field holding the parent templates,
+        a list or a single id. Defaults to the one of ``kind``.
+    :arg str,optional macros_field: Field holding the macros.
+
+    :Examples:
+
+    >>> resolver = ctn.templates("hosts")
+    >>> conf = resolver.effective(ctn.configuration.hosts.get(name="DC1ESX01"))
+    >>> conf["check_command_id"], conf["macros"]["SNMPCOMMUNITY"]["value"]
+    (12, 'public')
+    >>> resolver.refresh([42])  # template 42 changed
+    """
+
+    def __init__(self, api, kind="hosts", parents_field=None, macros_field="macros"):
+        endpoint, field = KINDS[kind]
+        self.endpoint = getattr(api.configuration, endpoint)
+        self.parents_field = parents_field or field
+        self.macros_field = macros_field
+        self.values = {}
+        self.parents = {}
+        self.children = {}
+        self._memo = {}
+
+    def _index(self, template_id, values):
+        for parent in self.parents.get(template_id, ()):
+            self.children.get(parent, set()).discard(template_id)
+        self.values[template_id] = values
+        self.parents[template_id] = _ids(values.get(self.parents_field))
+        for parent in self.parents[template_id]:
+            self.children.setdefault(parent, set()).add(template_id)
+
+    def load(self):
+        """Loads all the templates, dropping what was resolved.
+
+        :returns: self
+        """
+        self.values, self.parents, self.children, self._memo = {}, {}, {}, {}
+        for record in self.endpoint.all():
+            self._index(record.id, dict(record))
+        return self
+
+    def descendants(self, template_id):
+        """Returns the ids of the templates inheriting from ``template_id``."""
+        seen = set()
+        queue = deque([template_id])
+        while queue:
+            for child in self.children.get(queue.popleft(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        return seen
+
+    def invalidate(self, template_ids):
+        """Forgets the resolution of templates and of their descendants."""
+        for template_id in template_ids:
+            self._memo.pop(template_id, None)
+            for child in self.descendants(template_id):
+                self._memo.pop(child, None)
+
+    def refresh(self, template_ids):
+        """Reloads some templates after they changed.
+
+        Only these templates and their descendants are resolved again.
+        Ids that no longer exist are removed.
+
+        :arg list template_ids: Ids of the changed templates.
+        :returns: self
+        """
+        template_ids = set(template_ids)
+        self.invalidate(template_ids)
+        found = set()
+        for record in self.endpoint.filter(id__in=sorted(template_ids)):
+            found.add(record.id)
+            self._index(record.id, dict(record))
+        for template_id in template_ids - found:
+            for parent in self.parents.pop(template_id, ()):
+                self.children.get(parent, set()).discard(template_id)
+            self.values.pop(template_id, None)
+        return self
+
+    def _merge(self, values, parent_ids, stack):
+        merged = {}
+        macros = {}
+        # Lowest priority first, so that the first parent wins
+        for parent in reversed(parent_ids):
+            if parent not in self.values:
+                continue
+            inherited = self._resolve(parent, stack)
+            merged.update({k: v for k, v in inherited.items() if not _empty(v)})
+            macros.update(inherited.get(self.macros_field) or {})
+        merged.update({k: v for k, v in values.items() if not _empty(v)})
+        for macro in values.get(self.macros_field) or []:
+            macros[macro["name"]] = macro
+        merged[self.macros_field] = macros
+        return merged
+
+    def _resolve(self, template_id, stack=()):
+        if template_id in self._memo:
+            return self._memo[template_id]
+        if template_id in stack:
+            raise ValueError(
+                "Template inheritance loop: {}".format(stack + (template_id,))
+            )
+        ret = self._merge(
+            self.values[template_id],
+            self.parents[template_id],
+            stack + (template_id,),
+        )
+        self._memo[template_id] = ret
+        return ret
+
+    def resolve(self, template_id):
+        """Returns the attributes of a template, inherited ones included.
+
+        ``macros`` is a dict of macro name to macro.
+        """
+        return self._resolve(template_id)
+
+    def effective(self, obj):
+        """Returns the effective configuration of a host or service.
+
+        :arg Record|dict obj: The object, with its templates in the
+            parents field.
+        :returns: dict of attributes, ``macros`` being a dict of macro
+            name to macro.
+        """
+        values = dict(obj) if isinstance(obj, Record) else obj
+        return self._merge(values, _ids(values.get(self.parents_field)), ())
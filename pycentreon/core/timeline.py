@@ -0,0 +1,128 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import concurrent.futures as cf
+import datetime
+import heapq
+import itertools
+from collections import namedtuple
+
+from pycentreon.core.query import Request
+from pycentreon.core.response import Record
+from pycentreon.core.search import Q
+from pycentreon.core.util import format_time, to_epoch
+
+TimelineEvent = namedtuple("TimelineEvent", ["resource", "record"])
+TimelineEvent.__doc__ = """An event of a resource timeline.
+
+``resource`` is the ``{"type", "id", "parent"}`` reference of the host or
+service and ``record`` the event :py:class:`.Record`.
+"""
+
+
+class TimelineReader:
+    """Streams host and service timelines in chronological order.
+
+    The period is split in ``window`` long sub-periods, each fetched by
+    pages of ``page_size`` events filtered on ``date`` and sorted by
+    date. Up to ``prefetch`` windows of a timeline are fetched ahead
+    while the current one is consumed, so memory is bounded by the
+    windows in flight instead of the whole timeline.
+
+    All the calls share a pool of ``workers`` threads, which also bounds
+    the concurrency when many timelines are merged.
+
+    :arg obj app: The ``monitoring`` :py:class:`.App`.
+    :arg timedelta,optional window: Length of the sub-periods.
+    :arg int,optional page_size: Events per call.
+    :arg int,optional prefetch: Windows fetched ahead per timeline.
+    :arg int,optional workers: Calls in flight, defaults to ``Api.max_workers``.
+    """
+
+    def __init__(
+        self,
+        app,
+        window=datetime.timedelta(hours=6),
+        page_size=1000,
+        prefetch=2,
+        workers=None,
+    ):
+        self.app = app
+        self.window = window
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.workers = workers or app.api.max_workers
+
+    def _endpoint(self, ref):
+        hosts = self.app.hosts
+        if ref["type"] == "service":
+            return self.app.services, "{}/{}/services/{}/timeline".format(
+                hosts.url, ref["parent"]["id"], ref["id"]
+            )
+        return hosts, "{}/{}/timeline".format(hosts.url, ref["id"])
+
+    def _fetch(self, ref, start, end):
+        endpoint, url = self._endpoint(ref)
+        search = Q(date__gte=format_time(start), date__lt=format_time(end))
+        req = Request(
+            base=url,
+            filters={"search": search.to_search()},
+            sort_by={"date": "ASC"},
+            **endpoint._request_kwargs()
+        )
+        events, page = [], 1
+        while True:
+            ret = req._make_call(add_params={"limit": self.page_size, "page": page})
+            result = ret.get("result") or []
+            events.extend(Record(i, self.app.api, endpoint) for i in result)
+            total = ret.get("meta", {}).get("total", 0)
+            if not result or len(events) >= total:
+                break
+            page += 1
+        # Keep the order stable even if the server ignored sort_by
+        events.sort(key=lambda r: to_epoch(r.date))
+        return events
+
+    def _windows(self, start, end):
+        while start < end:
+            yield start, min(start + self.window, end)
+            start += self.window
+
+    def _stream(self, executor, ref, start, end):
+        windows = self._windows(start, end)
+        pending = [
+            executor.submit(self._fetch, ref, *w)
+            for w in itertools.islice(windows, self.prefetch)
+        ]
+        while pending:
+            future = pending.pop(0)
+            nxt = next(windows, None)
+            if nxt is not None:
+                pending.append(executor.submit(self._fetch, ref, *nxt))
+            for record in future.result():
+                yield TimelineEvent(ref, record)
+
+    def stream(self, refs, start, end):
+        """Yields the :py:class:`TimelineEvent` of ``refs`` between
+        ``start`` and ``end``, merged in chronological order.
+
+        :arg list refs: ``{"type", "id", "parent"}`` resource references.
+        :arg datetime start: Start of the period.
+        :arg datetime end: End of the period.
+        """
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            streams = [self._stream(executor, ref, start, end) for ref in refs]
+            if len(streams) == 1:
+                yield from streams[0]
+                return
+            yield from heapq.merge(*streams, key=lambda e: to_epoch(e.record.date))
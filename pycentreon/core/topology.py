@@ -0,0 +1,223 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import array
+import concurrent.futures as cf
+import threading
+from collections import deque
+
+from pycentreon.core.endpoint import _field_values
+
+EMPTY = array.array("q")
+
+# Relation => (source kind, candidate fields holding the target ids)
+RELATIONS = {
+    "host_poller": ("hosts", ("monitoring_server.id", "poller_id")),
+    "host_group": ("hosts", ("groups.id",)),
+    "host_parent": ("hosts", ("parents.id",)),
+    "service_host": ("services", ("hosts.id", "host.id")),
+    "service_group": ("services", ("groups.id",)),
+}
+
+# Kind => (app, endpoint) it is loaded from
+SOURCES = {
+    "pollers": ("configuration", "monitoring-servers"),
+    "hosts": ("configuration", "hosts"),
+    "services": ("configuration", "services"),
+}
+
+
+class Relation:
+    """Edges between integer ids, indexed both ways.
+
+    Targets of each source, and sources of each target, are stored as
+    ``array("q")`` so that lookups are O(degree) and memory stays small
+    on large platforms.
+    """
+
+    __slots__ = ("forward", "reverse")
+
+    def __init__(self):
+        self.forward = {}
+        self.reverse = {}
+
+    def set(self, src, targets):
+        """Replaces the targets of ``src``."""
+        self.remove(src)
+        if targets:
+            self.forward[src] = array.array("q", targets)
+            for target in targets:
+                self.reverse.setdefault(target, array.array("q")).append(src)
+
+    def remove(self, src):
+        for target in self.forward.pop(src, EMPTY):
+            sources = self.reverse.get(target)
+            if sources is not None:
+                sources.remove(src)
+                if not sources:
+                    del self.reverse[target]
+
+    def __len__(self):
+        return sum(len(v) for v in self.forward.values())
+
+
+class Topology:
+    """In-memory graph of pollers, hosts, services and their groups.
+
+    Built from a few listings of the ``configuration`` endpoints, it
+    answers impact questions without any further API call. Relations
+    are listed in ``RELATIONS``; the target ids of each one are read
+    from the first of its candidate fields present on the records.
+
+    :arg obj api: The :py:class:`.Api`.
+    :arg int,optional workers: Endpoints listed concurrently.
+
+    :Examples:
+
+    >>> topo = ctn.topology()
+    >>> impact = topo.impact(hostgroup=12)
+    >>> len(impact["services"]), impact["pollers"]
+    (1840, {1, 3})
+    >>> topo.ancestors(4021)
+    {17, 3}
+    >>> topo.refresh(hosts=[4021, 4022])
+    """
+
+    def __init__(self, api, workers=3):
+        self.api = api
+        self.workers = workers
+        self.names = {kind: {} for kind in SOURCES}
+        self.relations = {name: Relation() for name in RELATIONS}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, kind):
+        app, name = SOURCES[kind]
+        return getattr(getattr(self.api, app), name)
+
+    def _load(self, kind, records):
+        names = self.names[kind]
+        seen = set()
+        for record in records:
+            seen.add(record.id)
+            names[record.id] = getattr(record, "name", None)
+            for name, (source, fields) in RELATIONS.items():
+                if source != kind:
+                    continue
+                targets = []
+                for field in fields:
+                    targets = [i for i in _field_values(record, field) if i is not None]
+                    if targets:
+                        break
+                self.relations[name].set(record.id, targets)
+        return seen
+
+    def _forget(self, kind, ids):
+        for i in ids:
+            self.names[kind].pop(i, None)
+            for name, (source, _) in RELATIONS.items():
+                if source == kind:
+                    self.relations[name].remove(i)
+
+    def build(self):
+        """Loads the whole topology, replacing the current one.
+
+        :returns: self
+        """
+        with cf.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listings = {
+                kind: executor.submit(lambda k: list(self._endpoint(k).all()), kind)
+                for kind in SOURCES
+            }
+            records = {kind: f.result() for kind, f in listings.items()}
+        with self._lock:
+            self.names = {kind: {} for kind in SOURCES}
+            self.relations = {name: Relation() for name in RELATIONS}
+            for kind, items in records.items():
+                self._load(kind, items)
+        return self
+
+    def refresh(self, hosts=None, services=None):
+        """Reloads the given hosts and services only.
+
+        Their edges are replaced by the current ones, ids that no longer
+        exist are removed. Without arguments the whole topology is
+        rebuilt.
+
+        :arg list,optional hosts: Host ids to reload.
+        :arg list,optional services: Service ids to reload.
+        :returns: self
+        """
+        if hosts is None and services is None:
+            return self.build()
+        for kind, ids in (("hosts", hosts), ("services", services)):
+            if not ids:
+                continue
+            ids = set(ids)
+            records = list(self._endpoint(kind).filter(id__in=sorted(ids)))
+            with self._lock:
+                self._forget(kind, ids - self._load(kind, records))
+        return self
+
+    def neighbors(self, relation, id):
+        """Returns the target ids of ``id`` in ``relation``."""
+        return self.relations[relation].forward.get(id, EMPTY)
+
+    def reverse(self, relation, id):
+        """Returns the ids whose ``relation`` targets ``id``."""
+        return self.relations[relation].reverse.get(id, EMPTY)
+
+    def closure(self, relation, id, reverse=False):
+        """Returns the ids reachable from ``id`` following ``relation``
+        transitively (backwards when ``reverse`` is set)."""
+        index = self.relations[relation]
+        index = index.reverse if reverse else index.forward
+        seen = set()
+        queue = deque([id])
+        while queue:
+            for nxt in index.get(queue.popleft(), EMPTY):
+                if nxt not in seen and nxt != id:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        return seen
+
+    def ancestors(self, host_id):
+        """Returns the parent hosts of a host, transitively."""
+        return self.closure("host_parent", host_id)
+
+    def dependents(self, host_id):
+        """Returns the hosts having ``host_id`` as a parent, transitively."""
+        return self.closure("host_parent", host_id, reverse=True)
+
+    def impact(self, host=None, hostgroup=None, poller=None):
+        """Returns what is affected by the loss of a host, host group or
+        poller.
+
+        Hosts depending on the affected hosts through their parents are
+        included.
+
+        :returns: dict of ``hosts``, ``services`` and ``pollers`` id sets.
+        """
+        hosts = set()
+        if host is not None:
+            hosts.add(host)
+        if hostgroup is not None:
+            hosts.update(self.reverse("host_group", hostgroup))
+        if poller is not None:
+            hosts.update(self.reverse("host_poller", poller))
+        for h in list(hosts):
+            hosts |= self.dependents(h)
+        services, pollers = set(), set()
+        for h in hosts:
+            services.update(self.reverse("service_host", h))
+            pollers.update(self.neighbors("host_poller", h))
+        return {"hosts": hosts, "services": services, "pollers": pollers}
@@ -0,0 +1,199 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+from urllib.parse import urlencode
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+# Errors raised by the transports when the server could not be reached
+# (requests' errors are OSError)
+CONNECTION_ERRORS = (OSError,)
+if httpx is not None:
+    CONNECTION_ERRORS += (httpx.TransportError,)
+if urllib3 is not None:
+    CONNECTION_ERRORS += (urllib3.exceptions.HTTPError,)
+
+
+def _encode_url(url, params):
+    if not params:
+        return url
+    return "{}{}{}".format(url, "&" if "?" in url else "?", urlencode(params, doseq=True))
+
+
+class _SentRequest:
+    def __init__(self, body):
+        self.body = body
+
+
+class TransportResponse:
+    """Response returned by the non-``requests`` transports.
+
+    Exposes the subset of :py:class:`requests.Response` used by
+    :py:class:`.Request`, :py:class:`.RequestError` and
+    :py:class:`.ContentError`, so errors look the same whatever the
+    transport.
+    """
+
+    def __init__(
+        self, status_code, reason, url, headers, content, body=None, wire_size=None
+    ):
+        self.status_code = status_code
+        self.reason = reason
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.request = _SentRequest(body)
+        self.wire_size = wire_size
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Transport:
+    """Sends HTTP requests on behalf of :py:class:`.Request`.
+
+    Subclasses implement :py:meth:`request` and return an object that
+    behaves like :py:class:`requests.Response` (see
+    :py:class:`TransportResponse`). ``data`` is the already encoded
+    request body, and compressed responses must be decoded.
+    """
+
+    def request(self, verb, url, headers=None, params=None, data=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Transport backed by a :py:class:`requests.Session`.
+
+    This is what :py:class:`.Request` uses when no transport is set,
+    on the ``http_session`` of the :py:class:`.Api`.
+
+    :arg obj session: The ``requests.Session`` to use.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def request(self, verb, url, headers=None, params=None, data=None):
+        return getattr(self.session, verb)(
+            url, headers=headers, params=params, data=data
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport(Transport):
+    r"""Transport backed by :py:class:`httpx.Client`.
+
+    With ``http2=True`` (needs ``httpx[http2]``), concurrent requests from
+    several threads are multiplexed over a single TCP+TLS connection to
+    the central instead of opening one connection per request.
+
+    :arg bool,optional http2: Negotiate HTTP/2 with the server.
+    :arg \**client_kwargs: Passed to :py:class:`httpx.Client`
+        (``verify``, ``timeout``, ``limits``...).
+    """
+
+    def __init__(self, http2=True, client=None, **client_kwargs):
+        if httpx is None:
+            raise ImportError("HttpxTransport requires the 'httpx' package.")
+        self.client = client or httpx.Client(http2=http2, **client_kwargs)
+
+    def request(self, verb, url, headers=None, params=None, data=None):
+        resp = self.client.request(
+            verb.upper(), _encode_url(url, params), headers=headers, content=data
+        )
+        return TransportResponse(
+            resp.status_code,
+            resp.reason_phrase,
+            str(resp.url),
+            resp.headers,
+            resp.content,
+            data,
+            resp.num_bytes_downloaded,
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class Urllib3Transport(Transport):
+    r"""Lean transport backed by a :py:class:`urllib3.PoolManager`.
+
+    Skips the session, hooks and adapter layers of ``requests``, which
+    matters when issuing many small calls.
+
+    :arg \**pool_kwargs: Passed to :py:class:`urllib3.PoolManager`
+        (``maxsize``, ``cert_reqs``, ``timeout``, ``retries``...).
+    """
+
+    def __init__(self, pool=None, **pool_kwargs):
+        if urllib3 is None:
+            raise ImportError("Urllib3Transport requires the 'urllib3' package.")
+        self.pool = pool or urllib3.PoolManager(**pool_kwargs)
+
+    def request(self, verb, url, headers=None, params=None, data=None):
+        url = _encode_url(url, params)
+        resp = self.pool.request(verb.upper(), url, headers=headers, body=data)
+        return TransportResponse(
+            resp.status, resp.reason, url, resp.headers, resp.data, data, resp.tell()
+        )
+
+    def close(self):
+        self.pool.clear()
+
+
+TRANSPORTS = {
+    "httpx": HttpxTransport,
+    "urllib3": Urllib3Transport,
+}
+
+
+def get_transport(transport):
+    """Resolves the ``transport`` argument of :py:class:`.Api`.
+
+    :arg str|Transport transport: A :py:class:`Transport` instance, or the
+        name of one (``"httpx"``, ``"urllib3"``).
+    :raises ValueError: if the name is unknown.
+    """
+    if transport is None or isinstance(transport, Transport):
+        return transport
+    try:
+        return TRANSPORTS[transport]()
+    except KeyError:
+        raise ValueError(
+            "Unknown transport {}, expected one of {}".format(
+                transport, ", ".join(TRANSPORTS)
+            )
+        )
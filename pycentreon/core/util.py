@@ -1,3 +1,101 @@
+import concurrent.futures as cf
+import datetime
+import threading
+
+
 class Hashabledict(dict):
     def __hash__(self):
         return hash(frozenset(self))
+
+
+def format_time(value):
+    """Formats a datetime as the ISO 8601 string Centreon expects.
+
+    Naive datetimes are taken as local time, other values are returned
+    unchanged.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.astimezone()
+        return value.isoformat()
+    return value
+
+
+def to_epoch(value):
+    """Returns the epoch seconds of an ISO 8601 string or a number."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into a single one.
+
+    The first thread calling :py:meth:`do` with a given key runs the
+    function; threads arriving with the same key while it is in flight
+    wait for it and get the same result (or exception). Nothing is kept
+    once the call returns, later calls run again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = cf.Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class TransferStats:
+    """Thread-safe byte counters of the requests made by an API.
+
+    ``*_wire`` counters are the bytes that went over the network, the
+    others the size of the bodies once decoded, so their ratio shows
+    what compression saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_sent_wire = 0
+        self.bytes_received = 0
+        self.bytes_received_wire = 0
+
+    def record(self, sent, sent_wire, received, received_wire):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.bytes_sent_wire += sent_wire
+            self.bytes_received += received
+            self.bytes_received_wire += received_wire
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "bytes_sent_wire": self.bytes_sent_wire,
+                "bytes_received": self.bytes_received,
+                "bytes_received_wire": self.bytes_received_wire,
+            }
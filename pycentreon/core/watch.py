@@ -0,0 +1,220 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import threading
+import time
+from collections import namedtuple
+
+from pycentreon.core.search import Q
+
+STATUS = "status"
+ACKNOWLEDGED = "acknowledged"
+ACKNOWLEDGEMENT_REMOVED = "acknowledgement_removed"
+DOWNTIME_STARTED = "downtime_started"
+DOWNTIME_ENDED = "downtime_ended"
+REMOVED = "removed"
+
+ChangeEvent = namedtuple(
+    "ChangeEvent", ["kind", "key", "previous", "current", "record"]
+)
+ChangeEvent.__doc__ = """A change detected by :py:class:`ResourceWatcher`.
+
+``kind`` is one of ``status``, ``acknowledged``, ``acknowledgement_removed``,
+``downtime_started``, ``downtime_ended`` and ``removed``. ``key``
+identifies the resource, ``previous``/``current`` are the status codes
+for ``status`` and ``removed`` events (``current`` being None for the
+latter) and booleans otherwise, and ``record`` is the resource
+:py:class:`.Record` (None when the resource is no longer flagged or
+was removed).
+"""
+
+
+class ResourceWatcher:
+    r"""Yields the state changes of monitoring resources.
+
+    The first poll lists the matching resources once to build a compact
+    map of ``key => (status code, acknowledged, in downtime)``. Later
+    polls only ask for resources whose ``last_status_change`` moved
+    since the previous poll, plus the (usually short) list of resources
+    currently acknowledged or in downtime, and compare them with the map.
+    Every ``resync`` seconds a poll lists all the matching resources
+    again, and resources no longer listed (deleted, or out of the
+    filters) are dropped from the map with a ``removed`` event.
+
+    The polling interval adapts: it is halved down to ``min_interval``
+    after a poll that found changes, and grows by half up to
+    ``max_interval`` after a quiet one.
+
+    Use it as a generator, or as an async iterator (polls then run in a
+    thread).
+
+    :arg obj endpoint: The resources :py:class:`.Endpoint`.
+    :arg Q|str|dict,optional \*args: Filters, as in :py:meth:`.Endpoint.filter`.
+    :arg float,optional interval: Initial seconds between two polls.
+    :arg float,optional min_interval: Shortest interval, used during incidents.
+    :arg float,optional max_interval: Longest interval, when nothing changes.
+    :arg float,optional resync: Seconds between two full polls.
+    :arg \**kwargs: Filters, as in :py:meth:`.Endpoint.filter`.
+
+    :Examples:
+
+    >>> for event in ctn.monitoring.watch(Q(type="service"), interval=30):
+    ...     print(event.kind, event.key, event.previous, event.current)
+    ...
+    status h12-s310 0 2
+    acknowledged h12-s310 False True
+
+    >>> async for event in ctn.monitoring.watch(host__name__like="DC1%"):
+    ...     await notify(event)
+    """
+
+    changed_field = "last_status_change"
+    acknowledged_field = "is_acknowledged"
+    downtime_field = "is_in_downtime"
+
+    def __init__(
+        self,
+        endpoint,
+        *args,
+        interval=30.0,
+        min_interval=5.0,
+        max_interval=300.0,
+        resync=600.0,
+        **kwargs
+    ):
+        self.endpoint = endpoint
+        self.filters = (args, kwargs)
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.resync = resync
+        self.states = None
+        self.since = None
+        self._synced = None
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ends the iteration after the current poll."""
+        self._stop.set()
+
+    @staticmethod
+    def key(record):
+        uuid = getattr(record, "uuid", None)
+        if uuid:
+            return uuid
+        parent = getattr(record, "parent", None)
+        return (
+            getattr(record, "type", None),
+            getattr(parent, "id", None),
+            record.id,
+        )
+
+    def _state(self, record):
+        status = getattr(record, "status", None)
+        return (
+            getattr(status, "code", status),
+            bool(getattr(record, self.acknowledged_field, False)),
+            bool(getattr(record, self.downtime_field, False)),
+        )
+
+    def _list(self, query=None):
+        args, kwargs = self.filters
+        if query is not None:
+            args = args + (query,)
+        return self.endpoint.filter(*args, **kwargs)
+
+    def _track_since(self, record):
+        changed = getattr(record, self.changed_field, None)
+        if changed and (self.since is None or changed > self.since):
+            self.since = changed
+
+    def poll(self):
+        """Runs a single poll and returns the list of :py:class:`ChangeEvent`."""
+        if self.states is None:
+            self.states = {}
+            for record in self._list():
+                self.states[self.key(record)] = self._state(record)
+                self._track_since(record)
+            self._synced = time.monotonic()
+            return []
+
+        events = []
+        flagged = {}
+        seen = set()
+        full = (
+            self.since is None or time.monotonic() - self._synced >= self.resync
+        )
+        if full:
+            changed = self._list()
+            self._synced = time.monotonic()
+        else:
+            changed = self._list(Q(**{"{}__gte".format(self.changed_field): self.since}))
+        for record in changed:
+            key = self.key(record)
+            seen.add(key)
+            self._track_since(record)
+            current = self._state(record)
+            previous = self.states.get(key)
+            if previous is None or previous[0] != current[0]:
+                events.append(
+                    ChangeEvent(
+                        STATUS, key, previous and previous[0], current[0], record
+                    )
+                )
+            flagged[key] = record
+            self.states[key] = (current[0],) + (previous or current)[1:]
+
+        if full:
+            for key in set(self.states) - seen:
+                code = self.states.pop(key)[0]
+                events.append(ChangeEvent(REMOVED, key, code, None, None))
+
+        for record in self._list(
+            Q(**{self.acknowledged_field: True}) | Q(**{self.downtime_field: True})
+        ):
+            flagged[self.key(record)] = record
+
+        for key, (code, acknowledged, downtime) in list(self.states.items()):
+            record = flagged.get(key)
+            now_acknowledged, now_downtime = False, False
+            if record is not None:
+                _, now_acknowledged, now_downtime = self._state(record)
+            if now_acknowledged != acknowledged:
+                kind = ACKNOWLEDGED if now_acknowledged else ACKNOWLEDGEMENT_REMOVED
+                events.append(ChangeEvent(kind, key, acknowledged, now_acknowledged, record))
+            if now_downtime != downtime:
+                kind = DOWNTIME_STARTED if now_downtime else DOWNTIME_ENDED
+                events.append(ChangeEvent(kind, key, downtime, now_downtime, record))
+            self.states[key] = (code, now_acknowledged, now_downtime)
+
+        if events:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return events
+
+    def __iter__(self):
+        while not self._stop.is_set():
+            for event in self.poll():
+                yield event
+            self._stop.wait(self.interval)
+
+    async def _aiter(self):
+        while not self._stop.is_set():
+            for event in await asyncio.to_thread(self.poll):
+                yield event
+            await asyncio.sleep(self.interval)
+
+    def __aiter__(self):
+        return self._aiter()
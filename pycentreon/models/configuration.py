@@ -14,7 +14,18 @@ limitations under the License.
 
 from pycentreon.core.query import Request
 from pycentreon.core.response import Record, JsonField
-from pycentreon.core.endpoint import RODetailEndpoint, DetailEndpoint
+from pycentreon.core.endpoint import Endpoint, RODetailEndpoint, DetailEndpoint
+from pycentreon.models.schema import (
+    ConfigurationHosts,
+    ConfigurationHostsCategories,
+    ConfigurationHostsGroups,
+    ConfigurationHostsTemplates,
+    ConfigurationMetaservices,
+    ConfigurationServices,
+    ConfigurationServicesCategories,
+    ConfigurationServicesGroups,
+    ConfigurationServicesTemplates,
+)
 
 class DeviceTypes(Record):
     def __str__(self):
@@ -22,25 +33,28 @@ class DeviceTypes(Record):
 
 ## Host class
 
-class Hosts(Record):
+class HostsEndpoint(Endpoint):
+  shard_poller_field = "monitoring_server.id"
+
+class Hosts(ConfigurationHosts):
   id: JsonField
   name: JsonField
   alias: JsonField
 
 
 
-class HostsGroups(Record):
+class HostsGroups(ConfigurationHostsGroups):
   pass
 
-class HostsCategories(Record):
+class HostsCategories(ConfigurationHostsCategories):
   pass
 
-class HostsTemplates(Record):
+class HostsTemplates(ConfigurationHostsTemplates):
   pass
 
 ## MetaServices class
 
-class MetaServices(Record):
+class MetaServices(ConfigurationMetaservices):
   pass
 
 ## Ressources class
@@ -50,14 +64,14 @@ class Resources(Record):
 
 ## Services class
 
-class Services(Record):
+class Services(ConfigurationServices):
   pass
 
-class ServicesGroups(Record):
+class ServicesGroups(ConfigurationServicesGroups):
   pass
 
-class ServicesCategories(Record):
+class ServicesCategories(ConfigurationServicesCategories):
   pass
 
-class ServicesTemplates(Record):
+class ServicesTemplates(ConfigurationServicesTemplates):
   pass
\ No newline at end of file
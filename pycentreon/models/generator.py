@@ -0,0 +1,241 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Generates model classes from the Centreon OpenAPI specification:
+
+  python -m pycentreon.models.generator centreon-api.yaml -o pycentreon/models/schema.py
+
+Each listing endpoint of the specification (``GET`` returning a
+``result`` array) gets a Record class with its fields declared, so that
+the parser compiled for the class resolves them once. Models subclass
+them to add methods:
+
+  class Hosts(ConfigurationHosts):
+    services = SubResource(endpoint="services", parent_field="host.id")
+"""
+import argparse
+import json
+import re
+import sys
+
+try:
+  import yaml
+except ImportError:
+  yaml = None
+
+APPS = (
+  "administration",
+  "configuration",
+  "gorgone",
+  "monitoring",
+  "platform",
+  "users",
+)
+
+SCALAR_TYPES = {
+  "boolean": "bool",
+  "integer": "int",
+  "number": "float",
+  "string": "str",
+}
+
+HEADER = '''"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Generated by ``python -m pycentreon.models.generator`` from the Centreon
+OpenAPI specification{version}, do not edit.
+"""
+
+from pycentreon.core.response import Record, JsonField
+'''
+
+
+def load_spec(path):
+  """Reads an OpenAPI specification, JSON or YAML."""
+  with open(path) as f:
+    content = f.read()
+  if path.endswith((".yaml", ".yml")):
+    if yaml is None:
+      raise ImportError("PyYAML is required to read {}".format(path))
+    return yaml.safe_load(content)
+  return json.loads(content)
+
+
+def _resolve(spec, schema, seen=()):
+  """Follows ``$ref`` and merges ``allOf`` into a single schema."""
+  schema = schema or {}
+  ref = schema.get("$ref")
+  if ref is not None:
+    if not ref.startswith("#/") or ref in seen:
+      return {}
+    target = spec
+    for part in ref[2:].split("/"):
+      target = target.get(part.replace("~1", "/").replace("~0", "~"), {})
+    return _resolve(spec, target, seen + (ref,))
+  if "allOf" in schema:
+    merged = {"type": "object", "properties": {}}
+    for sub in schema["allOf"]:
+      sub = _resolve(spec, sub, seen)
+      merged["properties"].update(sub.get("properties") or {})
+    return merged
+  return schema
+
+
+def _type(schema):
+  kind = schema.get("type")
+  if isinstance(kind, list):
+    # OpenAPI 3.1 nullable types, e.g. ["string", "null"]
+    kind = next((k for k in kind if k != "null"), None)
+  if kind is None and "properties" in schema:
+    kind = "object"
+  return kind
+
+
+def field_type(spec, schema):
+  """Returns the annotation of a property.
+
+  Objects with properties become Records, free-form objects are kept as
+  JSON, arrays of objects with properties are ``[Record]`` and other
+  arrays ``list``.
+  """
+  schema = _resolve(spec, schema)
+  for variant in ("oneOf", "anyOf"):
+    if variant in schema:
+      variants = [_resolve(spec, s) for s in schema[variant]]
+      variants = [s for s in variants if _type(s) not in (None, "null")]
+      schema = variants[0] if len(variants) == 1 else {}
+  kind = _type(schema)
+  if kind == "object":
+    return "Record" if schema.get("properties") else "JsonField"
+  if kind == "array":
+    items = _resolve(spec, schema.get("items"))
+    if _type(items) == "object" and items.get("properties"):
+      return "[Record]"
+    return "list"
+  return SCALAR_TYPES.get(kind, "object")
+
+
+def class_name(path):
+  """``/configuration/hosts/templates`` => ``ConfigurationHostsTemplates``"""
+  words = re.split(r"[-_/]", path.strip("/"))
+  return "".join(word.capitalize() for word in words)
+
+
+def model_key(path):
+  """``/configuration/hosts/templates`` => ``configuration.hosts_templates``,
+  as in ``CONTENT_TYPE_MAPPER``."""
+  parts = path.strip("/").split("/")
+  return "{}.{}".format(parts[0], "_".join(parts[1:]).replace("-", "_"))
+
+
+def _api_path(path):
+  # Drops the prefix before the app, e.g. /latest or /v23.10
+  parts = path.strip("/").split("/")
+  for i, part in enumerate(parts):
+    if part in APPS:
+      return "/" + "/".join(parts[i:])
+  return None
+
+
+def _listing_schema(spec, operation):
+  response = (operation.get("responses") or {}).get("200") or {}
+  response = _resolve(spec, response)
+  content = (response.get("content") or {}).get("application/json") or {}
+  schema = _resolve(spec, content.get("schema"))
+  result = (schema.get("properties") or {}).get("result")
+  if result is None:
+    return None
+  result = _resolve(spec, result)
+  if _type(result) != "array":
+    return None
+  return _resolve(spec, result.get("items"))
+
+
+def models(spec, apps=None):
+  """Returns ``(path, {field: annotation})`` for each listing endpoint."""
+  ret = {}
+  for path, operations in sorted((spec.get("paths") or {}).items()):
+    path = _api_path(path)
+    if path is None or "{" in path or "get" not in operations:
+      continue
+    if apps and path.strip("/").split("/")[0] not in apps:
+      continue
+    items = _listing_schema(spec, operations["get"])
+    if not items or not items.get("properties"):
+      continue
+    ret[path] = {
+      name: field_type(spec, prop) for name, prop in items["properties"].items()
+    }
+  return sorted(ret.items())
+
+
+def render(spec, apps=None):
+  """Returns the source of the models module."""
+  version = (spec.get("info") or {}).get("version")
+  lines = [HEADER.format(version=" {}".format(version) if version else "")]
+  keys = []
+  app = None
+  for path, fields in models(spec, apps):
+    if path.strip("/").split("/")[0] != app:
+      app = path.strip("/").split("/")[0]
+      lines.append("## {}\n".format(app))
+    name = class_name(path)
+    keys.append((model_key(path), name))
+    lines.append("class {}(Record):".format(name))
+    for field, annotation in fields.items():
+      if field.isidentifier():
+        lines.append("  {}: {}".format(field, annotation))
+    if not any(f.isidentifier() for f in fields):
+      lines.append("  pass")
+    lines.append("\n")
+  lines.append("MODELS = {")
+  lines.extend('  "{}": {},'.format(key, name) for key, name in keys)
+  lines.append("}\n")
+  return "\n".join(lines)
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(
+    prog="python -m pycentreon.models.generator",
+    description="Generates model classes from the Centreon OpenAPI specification.",
+  )
+  parser.add_argument("spec", help="OpenAPI specification, JSON or YAML")
+  parser.add_argument("-o", "--output", help="Module to write, stdout by default")
+  parser.add_argument(
+    "--app",
+    action="append",
+    dest="apps",
+    choices=APPS,
+    help="Only this app, repeatable",
+  )
+  args = parser.parse_args(argv)
+  source = render(load_spec(args.spec), args.apps)
+  if args.output:
+    with open(args.output, "w") as f:
+      f.write(source)
+  else:
+    sys.stdout.write(source)
+
+
+if __name__ == "__main__":
+  main()
@@ -12,6 +12,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from pycentreon.core.response import register_content_types
+
 from .gorgone import(
     Pollers
 )
@@ -68,4 +70,6 @@ CONTENT_TYPE_MAPPER = {
     "monitoring.services_severities": None,
     "monitoring.services_templates": ServicesTemplates,
     "gorgone.pollers": Pollers,
-}
\ No newline at end of file
+}
+
+register_content_types(CONTENT_TYPE_MAPPER)
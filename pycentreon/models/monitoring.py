@@ -12,23 +12,75 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import datetime
+
+from pycentreon.core.bulk import run_chunked
 from pycentreon.core.query import Request
 from pycentreon.core.response import Record, JsonField
-from pycentreon.core.endpoint import RODetailEndpoint, DetailEndpoint
+from pycentreon.core.util import format_time
+from pycentreon.core.endpoint import Endpoint, RODetailEndpoint, DetailEndpoint, SubResource
+from pycentreon.models.schema import (
+    MonitoringHostgroups,
+    MonitoringHosts,
+    MonitoringHostsCategories,
+    MonitoringResources,
+    MonitoringServicegroups,
+    MonitoringServices,
+    MonitoringServicesCategories,
+)
 
 class DeviceTypes(Record):
     def __str__(self):
         return self.model
 
+## Status counters
+
+class StatusCountEndpoint(Endpoint):
+  """Endpoint exposing Centreon's ``<endpoint>/status`` counters."""
+
+  def status_summary(self, *args, **kwargs):
+    r"""Returns the number of objects in each state.
+
+    Uses the status counters of Centreon, a single small request
+    instead of listing every object.
+
+    :arg \*args: Same filters as :py:meth:`.Endpoint.filter`.
+    :arg \**kwargs: Same filters as :py:meth:`.Endpoint.filter`.
+
+    :returns: dict of state name to count, plus ``total``.
+
+    :Examples:
+
+    >>> ctn.monitoring.services.status_summary()
+    {'critical': 12, 'warning': 30, 'unknown': 2, 'ok': 18215, 'pending': 0, 'total': 18259}
+    >>> ctn.monitoring.hosts.status_summary(poller__id=2)
+    {'down': 1, 'unreachable': 0, 'up': 412, 'pending': 0, 'total': 413}
+    """
+    resp = next(
+      Request(
+        base="{}/status".format(self.url),
+        filters=self._create_ctn_search(*args, **kwargs),
+        **self._request_kwargs(),
+      ).get()
+    )
+    return {
+      k: v.get("total", 0) if isinstance(v, dict) else v
+      for k, v in resp.items()
+    }
+
 ## Host class
 
-class Hosts(Record):
+class HostsEndpoint(StatusCountEndpoint):
   pass
 
-class HostsGroups(Record):
+class Hosts(MonitoringHosts):
+  services = SubResource(endpoint="services", parent_field="host.id")
+  timeline = SubResource()
+
+class HostsGroups(MonitoringHostgroups):
   pass
 
-class HostsCategories(Record):
+class HostsCategories(MonitoringHostsCategories):
   pass
 
 class HostsTemplates(Record):
@@ -41,18 +93,174 @@ class MetaServices(Record):
 
 ## Ressources class
 
-class Resources(Record):
+def _resource_ref(obj):
+  """Returns the ``{"type", "id", "parent"}`` reference of a resource.
+
+  Accepts resource, host or service Records, reference dicts, host ids
+  and ``(host_id, service_id)`` tuples. Raises ValueError for what cannot
+  be referenced, e.g. a service Record without its host.
+  """
+  if isinstance(obj, dict):
+    return obj
+  if isinstance(obj, int):
+    return {"type": "host", "id": obj, "parent": None}
+  if isinstance(obj, tuple):
+    return {"type": "service", "id": obj[1], "parent": {"id": obj[0]}}
+  if isinstance(obj, Record):
+    kind = getattr(obj, "type", None)
+    if kind is None:
+      kind = "service" if obj.endpoint.name == "services" else "host"
+    parent = getattr(obj, "parent", None) or getattr(obj, "host", None)
+    if kind == "service":
+      if parent is None:
+        raise ValueError("Service {} has no parent host to reference".format(obj.id))
+      return {"type": kind, "id": obj.id, "parent": {"id": parent.id}}
+    return {"type": kind, "id": obj.id, "parent": None}
+  raise ValueError("Cannot reference {} as a resource".format(type(obj)))
+
+
+class ResourcesEndpoint(Endpoint):
+  """Endpoint of the monitoring resources, with batched actions."""
+
+  def _bulk_action(self, action, payload_name, payload, resources, chunk_size, workers):
+    def send(chunk):
+      Request(
+        base="{}/{}".format(self.url, action),
+        compress_min_size=self.api.compress_min_size,
+        **self._request_kwargs(),
+      ).post({payload_name: payload, "resources": [r for _, r in chunk]})
+
+    # Referenced upfront so that an invalid resource fails before any call
+    items = [(obj, _resource_ref(obj)) for obj in resources]
+    result = run_chunked(
+      items,
+      send,
+      chunk_size=chunk_size,
+      workers=workers or self.api.max_workers,
+    )
+    for i, outcome in enumerate(result):
+      result[i] = outcome._replace(item=outcome.item[0])
+    return result
+
+  def acknowledge(
+    self,
+    resources,
+    comment,
+    with_services=True,
+    notify=False,
+    sticky=True,
+    persistent=True,
+    chunk_size=100,
+    workers=None,
+  ):
+    """Acknowledges many resources with batched calls.
+
+    :arg iterable resources: A :py:class:`.RecordSet` or list of resource,
+      host or service Records, host ids, ``(host_id, service_id)`` tuples
+      or ``{"type", "id", "parent"}`` dicts.
+    :arg str comment: Acknowledgement comment.
+    :arg bool,optional with_services: Also acknowledge the services of hosts.
+    :arg bool,optional notify: Notify the contacts.
+    :arg bool,optional sticky: Keep the acknowledgement until the resource
+      is back to OK.
+    :arg bool,optional persistent: Keep the comment after a restart.
+    :arg int,optional chunk_size: Resources per call.
+    :arg int,optional workers: Calls in flight, defaults to ``Api.max_workers``.
+
+    :returns: :py:class:`.BulkResult` with one outcome per resource.
+
+    :Examples:
+
+    >>> down = ctn.monitoring.resources.filter(status__code=2, type="service")
+    >>> result = ctn.monitoring.resources.acknowledge(down, "Storage outage, INC-4211")
+    >>> result.ok, len(result.failed)
+    (True, 0)
+    """
+    return self._bulk_action(
+      "acknowledge",
+      "acknowledgement",
+      {
+        "comment": comment,
+        "with_services": with_services,
+        "is_notify_contacts": notify,
+        "is_sticky": sticky,
+        "is_persistent_comment": persistent,
+      },
+      resources,
+      chunk_size,
+      workers,
+    )
+
+  def downtime(
+    self,
+    resources,
+    comment,
+    start=None,
+    end=None,
+    duration=3600,
+    fixed=True,
+    with_services=True,
+    chunk_size=100,
+    workers=None,
+  ):
+    """Schedules a downtime on many resources with batched calls.
+
+    :arg iterable resources: Same as :py:meth:`acknowledge`.
+    :arg str comment: Downtime comment.
+    :arg datetime|str,optional start: Start of the downtime, now by default.
+    :arg datetime|str,optional end: End of the downtime, ``start + duration``
+      by default when ``start`` is a datetime.
+    :arg int,optional duration: Length in seconds of the downtime, and of
+      flexible downtimes once they start.
+    :arg bool,optional fixed: Fixed downtime, flexible otherwise.
+    :arg bool,optional with_services: Also put the services of hosts in
+      downtime.
+    :arg int,optional chunk_size: Resources per call.
+    :arg int,optional workers: Calls in flight, defaults to ``Api.max_workers``.
+
+    :returns: :py:class:`.BulkResult` with one outcome per resource.
+
+    :Examples:
+
+    >>> hosts = ctn.monitoring.hosts.filter(name__like="DC1%")
+    >>> ctn.monitoring.resources.downtime(hosts, "DC1 maintenance", duration=7200)
+    """
+    if start is None:
+      start = datetime.datetime.now().astimezone()
+    if end is None and isinstance(start, datetime.datetime):
+      end = start + datetime.timedelta(seconds=duration)
+    return self._bulk_action(
+      "downtime",
+      "downtime",
+      {
+        "comment": comment,
+        "start_time": format_time(start),
+        "end_time": format_time(end),
+        "duration": duration,
+        "is_fixed": fixed,
+        "with_services": with_services,
+      },
+      resources,
+      chunk_size,
+      workers,
+    )
+
+
+class Resources(MonitoringResources):
   pass
 
 ## Services class
 
-class Services(Record):
+class ServicesEndpoint(StatusCountEndpoint):
+  pass
+
+class Services(MonitoringServices):
   pass
 
-class ServicesGroups(Record):
+class ServicesGroups(MonitoringServicegroups):
   pass
 
-class ServicesCategories(Record):
+class ServicesCategories(MonitoringServicesCategories):
   pass
 
 class ServicesTemplates(Record):
@@ -0,0 +1,386 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Generated by ``python -m pycentreon.models.generator`` from the Centreon
+OpenAPI specification 24.04 (subset), do not edit.
+"""
+
+from pycentreon.core.response import Record, JsonField
+
+## configuration
+
+class ConfigurationHosts(Record):
+  id: int
+  name: str
+  alias: str
+  address: str
+  monitoring_server: Record
+  templates: [Record]
+  normal_check_interval: int
+  retry_check_interval: int
+  notification_timeperiod: Record
+  check_timeperiod: Record
+  severity: Record
+  categories: [Record]
+  groups: [Record]
+  is_activated: bool
+
+
+class ConfigurationHostsCategories(Record):
+  id: int
+  name: str
+  alias: str
+  is_activated: bool
+  comment: str
+
+
+class ConfigurationHostsGroups(Record):
+  id: int
+  name: str
+  alias: str
+  notes: str
+  notes_url: str
+  action_url: str
+  icon_id: int
+  icon_map_id: int
+  rrd: int
+  geo_coords: str
+  comment: str
+  is_activated: bool
+
+
+class ConfigurationHostsSeverities(Record):
+  id: int
+  name: str
+  alias: str
+  level: int
+  icon_id: int
+  is_activated: bool
+  comment: str
+
+
+class ConfigurationHostsTemplates(Record):
+  id: int
+  name: str
+  alias: str
+  snmp_version: str
+  snmp_community: str
+  timezone_id: int
+  severity_id: int
+  check_command_id: int
+  check_command_args: list
+  check_timeperiod_id: int
+  max_check_attempts: int
+  normal_check_interval: int
+  retry_check_interval: int
+  active_check_enabled: int
+  passive_check_enabled: int
+  notification_enabled: int
+  notification_options: int
+  notification_interval: int
+  notification_timeperiod_id: int
+  add_inherited_contact_group: bool
+  add_inherited_contact: bool
+  first_notification_delay: int
+  recovery_notification_delay: int
+  acknowledgement_timeout: int
+  freshness_checked: int
+  freshness_threshold: int
+  flap_detection_enabled: int
+  low_flap_threshold: int
+  high_flap_threshold: int
+  event_handler_enabled: int
+  event_handler_command_id: int
+  event_handler_command_args: list
+  note_url: str
+  note: str
+  action_url: str
+  icon_id: int
+  icon_alternative: str
+  comment: str
+  is_locked: bool
+  templates: [Record]
+  macros: [Record]
+
+
+class ConfigurationMetaservices(Record):
+  id: int
+  name: str
+  meta_display: str
+  check_period_id: int
+  max_check_attempts: int
+  normal_check_interval: int
+  retry_check_interval: int
+  calculation_type: str
+  data_source_type: str
+  warning: str
+  critical: str
+  is_activated: bool
+
+
+class ConfigurationMonitoringServers(Record):
+  id: int
+  name: str
+  address: str
+  is_localhost: bool
+  is_default: bool
+  ssh_port: int
+  last_restart: int
+  engine_start_command: str
+  engine_stop_command: str
+  engine_restart_command: str
+  engine_reload_command: str
+  broker_reload_command: str
+  is_updated: bool
+  is_activated: bool
+
+
+class ConfigurationServices(Record):
+  id: int
+  name: str
+  hosts: [Record]
+  service_template: Record
+  check_timeperiod: Record
+  notification_timeperiod: Record
+  severity: Record
+  normal_check_interval: int
+  retry_check_interval: int
+  categories: [Record]
+  groups: [Record]
+  is_activated: bool
+
+
+class ConfigurationServicesCategories(Record):
+  id: int
+  name: str
+  alias: str
+  is_activated: bool
+  comment: str
+
+
+class ConfigurationServicesGroups(Record):
+  id: int
+  name: str
+  alias: str
+  geo_coords: str
+  comment: str
+  is_activated: bool
+
+
+class ConfigurationServicesSeverities(Record):
+  id: int
+  name: str
+  alias: str
+  level: int
+  icon_id: int
+  is_activated: bool
+  comment: str
+
+
+class ConfigurationServicesTemplates(Record):
+  id: int
+  name: str
+  alias: str
+  comment: str
+  service_template_id: int
+  check_command_id: int
+  check_command_args: list
+  check_timeperiod_id: int
+  max_check_attempts: int
+  normal_check_interval: int
+  retry_check_interval: int
+  active_check_enabled: int
+  passive_check_enabled: int
+  volatility_enabled: int
+  notification_enabled: int
+  is_contact_additive_inheritance: bool
+  is_contact_group_additive_inheritance: bool
+  notification_interval: int
+  notification_timeperiod_id: int
+  notification_type: int
+  first_notification_delay: int
+  recovery_notification_delay: int
+  acknowledgement_timeout: int
+  freshness_checked: int
+  freshness_threshold: int
+  flap_detection_enabled: int
+  low_flap_threshold: int
+  high_flap_threshold: int
+  event_handler_enabled: int
+  event_handler_command_id: int
+  event_handler_command_args: list
+  graph_template_id: int
+  note: str
+  note_url: str
+  action_url: str
+  icon_id: int
+  icon_alternative: str
+  severity_id: int
+  host_templates: list
+  is_locked: bool
+  macros: [Record]
+
+
+## monitoring
+
+class MonitoringHostgroups(Record):
+  id: int
+  name: str
+  alias: str
+
+
+class MonitoringHosts(Record):
+  id: int
+  type: str
+  name: str
+  alias: str
+  display_name: str
+  address_ip: str
+  poller_id: int
+  monitoring_server_name: str
+  check_attempt: int
+  max_check_attempts: int
+  checked: bool
+  execution_time: float
+  acknowledged: bool
+  in_downtime: bool
+  state: int
+  state_type: int
+  status: Record
+  output: str
+  last_check: str
+  last_state_change: str
+  last_hard_state_change: str
+  last_notification: str
+  last_update: str
+  notification_number: int
+  passive_checks: bool
+  criticality: int
+  icon_image: str
+  icon_image_alt: str
+  timezone: str
+
+
+class MonitoringHostsCategories(Record):
+  id: int
+  name: str
+
+
+class MonitoringHostsSeverities(Record):
+  id: int
+  name: str
+  level: int
+  type: str
+  icon: Record
+
+
+class MonitoringResources(Record):
+  uuid: str
+  id: int
+  type: str
+  short_type: str
+  name: str
+  alias: str
+  fqdn: str
+  host_id: int
+  service_id: int
+  icon: Record
+  monitoring_server_name: str
+  parent: Record
+  status: Record
+  is_in_downtime: bool
+  is_acknowledged: bool
+  is_in_flapping: bool
+  percent_state_change: float
+  duration: str
+  last_status_change: str
+  tries: str
+  last_check: str
+  information: str
+  performance_data: str
+  is_notification_enabled: bool
+  severity: Record
+  links: Record
+
+
+class MonitoringServicegroups(Record):
+  id: int
+  name: str
+  alias: str
+
+
+class MonitoringServices(Record):
+  id: int
+  type: str
+  description: str
+  display_name: str
+  host: Record
+  check_attempt: int
+  max_check_attempts: int
+  checked: bool
+  execution_time: float
+  acknowledged: bool
+  in_downtime: bool
+  state: int
+  state_type: int
+  status: Record
+  output: str
+  performance_data: str
+  last_check: str
+  last_state_change: str
+  last_hard_state_change: str
+  last_notification: str
+  last_update: str
+  notification_number: int
+  passive_checks: bool
+  criticality: int
+  icon_image: str
+  icon_image_alt: str
+
+
+class MonitoringServicesCategories(Record):
+  id: int
+  name: str
+
+
+class MonitoringServicesSeverities(Record):
+  id: int
+  name: str
+  level: int
+  type: str
+  icon: Record
+
+
+MODELS = {
+  "configuration.hosts": ConfigurationHosts,
+  "configuration.hosts_categories": ConfigurationHostsCategories,
+  "configuration.hosts_groups": ConfigurationHostsGroups,
+  "configuration.hosts_severities": ConfigurationHostsSeverities,
+  "configuration.hosts_templates": ConfigurationHostsTemplates,
+  "configuration.metaservices": ConfigurationMetaservices,
+  "configuration.monitoring_servers": ConfigurationMonitoringServers,
+  "configuration.services": ConfigurationServices,
+  "configuration.services_categories": ConfigurationServicesCategories,
+  "configuration.services_groups": ConfigurationServicesGroups,
+  "configuration.services_severities": ConfigurationServicesSeverities,
+  "configuration.services_templates": ConfigurationServicesTemplates,
+  "monitoring.hostgroups": MonitoringHostgroups,
+  "monitoring.hosts": MonitoringHosts,
+  "monitoring.hosts_categories": MonitoringHostsCategories,
+  "monitoring.hosts_severities": MonitoringHostsSeverities,
+  "monitoring.resources": MonitoringResources,
+  "monitoring.servicegroups": MonitoringServicegroups,
+  "monitoring.services": MonitoringServices,
+  "monitoring.services_categories": MonitoringServicesCategories,
+  "monitoring.services_severities": MonitoringServicesSeverities,
+}
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from pycentreon.core.auth import TokenManager
+from tests.util import listing, make_api
+
+
+def test_expired_token_is_renewed_and_the_call_retried():
+    state = {"expired": False, "logins": 0}
+
+    def handler(verb, path, params, body):
+        if path == "login":
+            state["logins"] += 1
+            state["expired"] = False
+            return 200, {"security": {"token": "t{}".format(state["logins"])}}
+        if state["expired"]:
+            return 401, {"code": 401, "message": "Expired token"}
+        return 200, listing([{"id": 1}], params)
+
+    api, transport = make_api(handler)
+    api.create_token("admin", "secret")
+    assert api.token == "t1"
+
+    state["expired"] = True
+    assert [h.id for h in api.monitoring.hosts.all()] == [1]
+    assert api.token == "t2"
+    assert transport.paths()[:4] == [
+        "login",
+        "monitoring/hosts",
+        "login",
+        "monitoring/hosts",
+    ]
+    assert transport.paths("post") == ["login", "login"]
+
+
+def test_concurrent_refreshes_log_in_once():
+    logins = []
+
+    def login(username, password):
+        logins.append(username)
+        return {"security": {"token": "t{}".format(len(logins))}}
+
+    manager = TokenManager(login_call=login)
+    manager.login("admin", "secret")
+    stale = manager.token
+    barrier = threading.Barrier(8)
+    tokens = []
+
+    def refresh():
+        barrier.wait()
+        tokens.append(manager.refresh(stale))
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # The initial login, then a single renewal shared by every thread
+    assert len(logins) == 2
+    assert tokens == ["t2"] * 8
+
+
+def test_token_cache_is_reused(tmp_path):
+    pytest.importorskip("cryptography")
+    from pycentreon.core.auth import TokenCache
+
+    path = str(tmp_path / "tokens")
+    calls = []
+    login = lambda u, p: calls.append(u) or {"security": {"token": "cached"}}
+    TokenManager(login_call=login, url="u", cache=TokenCache(path, "k")).login("a", "p")
+    manager = TokenManager(login_call=login, url="u", cache=TokenCache(path, "k"))
+    manager.login("a", "p")
+    assert manager.token == "cached"
+    assert calls == ["a"]
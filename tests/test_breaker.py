@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from pycentreon.core.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from pycentreon.core.query import CircuitOpenError, RequestError
+from tests.util import HOST, listing, make_api
+
+
+def test_breaker_fails_fast_then_recovers():
+    status = {"code": 500}
+
+    def handler(verb, path, params, body):
+        return status["code"], listing([{"id": 1}], params)
+
+    api, transport = make_api(
+        handler, circuit_breaker={"failure_threshold": 2, "recovery_timeout": 0.05}
+    )
+    hosts = api.monitoring.hosts
+    for _ in range(2):
+        with pytest.raises(RequestError):
+            list(hosts.all())
+    with pytest.raises(CircuitOpenError) as e:
+        list(hosts.all())
+    assert e.value.key == "monitoring/hosts"
+    assert len(transport.calls) == 2
+    # Other endpoints are not affected
+    assert api.breakers.get("monitoring/services").state == CLOSED
+
+    time.sleep(0.06)
+    status["code"] = 200
+    assert [h.id for h in hosts.all()] == [1]
+    assert api.metrics()["breakers"]["monitoring/hosts"]["state"] == CLOSED
+
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker("k", failure_threshold=100, error_rate=0.5, window=4, min_calls=4)
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker("k", failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+
+    admitted, rejected = [], []
+    barrier = threading.Barrier(16)
+
+    def call():
+        barrier.wait()
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            rejected.append(1)
+        else:
+            admitted.append(1)
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert (len(admitted), len(rejected)) == (1, 15)
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.metrics()["times_opened"] == 2
+
+
+def test_detail_reads_go_through_the_breaker():
+    url = HOST + "/api/latest/monitoring/hosts/1"
+
+    def handler(verb, path, params, body):
+        if path == "monitoring/hosts/1":
+            return 500, {"code": 500, "message": "down"}
+        return 200, listing([{"id": 1, "url": url}], params)
+
+    api, transport = make_api(handler, circuit_breaker={"failure_threshold": 1})
+    host = next(iter(api.monitoring.hosts.all()))
+    with pytest.raises(RequestError):
+        host.full_details()
+    calls = len(transport.calls)
+    with pytest.raises(CircuitOpenError):
+        host.full_details()
+    assert len(transport.calls) == calls
@@ -0,0 +1,50 @@
+from pycentreon.core.bulk import chunks, run_chunked
+from pycentreon.core.query import RequestError
+from pycentreon.core.transport import TransportResponse
+
+
+def error(status):
+    return RequestError(
+        TransportResponse(status, "Reason", "http://centreon/api", {}, b"{}")
+    )
+
+
+def test_chunks():
+    assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_validation_errors_are_bisected():
+    calls = []
+
+    def send(chunk):
+        calls.append(list(chunk))
+        if 3 in chunk:
+            raise error(422)
+
+    result = run_chunked(range(8), send, chunk_size=4, workers=1)
+    assert [o.item for o in result.failed] == [3]
+    assert result.succeeded == [0, 1, 2, 4, 5, 6, 7]
+    assert [2, 3] in calls and [3] in calls
+
+
+def test_other_client_errors_stop_the_run():
+    calls = []
+
+    def send(chunk):
+        calls.append(list(chunk))
+        raise error(429)
+
+    result = run_chunked(range(100), send, chunk_size=10, workers=1)
+    assert calls == [list(range(10))]
+    assert len(result.failed) == 100
+    assert all(o.error.req.status_code == 429 for o in result.failed)
+
+
+def test_server_errors_fail_the_chunk():
+    def send(chunk):
+        if 0 in chunk:
+            raise error(500)
+
+    result = run_chunked(range(4), send, chunk_size=2, workers=2)
+    assert [o.item for o in result.failed] == [0, 1]
+    assert result.succeeded == [2, 3]
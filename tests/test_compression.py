@@ -0,0 +1,50 @@
+import concurrent.futures as cf
+import json
+
+from pycentreon.core.query import Request
+from tests.util import make_api
+
+
+def _created(verb, path, params, body):
+    return 201, body
+
+
+def test_large_bodies_are_gzipped():
+    api, transport = make_api(_created, compress_requests=True)
+    hosts = [{"name": "srv{}".format(i), "address": "10.0.0.1"} for i in range(300)]
+    api.configuration.hosts.create(hosts)
+
+    assert transport.calls[0][3] == hosts
+    assert transport.headers[0]["Content-Encoding"] == "gzip"
+    assert "gzip" in transport.headers[0]["Accept-Encoding"]
+    stats = api.metrics()["transfer"]
+    assert stats["bytes_sent_wire"] < stats["bytes_sent"] / 5
+
+
+def test_small_bodies_are_sent_as_is():
+    api, transport = make_api(_created, compress_requests=True)
+    api.configuration.hosts.create({"name": "srv"})
+    assert "Content-Encoding" not in transport.headers[0]
+    stats = api.metrics()["transfer"]
+    assert stats["bytes_sent_wire"] == stats["bytes_sent"]
+
+
+def test_compression_is_off_by_default():
+    api, transport = make_api(_created)
+    api.configuration.hosts.create([{"name": "srv{}".format(i)} for i in range(300)])
+    assert "Content-Encoding" not in transport.headers[0]
+
+
+def test_counters_of_a_request_shared_by_threads():
+    api, transport = make_api(_created, compress_requests=True)
+    request = Request(
+        base=api.configuration.hosts.url,
+        compress_min_size=api.compress_min_size,
+        **api.configuration.hosts._request_kwargs()
+    )
+    bodies = [[{"name": "srv{}".format(j)} for j in range(i * 20)] for i in range(1, 33)]
+    with cf.ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request.post, bodies))
+    assert request.bytes_sent == sum(len(json.dumps(b).encode()) for b in bodies)
+    assert request.bytes_sent == api.metrics()["transfer"]["bytes_sent"]
+    assert request.bytes_sent_wire < request.bytes_sent
@@ -0,0 +1,38 @@
+from tests.util import listing, make_api
+
+HOSTS = [{"id": i, "name": "srv{}".format(i)} for i in range(1, 8)]
+
+
+def _handler(verb, path, params, body):
+    if path == "monitoring/services/status":
+        return 200, {
+            "critical": {"total": 2},
+            "warning": {"total": 1},
+            "ok": {"total": 40},
+            "total": 43,
+        }
+    records = HOSTS if "search" not in params else []
+    return 200, listing(records, params)
+
+
+def test_count_only_asks_for_the_total():
+    api, transport = make_api(_handler)
+    assert api.configuration.hosts.count() == 7
+    assert api.configuration.hosts.count(name="none") == 0
+    assert [c[2]["limit"] for c in transport.calls] == [0, 0]
+
+
+def test_exists_fetches_a_single_record():
+    api, transport = make_api(_handler)
+    assert api.configuration.hosts.exists() is True
+    assert api.configuration.hosts.exists(name="none") is False
+    assert [c[2]["limit"] for c in transport.calls] == [1, 1]
+
+
+def test_status_summary():
+    api, transport = make_api(_handler)
+    summary = api.monitoring.services.status_summary(host__name="srv1")
+    assert summary == {"critical": 2, "warning": 1, "ok": 40, "total": 43}
+    ((verb, path, params, body),) = transport.calls
+    assert path == "monitoring/services/status"
+    assert params["search"] == '{"host.name":{"$eq":"srv1"}}'
@@ -0,0 +1,44 @@
+from tests.util import listing, make_api
+
+HOSTS = [{"id": i, "name": "srv{}".format(i)} for i in range(1, 26)]
+
+
+def _hosts(verb, path, params, body):
+    if path == "configuration/hosts/12":
+        return 200, HOSTS[11]
+    return 200, listing(HOSTS, params)
+
+
+def test_get_by_key_is_not_decoded_as_a_listing():
+    api, transport = make_api(_hosts, decode_workers=2)
+    try:
+        host = api.configuration.hosts.get(12)
+    finally:
+        api.decoder.shutdown()
+    assert host.id == 12 and host.name == "srv12"
+    assert transport.paths() == ["configuration/hosts/12"]
+
+
+def test_listing_is_decoded_in_workers():
+    api, transport = make_api(_hosts, decode_workers=2)
+    api.decoder.page_size = 10
+    try:
+        hosts = list(api.configuration.hosts.all())
+    finally:
+        api.decoder.shutdown()
+    assert [h.id for h in hosts] == list(range(1, 26))
+    assert hosts[0].api is api
+    assert hosts[0].endpoint.name == "hosts"
+
+
+def test_plain_array_listing_is_not_decoded_by_pages():
+    def handler(verb, path, params, body):
+        return 200, [{"id": 1}, {"id": 2}]
+
+    api, _ = make_api(handler, decode_workers=2)
+    try:
+        hosts = list(api.configuration.hosts.all())
+    finally:
+        api.decoder.shutdown()
+    assert [h.id for h in hosts] == [1, 2]
+    assert hosts[0].api is api
@@ -0,0 +1,37 @@
+import pycentreon
+from pycentreon.core.query import RequestError
+from tests.util import listing, make_api
+
+
+def _central(hosts):
+    def handler(verb, path, params, body):
+        if hosts is None:
+            return 500, {"code": 500, "message": "down"}
+        return 200, listing(hosts, params)
+
+    return make_api(handler)[0]
+
+
+def test_listing_tags_records_and_keeps_going_on_errors():
+    fed = pycentreon.federation(
+        {
+            "paris": _central([{"id": 1}, {"id": 2}]),
+            "lyon": _central([{"id": 3}]),
+            "nice": _central(None),
+        }
+    )
+    hosts = fed.monitoring.hosts.all()
+    results = sorted((central, host.id) for central, host in hosts)
+    assert results == [("lyon", 3), ("paris", 1), ("paris", 2)]
+    assert list(hosts.errors) == ["nice"]
+    assert isinstance(hosts.errors["nice"], RequestError)
+
+
+def test_count_per_central():
+    fed = pycentreon.federation(
+        {"paris": _central([{"id": 1}, {"id": 2}]), "nice": _central(None)}
+    )
+    counts = fed.monitoring.hosts.count()
+    assert counts == {"paris": 2}
+    assert list(counts.errors) == ["nice"]
+
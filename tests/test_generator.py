@@ -0,0 +1,116 @@
+import os
+
+from pycentreon.core import response
+from pycentreon.core.response import JsonField, Record
+from pycentreon.models import generator, monitoring, schema
+
+from tests.util import listing, make_api
+
+MODELS_DIR = os.path.dirname(generator.__file__)
+
+SPEC = {
+    "info": {"version": "24.04"},
+    "components": {
+        "schemas": {
+            "Parent": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+            }
+        }
+    },
+    "paths": {
+        "/latest/monitoring/services": {
+            "get": {
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "properties": {
+                                        "result": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "id": {"type": "integer"},
+                                                    "parent": {"$ref": "#/components/schemas/Parent"},
+                                                    "groups": {
+                                                        "type": "array",
+                                                        "items": {"$ref": "#/components/schemas/Parent"},
+                                                    },
+                                                    "tags": {"type": "array", "items": {"type": "string"}},
+                                                    "extra": {"type": "object"},
+                                                    "output": {"type": ["string", "null"]},
+                                                },
+                                            },
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "/latest/monitoring/services/{id}": {"get": {}},
+    },
+}
+
+
+def test_models_resolve_field_types():
+    assert generator.models(SPEC) == [
+        (
+            "/monitoring/services",
+            {
+                "id": "int",
+                "parent": "Record",
+                "groups": "[Record]",
+                "tags": "list",
+                "extra": "JsonField",
+                "output": "str",
+            },
+        )
+    ]
+
+
+def test_rendered_module_parses_records():
+    namespace = {}
+    exec(generator.render(SPEC), namespace)
+    cls = namespace["MonitoringServices"]
+    assert namespace["MODELS"] == {"monitoring.services": cls}
+    record = cls(
+        {
+            "id": 1,
+            "parent": {"id": 2, "name": "srv"},
+            "groups": [{"id": 3, "name": "g"}],
+            "tags": ["a"],
+            "extra": {"k": {"v": 1}},
+        },
+        None,
+        None,
+    )
+    assert isinstance(record.parent, Record) and record.parent.name == "srv"
+    assert isinstance(record.groups[0], Record) and record.groups[0].id == 3
+    assert record.tags == ["a"]
+    assert record.extra == {"k": {"v": 1}}
+    assert cls.__annotations__["extra"] is JsonField
+
+
+def test_committed_schema_matches_the_spec():
+    spec = generator.load_spec(os.path.join(MODELS_DIR, "centreon-api.json"))
+    with open(schema.__file__) as f:
+        assert f.read() == generator.render(spec)
+
+
+def test_models_subclass_generated_classes():
+    def handler(verb, path, params, body):
+        return 200, listing(
+            [{"id": 1, "name": "srv1", "status": {"code": 0, "name": "UP"}}], params
+        )
+
+    api, _ = make_api(handler)
+    host = next(iter(api.monitoring.hosts.all()))
+    assert isinstance(host, monitoring.Hosts)
+    assert isinstance(host, schema.MonitoringHosts)
+    assert isinstance(host.status, Record) and host.status.name == "UP"
+    assert response._CONTENT_TYPES["monitoring.hosts"] is monitoring.Hosts
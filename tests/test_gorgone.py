@@ -0,0 +1,64 @@
+import itertools
+import time
+
+import pytest
+import requests
+
+from pycentreon.core.gorgone import ACTION_FINISH_OK, ACTION_STARTED, GorgoneClient
+
+
+def _client(logs, **kwargs):
+    client = GorgoneClient(
+        "http://central:8085", min_interval=0.01, max_interval=0.02, **kwargs
+    )
+    tokens = itertools.count()
+    client.dispatch = lambda node_id, command, timeout: "t{}".format(next(tokens))
+    client.logs = logs
+    return client
+
+
+def test_log_errors_keep_the_command_pending():
+    replies = [
+        requests.ConnectionError("reset"),
+        [{"code": ACTION_STARTED}],
+        requests.ConnectionError("reset"),
+        requests.ConnectionError("reset"),
+        [{"code": ACTION_FINISH_OK, "data": {"result": {"stdout": "up"}}}],
+    ]
+
+    def logs(token):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    with _client(logs) as client:
+        result = client.submit(1, "uptime").result(timeout=5)
+    assert result.ok is True
+    assert result.output == "up"
+    assert replies == []
+
+
+def test_repeated_log_errors_fail_the_command():
+    calls = []
+
+    def logs(token):
+        calls.append(token)
+        raise requests.ConnectionError("down")
+
+    with _client(logs, max_errors=3) as client:
+        with pytest.raises(requests.ConnectionError):
+            client.submit(1, "uptime").result(timeout=5)
+    assert calls == ["t0"] * 3
+
+
+def test_close_cancels_pending_commands_and_releases_resources():
+    client = _client(lambda token: [{"code": ACTION_STARTED}])
+    future = client.submit(1, "sleep 60")
+    while not client._pending:
+        time.sleep(0.01)
+    client.close()
+    assert future.cancelled()
+    assert client._poller is None
+    with pytest.raises(RuntimeError):
+        client.submit(1, "uptime")
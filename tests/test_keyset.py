@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from tests.util import make_api
+
+HOSTS = [{"id": i, "name": "srv{}".format(i)} for i in (3, 5, 8, 13, 21, 34, 55)]
+
+
+def _handler(verb, path, params, body):
+    search = json.loads(params.get("search", "{}"))
+    searches = search.get("$and", [search] if search else [])
+    after = 0
+    for s in searches:
+        if "id" in s and "$gt" in s["id"]:
+            after = s["id"]["$gt"]
+    assert json.loads(params["sort_by"]) == {"id": "ASC"}
+    assert "page" not in params
+    records = [h for h in HOSTS if h["id"] > after]
+    limit = int(params["limit"])
+    return 200, {
+        "result": records[:limit],
+        "meta": {"page": 1, "limit": limit, "total": len(records)},
+    }
+
+
+def test_keyset_pages_on_ids():
+    api, transport = make_api(_handler)
+    hosts = api.configuration.hosts.all(keyset=3)
+    assert [h.id for h in hosts] == [h["id"] for h in HOSTS]
+    assert len(transport.calls) == 3
+    assert hosts.request.after == 55
+
+
+def test_keyset_resumes_after_an_id_with_filters():
+    api, transport = make_api(_handler)
+    hosts = api.configuration.hosts.filter(name__like="srv%", keyset=2, after=13)
+    assert [h.id for h in hosts] == [21, 34, 55]
+    first = json.loads(transport.calls[0][2]["search"])
+    assert first == {
+        "$and": [{"name": {"$lk": "srv%"}}, {"id": {"$gt": 13}}]
+    }
+
+
+def test_keyset_rejects_page_and_sort():
+    api, _ = make_api(_handler)
+    with pytest.raises(ValueError):
+        api.configuration.hosts.all(keyset=True, limit=10)
+    with pytest.raises(ValueError):
+        api.configuration.hosts.all(after=3)
@@ -0,0 +1,57 @@
+import datetime
+import math
+
+import pytest
+
+from pycentreon.core.perfdata import downsample
+from pycentreon.core.query import CircuitOpenError
+
+from tests.util import make_api
+
+START = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+
+
+def handler(verb, path, params, body):
+    start = datetime.datetime.fromisoformat(params["start_date"]).timestamp()
+    end = datetime.datetime.fromisoformat(params["end_date"]).timestamp()
+    times = list(range(int(start), int(end) + 1, 300))
+    return 200, {
+        "times": [
+            datetime.datetime.fromtimestamp(t, datetime.timezone.utc).isoformat()
+            for t in times
+        ],
+        "metrics": [
+            {"metric": "rta", "unit": "ms", "data": [float(t % 7) for t in times]}
+        ],
+    }
+
+
+def test_fetch_stitches_windows():
+    api, transport = make_api(handler)
+    end = START + datetime.timedelta(hours=2)
+    (perf,) = api.monitoring.performance(
+        [(1, 10)], START, end, chunk=datetime.timedelta(hours=1)
+    )
+    assert len(transport.calls) == 2
+    assert transport.paths()[0] == "monitoring/hosts/1/services/10/metrics/performance"
+    assert len(perf.times) == 25
+    assert list(perf.times) == sorted(set(perf.times))
+    assert perf.units == {"rta": "ms"}
+
+
+def test_fetch_goes_through_the_circuit_breaker():
+    api, transport = make_api(
+        lambda *args: (503, {}), circuit_breaker={"failure_threshold": 1}
+    )
+    end = START + datetime.timedelta(hours=1)
+    with pytest.raises(Exception):
+        api.monitoring.performance([(1, 10)], START, end)
+    with pytest.raises(CircuitOpenError):
+        api.monitoring.performance([(1, 10)], START, end)
+    assert len(transport.calls) == 1
+
+
+def test_downsample():
+    times, values = downsample([0, 60, 120, 180], [1.0, math.nan, 3.0, 5.0], 120)
+    assert list(times) == [0, 120]
+    assert list(values) == [1.0, 4.0]
@@ -0,0 +1,58 @@
+import copy
+import os
+import pickle
+
+import pycentreon
+from pycentreon.core.parallel import process_map
+from pycentreon.core.response import Record
+
+from tests.util import HOST, listing, make_api
+
+
+def _hosts(verb, path, params, body):
+    return 200, listing([{"id": 12, "name": "srv1", "groups": [1]}], params)
+
+
+def test_copies_stay_bound_to_their_api():
+    api, _ = make_api(_hosts)
+    host = next(iter(api.configuration.hosts.all()))
+    # Registered last for the same central, with another token
+    other = pycentreon.api(HOST, token="other")
+
+    for dup in (copy.copy(host), copy.deepcopy(host)):
+        assert dup.api is api
+        assert dup.endpoint is host.endpoint
+        assert dup.id == 12 and dup.name == "srv1"
+    dup = pickle.loads(pickle.dumps(host))
+    assert dup.api is api
+    assert dup.endpoint.url == host.endpoint.url
+    assert other.token == "other"
+
+    deep = copy.deepcopy(host)
+    deep.groups.append(2)
+    assert host.groups == [1]
+
+
+def test_pickle_record_without_endpoint():
+    api, _ = make_api(_hosts)
+    record = Record({"token": "abc"}, api, None)
+    dup = pickle.loads(pickle.dumps(record))
+    assert dup.endpoint is None
+    assert dup.api is api
+    assert dup.token == "abc"
+
+
+def _describe(record):
+    return record.id, record.api.token, record.endpoint.name, os.getpid()
+
+
+def test_process_map_binds_records_to_a_worker_api():
+    def handler(verb, path, params, body):
+        return 200, listing([{"id": i} for i in range(6)], params)
+
+    api, _ = make_api(handler)
+    results = list(
+        process_map(_describe, api.configuration.hosts.all(), chunk_size=2, workers=2)
+    )
+    assert [r[:3] for r in results] == [(i, "secret", "hosts") for i in range(6)]
+    assert os.getpid() not in {r[3] for r in results}
@@ -0,0 +1,57 @@
+import pytest
+
+from tests.util import listing, make_api
+
+HOSTS = [
+    {"id": 1, "name": "a", "address": "10.0.0.1", "monitoring_server": {"id": 1}},
+    {"id": 2, "name": "b", "address": "10.0.0.2", "monitoring_server": {"id": 1}},
+]
+
+
+def _handler(records):
+    def handler(verb, path, params, body):
+        if verb == "get":
+            return 200, listing(records, params)
+        return 204, None
+
+    return handler
+
+
+def test_plan_sends_only_changed_fields():
+    api, transport = make_api(_handler(HOSTS))
+    plan = (
+        api.planner()
+        .add(
+            api.configuration.hosts,
+            [
+                {"name": "a", "address": "10.0.0.1", "monitoring_server_id": 1},
+                {"name": "b", "address": "10.0.0.9", "monitoring_server_id": 2},
+                {"name": "c", "address": "10.0.0.3", "monitoring_server_id": 1},
+            ],
+            key="name",
+            compare_as={"monitoring_server_id": "monitoring_server.id"},
+            prune=True,
+        )
+        .plan()
+    )
+    assert str(plan) == "1 to create, 1 to update, 0 to delete"
+    (update,) = plan.updates
+    assert update.data == {"id": 2, "address": "10.0.0.9", "monitoring_server_id": 2}
+    # Planning leaves the current records untouched
+    assert update.record.address == "10.0.0.2"
+    assert transport.paths("post") == transport.paths("patch") == []
+
+
+def test_plan_rejects_duplicate_current_keys():
+    records = HOSTS + [dict(HOSTS[0], id=3)]
+    api, _ = make_api(_handler(records))
+    planner = api.planner().add(api.configuration.hosts, [{"name": "a"}])
+    with pytest.raises(ValueError, match="same key 'a'"):
+        planner.plan()
+
+
+def test_plan_rejects_duplicate_desired_keys():
+    api, _ = make_api(_handler(HOSTS))
+    planner = api.planner().add(api.configuration.hosts, [{"name": "c"}, {"name": "c"}])
+    with pytest.raises(ValueError):
+        planner.plan()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from pycentreon import Q
+from tests.util import listing, make_api
+
+
+def test_lookups_compile_to_centreon_operators():
+    q = Q(host__name="DC1ESX01") | Q(status__code__in=[1, 2])
+    assert q.to_search() == (
+        '{"$or":[{"host.name":{"$eq":"DC1ESX01"}},{"status.code":{"$in":[1,2]}}]}'
+    )
+    assert Q(id__gte=3, name__nlike="t%").compile() == {
+        "$and": [{"id": {"$ge": 3}}, {"name": {"$nk": "t%"}}]
+    }
+
+
+def test_combinations_are_flattened():
+    q = Q(a=1) & Q(b=2) & (Q(c=3) | Q(d=4))
+    assert q.compile() == {
+        "$and": [
+            {"a": {"$eq": 1}},
+            {"b": {"$eq": 2}},
+            {"$or": [{"c": {"$eq": 3}}, {"d": {"$eq": 4}}]},
+        ]
+    }
+    assert Q(a=1) & Q(b=2) == Q(a=1, b=2)
+
+
+def test_negation_applies_de_morgan():
+    q = ~(Q(is_acknowledged=True) & Q(status__code__in=[2]))
+    assert q.compile() == {
+        "$or": [{"is_acknowledged": {"$neq": True}}, {"status.code": {"$ni": [2]}}]
+    }
+    with pytest.raises(ValueError):
+        ~Q(name__regex="^a")
+
+
+def test_in_expects_a_list():
+    with pytest.raises(ValueError):
+        Q(id__in=3)
+
+
+def test_filter_mixes_q_kwargs_and_raw_searches():
+    def handler(verb, path, params, body):
+        return 200, listing([], params)
+
+    api, transport = make_api(handler)
+    list(
+        api.monitoring.hosts.filter(
+            Q(status__code=1), '{"name":{"$lk":"DC1%"}}', poller__id=2
+        )
+    )
+    search = json.loads(transport.calls[0][2]["search"])
+    assert search == {
+        "$and": [
+            {"name": {"$lk": "DC1%"}},
+            {"$and": [{"poller.id": {"$eq": 2}}, {"status.code": {"$eq": 1}}]},
+        ]
+    }
@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+
+from pycentreon.core.response import Record
+from tests.util import make_api
+
+
+def _handler(verb, path, params, body):
+    if any(r["id"] == 99 for r in body["resources"]):
+        return 422, {"code": 422, "message": "Resource 99 not found"}
+    return 204, None
+
+
+def test_acknowledge_in_chunks_and_isolate_rejected_resources():
+    api, transport = make_api(_handler)
+    resources = [12, (12, 310), {"type": "host", "id": 99, "parent": None}, 14, 15]
+    result = api.monitoring.resources.acknowledge(
+        resources, "Storage outage", chunk_size=2, workers=1
+    )
+
+    assert [o.item for o in result] == resources
+    assert [o.item for o in result.failed] == [resources[2]]
+    assert result.succeeded == [12, (12, 310), 14, 15]
+    verb, path, params, body = transport.calls[0]
+    assert (verb, path) == ("post", "monitoring/resources/acknowledge")
+    assert body["acknowledgement"]["comment"] == "Storage outage"
+    assert body["resources"] == [
+        {"type": "host", "id": 12, "parent": None},
+        {"type": "service", "id": 310, "parent": {"id": 12}},
+    ]
+
+
+def test_downtime_defaults_to_duration_from_start():
+    api, transport = make_api(_handler)
+    start = datetime.datetime(2024, 5, 1, 8, tzinfo=datetime.timezone.utc)
+    result = api.monitoring.resources.downtime([12], "Maintenance", start=start, duration=7200)
+
+    assert result.ok
+    body = transport.calls[0][3]
+    assert transport.calls[0][1] == "monitoring/resources/downtime"
+    assert body["downtime"]["start_time"] == "2024-05-01T08:00:00+00:00"
+    assert body["downtime"]["end_time"] == "2024-05-01T10:00:00+00:00"
+
+
+def test_service_without_host_cannot_be_referenced():
+    api, transport = make_api(_handler)
+    service = Record({"id": 310, "description": "ping"}, api, api.monitoring.services)
+    with pytest.raises(ValueError, match="310"):
+        api.monitoring.resources.acknowledge([12, service], "Outage")
+    assert transport.calls == []
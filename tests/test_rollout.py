@@ -0,0 +1,63 @@
+import requests
+
+from pycentreon.core.query import CircuitOpenError, RequestError
+from tests.util import make_api
+
+
+def _handler(failures):
+    """Fails the calls of a poller with the statuses (or exceptions) in
+    ``failures[poller id]`` before succeeding."""
+
+    def handler(verb, path, params, body):
+        poller = int(path.split("/")[2])
+        pending = failures.get(poller)
+        if pending:
+            failure = pending.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure, {"code": failure, "message": "failed"}
+        return 204, None
+
+    return handler
+
+
+def test_rollout_retries_only_transient_errors():
+    failures = {
+        2: [500],
+        3: [404],
+        4: [403],
+        5: [requests.ConnectionError("reset")],
+    }
+    api, transport = make_api(_handler(failures))
+    result = api.rollout([1, 2, 3, 4, 5], reload=False, backoff=0)
+    by_id = {s.id: s for s in result}
+
+    assert [s.id for s in result.failed] == [3, 4]
+    assert {i: s.attempts["generate"] for i, s in by_id.items()} == {
+        1: 1, 2: 2, 3: 1, 4: 1, 5: 2
+    }
+    assert isinstance(by_id[3].error, RequestError)
+    assert transport.paths().count("configuration/monitoring-servers/3/generate") == 1
+
+
+def test_rollout_does_not_retry_open_circuit(monkeypatch):
+    api, _ = make_api(_handler({}))
+    rollout_calls = []
+
+    def call(self, poller_id, action):
+        rollout_calls.append(poller_id)
+        raise CircuitOpenError("configuration/monitoring-servers", 30.0)
+
+    monkeypatch.setattr("pycentreon.core.rollout.PollerRollout._call", call)
+    result = api.rollout([1], reload=False, backoff=0)
+    assert not result.ok
+    assert rollout_calls == [1]
+    assert isinstance(result[0].error, CircuitOpenError)
+
+
+def test_rollout_reloads_generated_pollers_only():
+    api, transport = make_api(_handler({2: [404]}))
+    result = api.rollout([1, 2], backoff=0, wave_size=1)
+    assert [s.id for s in result.failed] == [2]
+    assert "configuration/monitoring-servers/2/reload" not in transport.paths()
+    assert "configuration/monitoring-servers/1/reload" in transport.paths()
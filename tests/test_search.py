@@ -0,0 +1,89 @@
+import json
+import threading
+
+import pytest
+
+from pycentreon.core.query import MultiRequest
+from pycentreon.core.search import split_search
+
+from tests.util import listing, make_api
+
+HOSTS = [{"id": i, "name": "host-{}".format(i)} for i in range(1, 401)]
+
+
+def _in_values(search):
+    if isinstance(search, dict):
+        for k, v in search.items():
+            if k == "$in":
+                return v
+            found = _in_values(v)
+            if found is not None:
+                return found
+    if isinstance(search, list):
+        for v in search:
+            found = _in_values(v)
+            if found is not None:
+                return found
+    return None
+
+
+def hosts_handler(verb, path, params, body):
+    records = HOSTS
+    if "search" in params:
+        ids = set(_in_values(json.loads(params["search"])))
+        records = [h for h in HOSTS if h["id"] in ids]
+    return 200, listing(records, params)
+
+
+def test_split_search_fits_budget():
+    search = json.dumps({"id": {"$in": list(range(1000))}})
+    chunks = split_search(search, 300)
+    assert len(chunks) > 1
+    values = [v for c in chunks for v in json.loads(c)["id"]["$in"]]
+    assert values == list(range(1000))
+
+
+def test_filter_splits_large_in_lists():
+    api, transport = make_api(hosts_handler, max_url_length=600)
+    ids = list(range(1, 301)) + [1, 2]
+    hosts = list(api.monitoring.hosts.filter(id__in=ids))
+    assert sorted(h.id for h in hosts) == list(range(1, 301))
+    assert len({c[2]["search"] for c in transport.calls}) > 1
+
+
+def test_split_filter_rejects_limit_and_page():
+    api, transport = make_api(hosts_handler, max_url_length=600)
+    with pytest.raises(ValueError, match="limit and page"):
+        api.monitoring.hosts.filter(id__in=list(range(1, 301)), limit=10, page=2)
+    assert transport.calls == []
+
+
+class SlowRequest:
+    def __init__(self, items, gate=None):
+        self.items = items
+        self.gate = gate
+
+    def get(self):
+        for i in self.items:
+            yield i
+            if self.gate is not None:
+                self.gate.wait(5)
+
+
+def test_multi_request_streams_results():
+    gate = threading.Event()
+    multi = MultiRequest([SlowRequest([1, 2, 3], gate), SlowRequest([4])], workers=2)
+    results = multi.get()
+    # The first result is yielded while its sub-query is still running
+    assert next(results) == 1
+    gate.set()
+    assert list(results) == [2, 3, 4]
+
+
+def test_multi_request_stops_early():
+    multi = MultiRequest(
+        [SlowRequest(range(10000)) for _ in range(3)], workers=2, buffer=10
+    )
+    results = multi.get()
+    assert next(results) == 0
+    results.close()
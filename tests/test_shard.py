@@ -0,0 +1,50 @@
+import json
+
+from tests.util import listing, make_api
+
+HOSTS = [
+    {"id": 1, "name": "a", "monitoring_server": {"id": 1}},
+    {"id": 2, "name": "b", "monitoring_server": {"id": 2}},
+    # Poller missing from gorgone.pollers
+    {"id": 3, "name": "c", "monitoring_server": {"id": 9}},
+    {"id": 4, "name": "d", "monitoring_server": {"id": None}},
+]
+
+
+def _match(search, record):
+    if "$and" in search:
+        return all(_match(s, record) for s in search["$and"])
+    if "$or" in search:
+        return any(_match(s, record) for s in search["$or"])
+    ((field, cond),) = search.items()
+    value = record
+    for part in field.split("."):
+        value = value[part]
+    ((op, expected),) = cond.items()
+    if op == "$eq":
+        return value == expected
+    if op == "$ni":
+        # SQL NOT IN never matches NULL
+        return value is not None and value not in expected
+    raise AssertionError(op)
+
+
+def _handler(verb, path, params, body):
+    if path.endswith("pollers"):
+        return 200, listing([{"id": 1}, {"id": 2}], params)
+    search = json.loads(params.get("search", "{}"))
+    return 200, listing([h for h in HOSTS if not search or _match(search, h)], params)
+
+
+def test_poller_shards_cover_unknown_and_null_pollers():
+    api, _ = make_api(_handler)
+    hosts = list(api.configuration.hosts.all(shard_by="poller"))
+    assert sorted(h.id for h in hosts) == [1, 2, 3, 4]
+
+
+def test_poller_shards_are_disjoint():
+    api, _ = make_api(_handler)
+    shards = api.configuration.hosts._shards("poller")
+    assert len(shards) == 3
+    matched = [[h["id"] for h in HOSTS if _match(s.compile(), h)] for s in shards]
+    assert matched == [[1], [2], [3, 4]]
@@ -0,0 +1,58 @@
+import concurrent.futures as cf
+import threading
+
+import pytest
+
+from pycentreon.core.util import SingleFlight
+from tests.util import make_api
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with cf.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, "key", fn) for _ in range(8)]
+        while flight.shared < 7:
+            release.wait(0.01)
+        release.set()
+        results = [f.result() for f in futures]
+    assert results == ["result"] * 8
+    assert calls == [1]
+    # Nothing is cached once the call returned
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_errors_are_shared_too():
+    flight = SingleFlight()
+
+    def fn():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fn)
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_identical_gets_are_sent_once():
+    release = threading.Event()
+
+    def handler(verb, path, params, body):
+        release.wait(5)
+        return 200, {"id": 12, "name": "srv"}
+
+    api, transport = make_api(handler)
+    with cf.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(api.monitoring.hosts.get, 12) for _ in range(4)]
+        while api.inflight.shared < 3:
+            release.wait(0.01)
+        release.set()
+        hosts = [f.result() for f in futures]
+    assert [h.name for h in hosts] == ["srv"] * 4
+    assert len(transport.calls) == 1
@@ -0,0 +1,59 @@
+import json
+
+from tests.util import listing, make_api
+
+HOSTS = [{"id": 1, "name": "web01"}, {"id": 2, "name": "db01"}]
+SERVICES = [
+    {"id": 10, "description": "Ping", "host": {"id": 1, "name": "web01"}},
+    {"id": 11, "description": "Disk", "host": {"id": 1, "name": "web01"}},
+]
+
+
+def handler(verb, path, params, body):
+    if verb == "post":
+        return 204, None
+    search = json.loads(params.get("search", "{}"))
+    if path == "monitoring/hosts":
+        name = search.get("name", {}).get("$eq")
+        return 200, listing([h for h in HOSTS if h["name"] == name], params)
+    if path == "monitoring/services":
+        name = search.get("host.name", {}).get("$eq")
+        return 200, listing([s for s in SERVICES if s["host"]["name"] == name], params)
+    return 404, {}
+
+
+def test_submit_resolves_names_with_targeted_lookups():
+    api, transport = make_api(handler)
+    run = api.monitoring.submit(
+        [
+            ("web01", None, 0, "UP"),
+            ("web01", "Ping", 0, "OK", "rta=1ms"),
+            ("web01", "Disk", 2, "CRITICAL"),
+            ("typo01", None, 0, "UP"),
+            ("typo01", None, 0, "UP"),
+        ]
+    )
+    assert run["submitted"] == 3
+    assert run["dropped"] == 2
+    lookups = [c for c in transport.calls if c[0] == "get"]
+    # No full listing, the services of web01 are fetched once and the
+    # unknown host is only looked up once
+    assert all("search" in c[2] for c in lookups)
+    host_lookups = [c for c in lookups if c[1] == "monitoring/hosts"]
+    typo = [c for c in host_lookups if "typo01" in c[2]["search"]]
+    assert len(typo) == len(host_lookups) - len(typo)
+    assert len([c for c in lookups if c[1] == "monitoring/services"]) == len(typo)
+    posted = [c[3] for c in transport.calls if c[0] == "post"]
+    resources = [r for body in posted for r in body["resources"]]
+    assert {(r["type"], r["id"]) for r in resources} == {
+        ("host", 1),
+        ("service", 10),
+        ("service", 11),
+    }
+    assert api.metrics()["submit"]["submitted"] == 3
+
+
+def test_metrics_do_not_create_the_submitter():
+    api, transport = make_api(handler)
+    assert "submit" not in api.metrics()
+    assert "_submitter" not in api.monitoring.__dict__
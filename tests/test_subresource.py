@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from tests.util import listing, make_api
+
+HOSTS = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+SERVICES = [
+    {"id": 10, "description": "ping", "host": {"id": 1}},
+    {"id": 11, "description": "disk", "host": {"id": 1}},
+    {"id": 20, "description": "ping", "host": {"id": 2}},
+]
+
+
+def _handler(verb, path, params, body):
+    if path == "monitoring/hosts":
+        return 200, listing(HOSTS, params)
+    if path == "monitoring/services":
+        if "search" not in params:
+            return 200, listing(SERVICES, params)
+        ids = json.loads(params["search"])["host.id"]["$in"]
+        return 200, listing([s for s in SERVICES if s["host"]["id"] in ids], params)
+    if path.endswith("/timeline"):
+        host_id = int(path.split("/")[2])
+        return 200, listing([{"id": host_id * 100, "content": "event"}], params)
+    raise AssertionError(path)
+
+
+def test_children_are_fetched_with_one_listing():
+    api, transport = make_api(_handler)
+    hosts = api.monitoring.hosts.fetch_children("services")
+    # A single listing of every service, without filter
+    services_calls = [c for c in transport.calls if c[1] == "monitoring/services"]
+    assert services_calls and all("search" not in c[2] for c in services_calls)
+
+    calls = len(transport.calls)
+    assert {h.id: [s.id for s in h.services.list()] for h in hosts} == {
+        1: [10, 11],
+        2: [20],
+    }
+    assert len(transport.calls) == calls
+
+
+def test_given_parents_filter_the_children():
+    api, transport = make_api(_handler)
+    parents = [h for h in api.monitoring.hosts.all() if h.id == 2]
+    api.monitoring.hosts.fetch_children("services", parents=parents)
+    assert [s.id for s in parents[0].services.list()] == [20]
+    searches = {c[2].get("search") for c in transport.calls if c[1] == "monitoring/services"}
+    assert searches == {'{"host.id":{"$in":[2]}}'}
+
+
+def test_no_parents_sends_no_request():
+    api, transport = make_api(_handler)
+    assert api.monitoring.hosts.fetch_children("services", parents=[]) == []
+    assert transport.calls == []
+
+
+def test_detail_routes_are_used_without_a_child_endpoint():
+    api, transport = make_api(_handler)
+    hosts = api.monitoring.hosts.fetch_children("timeline", workers=2)
+    assert {h.id: [e.id for e in h.timeline.list()] for h in hosts} == {
+        1: [100],
+        2: [200],
+    }
+    assert sorted({c[1] for c in transport.calls if "timeline" in c[1]}) == [
+        "monitoring/hosts/1/timeline",
+        "monitoring/hosts/2/timeline",
+    ]
+
+
+def test_unknown_sub_resource():
+    api, _ = make_api(_handler)
+    with pytest.raises(ValueError):
+        api.monitoring.hosts.fetch_children("name", parents=[])
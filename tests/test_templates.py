@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from tests.util import listing, make_api
+
+
+def _macro(name, value):
+    return {"name": name, "value": value}
+
+
+TEMPLATES = [
+    {"id": 1, "name": "generic", "templates": [], "check_command_id": 5,
+     "snmp_version": "2c", "macros": [_macro("SNMPCOMMUNITY", "public"), _macro("PORT", "161")]},
+    {"id": 2, "name": "linux", "templates": [{"id": 1}], "check_command_id": None,
+     "snmp_version": "3", "macros": [_macro("PORT", "1161")]},
+    {"id": 3, "name": "snmp-v1", "templates": [], "check_command_id": 9,
+     "snmp_version": "1", "macros": []},
+]
+
+
+def _api(templates):
+    def handler(verb, path, params, body):
+        assert path == "configuration/hosts/templates"
+        items = templates
+        if "search" in params:
+            ids = json.loads(params["search"])["id"]["$in"]
+            items = [t for t in templates if t["id"] in ids]
+        return 200, listing(items, params)
+
+    return make_api(handler)
+
+
+def test_effective_merges_templates_in_priority_order():
+    api, transport = _api(TEMPLATES)
+    resolver = api.templates("hosts")
+    calls = len(transport.calls)
+
+    host = {"name": "srv", "templates": [{"id": 2}, {"id": 3}], "check_command_id": None,
+            "macros": [_macro("SNMPCOMMUNITY", "private")]}
+    conf = resolver.effective(host)
+    # The first template wins, empty values are inherited
+    assert conf["snmp_version"] == "3"
+    assert conf["check_command_id"] == 5
+    assert {k: m["value"] for k, m in conf["macros"].items()} == {
+        "SNMPCOMMUNITY": "private",
+        "PORT": "1161",
+    }
+    assert len(transport.calls) == calls
+
+
+def test_refresh_resolves_descendants_again():
+    templates = [dict(t) for t in TEMPLATES]
+    api, transport = _api(templates)
+    resolver = api.templates("hosts")
+    assert resolver.resolve(2)["check_command_id"] == 5
+
+    templates[0] = dict(templates[0], check_command_id=7)
+    resolver.refresh([1])
+    assert resolver.resolve(2)["check_command_id"] == 7
+    assert resolver.descendants(1) == {2}
+
+
+def test_inheritance_loops_are_reported():
+    loop = [
+        {"id": 1, "templates": [{"id": 2}], "macros": []},
+        {"id": 2, "templates": [{"id": 1}], "macros": []},
+    ]
+    api, _ = _api(loop)
+    with pytest.raises(ValueError, match="loop"):
+        api.templates("hosts").resolve(1)
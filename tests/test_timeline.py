@@ -0,0 +1,50 @@
+import datetime
+import json
+
+from pycentreon.core.util import format_time, to_epoch
+
+from tests.util import listing, make_api
+
+START = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+EVENTS = {
+    "monitoring/hosts/1/timeline": [
+        {"id": i, "date": (START + datetime.timedelta(hours=i)).isoformat()}
+        for i in range(0, 12, 2)
+    ],
+    "monitoring/hosts/1/services/10/timeline": [
+        {"id": 100 + i, "date": (START + datetime.timedelta(hours=i)).isoformat()}
+        for i in range(1, 12, 2)
+    ],
+}
+
+
+def handler(verb, path, params, body):
+    search = json.loads(params["search"])["$and"]
+    start = to_epoch(search[0]["date"]["$ge"])
+    end = to_epoch(search[1]["date"]["$lt"])
+    events = [e for e in EVENTS[path] if start <= to_epoch(e["date"]) < end]
+    return 200, listing(events, params)
+
+
+def test_timeline_merges_resources_in_order():
+    api, transport = make_api(handler)
+    events = list(
+        api.monitoring.timeline(
+            [1, (1, 10)],
+            START,
+            START + datetime.timedelta(hours=12),
+            window=datetime.timedelta(hours=4),
+            page_size=1,
+        )
+    )
+    assert [e.record.id for e in events] == [
+        0, 101, 2, 103, 4, 105, 6, 107, 8, 109, 10, 111
+    ]
+    assert all(json.loads(c[2]["sort_by"]) == {"date": "ASC"} for c in transport.calls)
+
+
+def test_format_time():
+    naive = datetime.datetime(2024, 5, 1, 12)
+    assert format_time(naive) == naive.astimezone().isoformat()
+    assert format_time("2024-05-01T12:00:00Z") == "2024-05-01T12:00:00Z"
+    assert to_epoch("1970-01-01T00:01:00Z") == 60.0
@@ -0,0 +1,59 @@
+import json
+
+from tests.util import listing, make_api
+
+POLLERS = [{"id": 1, "name": "central"}, {"id": 2, "name": "poller"}]
+HOSTS = [
+    {"id": 1, "name": "router", "monitoring_server": {"id": 1}, "groups": [], "parents": []},
+    {"id": 2, "name": "switch", "monitoring_server": {"id": 2}, "groups": [{"id": 7}], "parents": [{"id": 1}]},
+    {"id": 3, "name": "server", "monitoring_server": {"id": 2}, "groups": [{"id": 7}], "parents": [{"id": 2}]},
+]
+SERVICES = [
+    {"id": 10, "name": "ping", "hosts": [{"id": 3}], "groups": []},
+    {"id": 11, "name": "disk", "hosts": [{"id": 3}], "groups": []},
+    {"id": 12, "name": "ping", "hosts": [{"id": 1}], "groups": []},
+]
+
+
+def _handler(records):
+    def handler(verb, path, params, body):
+        items = records[path.split("/", 1)[1]]
+        if "search" in params:
+            ids = json.loads(params["search"])["id"]["$in"]
+            items = [i for i in items if i["id"] in ids]
+        return 200, listing(items, params)
+
+    return handler
+
+
+def _topology(**changes):
+    records = {"monitoring-servers": POLLERS, "hosts": HOSTS, "services": SERVICES}
+    records.update(changes)
+    api, transport = make_api(_handler(records))
+    return api.topology(), transport, records
+
+
+def test_impact_follows_parents_groups_and_pollers():
+    topo, transport, _ = _topology()
+    calls = len(transport.calls)
+
+    assert topo.ancestors(3) == {1, 2}
+    assert topo.dependents(1) == {2, 3}
+    assert topo.impact(host=2) == {"hosts": {2, 3}, "services": {10, 11}, "pollers": {2}}
+    assert topo.impact(hostgroup=7)["hosts"] == {2, 3}
+    assert topo.impact(poller=1)["services"] == {10, 11, 12}
+    # Answered locally
+    assert len(transport.calls) == calls
+
+
+def test_refresh_replaces_edges_of_the_given_hosts():
+    topo, transport, records = _topology()
+    # The server moved to the central, the switch was deleted
+    records["hosts"] = [HOSTS[0], dict(HOSTS[2], monitoring_server={"id": 1}, parents=[])]
+    topo.refresh(hosts=[2, 3])
+
+    assert list(topo.neighbors("host_poller", 3)) == [1]
+    assert topo.ancestors(3) == set()
+    assert 2 not in topo.names["hosts"]
+    assert set(topo.reverse("host_group", 7)) == {3}
+    assert "search" in transport.calls[-1][2]
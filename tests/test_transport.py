@@ -0,0 +1,48 @@
+import pytest
+
+from pycentreon.core.query import Request
+from pycentreon.core.transport import RequestsTransport, get_transport
+
+from tests.util import HOST, make_api
+
+
+class FakeResponse:
+    status_code = 200
+    ok = True
+    headers = {}
+    content = b'{"id": 1}'
+
+    def json(self):
+        return {"id": 1}
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, data=None):
+        self.calls.append(url)
+        return FakeResponse()
+
+
+def test_requests_transport_is_the_default():
+    session = FakeSession()
+    url = "{}/api/latest/monitoring/hosts/1".format(HOST)
+    req = Request(base=url, http_session=session)
+    assert isinstance(req.transport, RequestsTransport)
+    assert req.transport.session is session
+    assert next(req.get()) == {"id": 1}
+    assert session.calls == [url]
+
+
+def test_api_transport_is_used():
+    api, transport = make_api(lambda *args: (200, {"id": 1, "name": "central"}))
+    host = api.monitoring.hosts.get(1)
+    assert host.name == "central"
+    assert transport.paths() == ["monitoring/hosts/1"]
+
+
+def test_get_transport_rejects_unknown_names():
+    assert get_transport(None) is None
+    with pytest.raises(ValueError, match="curl"):
+        get_transport("curl")
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from pycentreon.core.watch import (
+    ACKNOWLEDGED,
+    REMOVED,
+    STATUS,
+    ResourceWatcher,
+)
+
+
+def resource(uuid, code, changed, acknowledged=False):
+    return SimpleNamespace(
+        uuid=uuid,
+        status=SimpleNamespace(code=code),
+        last_status_change=changed,
+        is_acknowledged=acknowledged,
+        is_in_downtime=False,
+    )
+
+
+class FakeResources:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def filter(self, *args, **kwargs):
+        search = args[-1].to_search() if args else ""
+        self.queries.append(search)
+        if "last_status_change" in search:
+            since = args[-1].compile()["last_status_change"]["$ge"]
+            return [r for r in self.records if r.last_status_change >= since]
+        if "is_acknowledged" in search:
+            return [r for r in self.records if r.is_acknowledged or r.is_in_downtime]
+        return list(self.records)
+
+
+def test_watcher_reports_changes():
+    endpoint = FakeResources([resource("a", 0, 1), resource("b", 0, 1)])
+    watcher = ResourceWatcher(endpoint, resync=3600)
+    assert watcher.poll() == []
+    endpoint.records = [resource("a", 2, 5, acknowledged=True), resource("b", 0, 1)]
+    events = {(e.kind, e.key) for e in watcher.poll()}
+    assert events == {(STATUS, "a"), (ACKNOWLEDGED, "a")}
+    assert watcher.states["a"] == (2, True, False)
+
+
+def test_watcher_prunes_removed_resources():
+    endpoint = FakeResources([resource("a", 0, 1), resource("b", 0, 1)])
+    watcher = ResourceWatcher(endpoint, resync=0)
+    watcher.poll()
+    endpoint.records = [resource("a", 0, 1)]
+    events = watcher.poll()
+    assert [(e.kind, e.key, e.previous) for e in events] == [(REMOVED, "b", 0)]
+    assert set(watcher.states) == {"a"}
+    # The removed resource is no longer part of the diff
+    assert watcher.poll() == []
@@ -0,0 +1,75 @@
+"""
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import gzip
+import json
+import threading
+from urllib.parse import urlsplit
+
+import pycentreon
+from pycentreon.core.transport import Transport, TransportResponse
+
+HOST = "http://centreon.example.com/centreon"
+PREFIX = "/centreon/api/latest/"
+
+
+class FakeTransport(Transport):
+    """Answers requests with ``handler(verb, path, params, body)``.
+
+    ``path`` is relative to the API root (``monitoring/hosts``), the
+    handler returns ``(status, payload)``. Calls are recorded in
+    ``calls`` as ``(verb, path, params, body)``, and their headers in
+    ``headers``.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.headers = []
+        self.lock = threading.Lock()
+
+    def request(self, verb, url, headers=None, params=None, data=None):
+        path = urlsplit(url).path
+        if path.startswith(PREFIX):
+            path = path[len(PREFIX):]
+        body = None
+        if data:
+            if (headers or {}).get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            body = json.loads(data)
+        params = dict(params or {})
+        with self.lock:
+            self.calls.append((verb, path, params, body))
+            self.headers.append(dict(headers or {}))
+        status, payload = self.handler(verb, path, params, body)
+        content = b"" if payload is None else json.dumps(payload).encode()
+        return TransportResponse(status, "Reason", url, {}, content, data)
+
+    def paths(self, verb=None):
+        return [c[1] for c in self.calls if verb is None or c[0] == verb]
+
+
+def listing(records, params):
+    """Centreon listing response of ``records`` for ``params``."""
+    limit = int(params.get("limit", 10))
+    page = int(params.get("page", 1))
+    result = records[(page - 1) * limit : page * limit] if limit else []
+    return {
+        "result": result,
+        "meta": {"page": page, "limit": limit, "total": len(records)},
+    }
+
+
+def make_api(handler, **kwargs):
+    transport = FakeTransport(handler)
+    return pycentreon.api(HOST, token="secret", transport=transport, **kwargs), transport